@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add the 'src' directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from src import config
+from src.app.chain import RAGChainManager, get_chain_manager, history_to_messages
+from src.app.routing import get_query_mode
+from src.app.metrics import latency_summary
+from src.app.tracing import LatencyTracer
+
+# Ensure log directory exists
+log_dir = Path(__file__).resolve().parent / "logs"
+log_dir.mkdir(parents=True, exist_ok=True)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    handlers=[
+        logging.FileHandler(log_dir / "batch.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+
+def load_questions(questions_path: Path) -> list:
+    """
+    Reads questions from a JSONL file. Each line holds a "question" and optionally
+    an "id" (defaults to the line number), a "mode" and a "chat_history" given as
+    a list of {"role": "user"|"assistant", "content": ...} messages. Invalid lines
+    and repeated ids are skipped with a warning.
+    """
+    questions, seen = [], set()
+    with open(questions_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping line {line_number}: invalid JSON ({e}).")
+                continue
+            if not isinstance(item, dict) or not isinstance(item.get("question"), str) or not item["question"].strip():
+                logger.warning(f"Skipping line {line_number}: no \"question\" text.")
+                continue
+            history = item.get("chat_history", [])
+            if not isinstance(history, list) or not all(
+                isinstance(message, dict) and "role" in message and "content" in message for message in history
+            ):
+                logger.warning(f"Skipping line {line_number}: \"chat_history\" must be a list of role/content messages.")
+                continue
+            item["id"] = str(item.get("id", line_number))
+            if item["id"] in seen:
+                logger.warning(f"Skipping line {line_number}: id '{item['id']}' already used.")
+                continue
+            seen.add(item["id"])
+            questions.append(item)
+    return questions
+
+
+def load_completed_ids(output_path: Path) -> set:
+    """
+    Returns the ids already answered in a previous run, so the batch can resume.
+    The output file is rewritten with one record per answered id (the last one
+    wins): failed attempts, which are retried, and a truncated last line from an
+    interrupted run are dropped, so new records start on a fresh line.
+    """
+    if not output_path.exists():
+        return set()
+    records = {}
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(record, dict) or "id" not in record:
+                continue
+            record_id = str(record["id"])
+            if "error" in record:
+                records.pop(record_id, None)
+            else:
+                records[record_id] = record
+
+    partial_path = output_path.with_name(output_path.name + ".partial")
+    with open(partial_path, 'w', encoding='utf-8') as f:
+        for record in records.values():
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    partial_path.replace(output_path)
+    return set(records)
+
+
+async def answer_all(chain_manager: RAGChainManager, questions: list, output_path: Path, concurrency: int) -> list:
+    """
+    Answers the questions with at most `concurrency` chain invocations in flight,
+    appending one JSON line per answer as soon as it is ready.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def answer(item, outfile):
+        record = {"id": item["id"], "question": item["question"]}
+        async with semaphore:
+            start = time.perf_counter()
+            # Everything that can fail is in the try, so each question gets an answer
+            # or an error record and a failed chain build does not abort the batch.
+            try:
+                mode = record["mode"] = item.get("mode") or get_query_mode(item["question"])
+                rag_chain = chain_manager.get_rag_chain(mode=mode)
+                tracer = LatencyTracer(mode=mode, source="batch", question_id=item["id"])
+                record["trace_id"] = tracer.trace_id
+                record["answer"] = await rag_chain.ainvoke({
+                    "chat_history": history_to_messages(item.get("chat_history", [])),
+                    "input": item["question"],
+                }, config={"callbacks": [tracer]})
+            except Exception as e:
+                logger.error(f"Error answering question {item['id']}: {e}")
+                record["error"] = str(e)
+            record["latency_seconds"] = round(time.perf_counter() - start, 4)
+        if "error" not in record:
+            latencies.append(record["latency_seconds"])
+        outfile.write(json.dumps(record, ensure_ascii=False) + "\n")
+        outfile.flush()
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'a', encoding='utf-8') as outfile:
+        await asyncio.gather(*(answer(item, outfile) for item in questions))
+    return latencies
+
+
+def main():
+    """
+    Runs the RAG chain headlessly over a JSONL file of questions and streams the
+    answers, with per-item latency, to a JSONL file. Re-running with the same
+    output file skips questions that were already answered.
+    """
+    parser = argparse.ArgumentParser(description="Answer a batch of questions with the CAN RAG chain.")
+    parser.add_argument("questions", type=Path, help="JSONL file with one question per line.")
+    parser.add_argument("-o", "--output", type=Path, help="Output JSONL file (default: <questions>.answers.jsonl).")
+    parser.add_argument("-c", "--concurrency", type=int, default=config.BATCH_CONCURRENCY, help="Maximum number of questions answered concurrently.")
+    args = parser.parse_args()
+
+    output_path = args.output or args.questions.with_suffix(".answers.jsonl")
+
+    try:
+        config.check_environment_variables()
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        sys.exit(1)
+
+    questions = load_questions(args.questions)
+    completed = load_completed_ids(output_path)
+    pending = [item for item in questions if item["id"] not in completed]
+    logger.info(f"{len(questions)} questions loaded, {len(completed)} already answered, {len(pending)} to go.")
+    if not pending:
+        return
+
+    try:
+        chain_manager = get_chain_manager()
+    except Exception as e:
+        logger.error(f"Could not initialize the RAG chain: {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    latencies = asyncio.run(answer_all(chain_manager, pending, output_path, args.concurrency))
+    elapsed = time.perf_counter() - start
+
+    summary = latency_summary(latencies)
+    logger.info(
+        f"Answered {len(latencies)}/{len(pending)} questions in {elapsed:.1f}s "
+        f"({len(latencies) / elapsed:.2f} q/s at concurrency {args.concurrency}); "
+        f"latency p50={summary['p50'] or 0:.2f}s p95={summary['p95'] or 0:.2f}s p99={summary['p99'] or 0:.2f}s."
+    )
+    logger.info(f"Answers written to {output_path}")
+
+if __name__ == "__main__":
+    main()
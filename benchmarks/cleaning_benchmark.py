@@ -0,0 +1,205 @@
+"""
+Text cleaning equivalence check and throughput benchmark.
+
+Compares the cleaning engine (src/ingestion/cleaning.py) with verbatim copies
+of the re.sub chains it replaced. Every text is cleaned both ways and any
+difference is reported as a mismatch (the run exits with status 1), then
+throughput is measured for the legacy chain, the engine, and the engine's
+batch API in a process pool.
+
+Texts come from the processed corpus and the scraped Le360 articles when
+they exist, from --synthetic article-like documents, and from --fuzz texts
+glued together from fragments chosen to make the cleaning steps interact
+(URLs touching embeds, hashtags in front of picture links, entities that
+unescape to '#' or '@', emojis between spaces...).
+
+    python benchmarks/cleaning_benchmark.py
+    python benchmarks/cleaning_benchmark.py --synthetic 2000 --fuzz 20000 --workers 4
+"""
+import argparse
+import html
+import json
+import logging
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import pandas as pd
+
+from src import config
+from src.ingestion import cleaning
+from src.ingestion.jsonl import iter_records
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+# --- Reference implementations (as they were before the cleaning engine) ---
+def legacy_remove_emojis(text: str) -> str:
+    emoji_pattern = re.compile(
+        "["
+        "\U0001F600-\U0001F64F"  # Emoticons
+        "\U0001F300-\U0001F5FF"  # Symbols & Pictographs
+        "\U0001F680-\U0001F6FF"  # Transport & Map Symbols
+        "\U0001F1E0-\U0001F1FF"  # Flags (iOS)
+        "\U00002702-\U000027B0"  # Dingbats
+        "\U000024C2-\U0001F251"  # Enclosed Characters
+        "\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
+        "\U0001FA00-\U0001FA6F"  # Chess Symbols
+        "\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
+        "\U000025AA-\U000025AB"  # White and black square, small
+        "\U00002B05-\U00002B07"  # Arrows
+        "\U00002934-\U00002935"  # Curly Loop
+        "\U00002B50"             # White medium star
+        "\U0000FE0F"             # Variation Selector
+        "\U0000200D"             # Zero Width Joiner
+        "]+",
+        flags=re.UNICODE
+    )
+    return emoji_pattern.sub(r'', text)
+
+def legacy_clean_article_text(text: str) -> str:
+    text = html.unescape(text)
+    text = re.sub(r'pic.twitter.com/\w+', '', text)
+    text = re.sub(r'View this post on Instagram', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'#[a-zA-Z0-9_]+', '', text)
+    text = re.sub(r'@[a-zA-Z0-9_]+', '', text)
+    text = re.sub(r'\n\s*\n', '\n', text)
+    text = re.sub(r' +', ' ', text)
+    return text.strip()
+
+def legacy_clean_rag_document(text: str) -> str:
+    text = re.sub(r'https?://\S+', '', text)
+    text = re.sub(r'pic\.twitter\.com/\w+', '', text)
+    text = re.sub(r'View this post on Instagram', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\n\s*\n', '\n', text)
+    text = re.sub(r' +', ' ', text)
+    return text.strip()
+
+# (name, legacy function, engine cleaner)
+CLEANERS = [
+    ("rag_document", legacy_clean_rag_document, cleaning.RAG_DOCUMENT_CLEANER),
+    ("article_text", legacy_clean_article_text, cleaning.ARTICLE_TEXT_CLEANER),
+    ("emojis", legacy_remove_emojis, cleaning.EMOJI_CLEANER),
+    ("scraped_text", lambda text: legacy_remove_emojis(legacy_clean_article_text(text)), cleaning.SCRAPED_TEXT_CLEANER),
+]
+
+
+# --- Corpus ---
+WORDS = ("la CAN 2025 au Maroc Sénégal Côte d'Ivoire équipe match but joueur stade sélection Lions de l'Atlas "
+         "l’entraîneur « Walid Regragui » a déclaré – qualification … finale demi-finale Égypte Nigeria").split(" ")
+FRAGMENTS = [
+    "http", "https://", "://", "https://le360.ma/sport", "http://t.co/AbC12", "pic", "pic.twitter.com/", "pic.twitter.com/XyZ9",
+    ".twitter.com/q1", "picXtwitterYcom/abc", "View", "View this post", " on ", "on Instagram", "View this post on Instagram",
+    "VIEW THIS POST ON INSTAGRAM", "view this post on instagram", "#", "#CAN2025", "@", "@FRMF", "tag", "_x", "&amp;",
+    "&#35;", "&#64;", "&commat;", "&eacute;", "&nbsp;", " ", "  ", "   ", "\n", "\n\n", "\n \n", " \n  \n ", "\t", "\r\n",
+    "🏆", "⚽", "🇲🇦", "\u200d", "\ufe0f", "Ⓜ", "★", "é", "’", "«", "»", "CAN", "Maroc",
+]
+
+
+def load_corpus_texts(limit: int) -> list:
+    """Processed RAG documents (split into entries) and raw Le360 article bodies, if present."""
+    texts = []
+    for path in sorted(config.PROCESSED_DATA_PATH.glob("*.txt")) if config.PROCESSED_DATA_PATH.exists() else []:
+        texts.extend(entry for entry in path.read_text(encoding='utf-8').split("\n\n\n") if entry.strip())
+    for name in ("le360_can_articles.jsonl", "le360_can_articles.json"):
+        path = config.RAW_DATA_PATH / name
+        if path.exists():
+            for article in iter_records(path):
+                texts.extend(value for value in (article.get('title'), article.get('content')) if isinstance(value, str))
+            break
+    return texts[:limit]
+
+
+def synthetic_texts(count: int, rng: random.Random) -> list:
+    """Article-like documents: paragraphs of French text with the usual social media artifacts."""
+    artifacts = ["https://t.co/AbC12", "pic.twitter.com/XyZ9", "View this post on Instagram", "#CAN2025", "@FRMF", "🏆", "&amp;"]
+    texts = []
+    for _ in range(count):
+        paragraphs = []
+        for _ in range(rng.randint(5, 30)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(10, 60))]
+            if rng.random() < 0.3:
+                words.insert(rng.randrange(len(words)), rng.choice(artifacts))
+            paragraphs.append(" ".join(words))
+        texts.append(rng.choice(["\n\n", "\n \n", "\n"]).join(paragraphs) + rng.choice(["", "\n", "  \n\n"]))
+    return texts
+
+
+def fuzz_texts(count: int, rng: random.Random) -> list:
+    return ["".join(rng.choice(FRAGMENTS + WORDS) for _ in range(rng.randint(1, 40))) for _ in range(count)]
+
+
+# --- Measurements ---
+def throughput(func, texts: list, repeat: int) -> dict:
+    total_chars = sum(len(text) for text in texts)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(texts)
+        best = min(best, time.perf_counter() - start)
+    return {"seconds": round(best, 6), "docs_per_second": round(len(texts) / best, 1), "mb_per_second": round(total_chars / best / 1e6, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the cleaning engine against the legacy cleaners and measure throughput.")
+    parser.add_argument("--corpus-limit", type=int, default=20000, help="Maximum number of corpus texts to use.")
+    parser.add_argument("--synthetic", type=int, default=1000, help="Number of synthetic article-like documents.")
+    parser.add_argument("--fuzz", type=int, default=20000, help="Number of fuzz texts for the equivalence check.")
+    parser.add_argument("--workers", type=int, default=4, help="Process pool size for the batch API measurement.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions (best is kept).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-save", action="store_true", help="Do not store the result of this run.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = load_corpus_texts(args.corpus_limit)
+    documents = corpus + synthetic_texts(args.synthetic, rng)
+    fuzz = fuzz_texts(args.fuzz, rng)
+    logger.info(f"{len(corpus)} corpus texts, {len(documents) - len(corpus)} synthetic documents, {len(fuzz)} fuzz texts.")
+
+    results, failed = [], False
+    for name, legacy, cleaner in CLEANERS:
+        mismatches = [text for text in documents + fuzz if cleaner.clean(text) != legacy(text)]
+        series = pd.Series(documents[:500] + [None])
+        if not cleaner.clean_series(series).iloc[:-1].equals(series.iloc[:-1].map(legacy)):
+            mismatches.append("<clean_series>")
+        failed |= bool(mismatches)
+
+        timings = {
+            "legacy": throughput(lambda texts: [legacy(text) for text in texts], documents, args.repeat),
+            "engine": throughput(lambda texts: list(cleaner.clean_many(texts)), documents, args.repeat),
+        }
+        if args.workers > 1:
+            timings[f"engine_{args.workers}_workers"] = throughput(
+                lambda texts: list(cleaner.clean_many(texts, workers=args.workers)), documents, args.repeat
+            )
+        results.append({"cleaner": name, "mismatches": len(mismatches), "mismatch_examples": [repr(text[:200]) for text in mismatches[:5]], "throughput": timings})
+
+        legacy_rate = timings["legacy"]["docs_per_second"]
+        summary = "  ".join(f"{label}={timing['mb_per_second']:6.2f}MB/s ({timing['docs_per_second'] / legacy_rate:4.1f}x)" for label, timing in timings.items())
+        logger.info(f"{name:<13} mismatches={len(mismatches):<4} {summary}")
+        for example in results[-1]["mismatch_examples"]:
+            logger.error(f"  {name} differs on {example}")
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = RESULTS_DIR / f"cleaning_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({"settings": {**vars(args), "corpus_texts": len(corpus)}, "results": results}, f, indent=2)
+        logger.info(f"Result saved to {output_path}")
+
+    if failed:
+        logger.error("The cleaning engine does not reproduce the legacy output.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
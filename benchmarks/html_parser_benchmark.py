@@ -0,0 +1,172 @@
+"""
+HTML parsing micro-benchmark.
+
+Runs the scrapers' real extraction functions over saved pages with every
+installed BeautifulSoup backend, with and without targeted (SoupStrainer)
+parsing, and reports parse time and peak memory per page. Every configuration
+is checked against the reference (html.parser, full tree): a mismatch means
+that backend or strainer would change what gets scraped.
+
+Pages come from the scrapers' HTTP cache (SCRAPER_CACHE_PATH), so a normal
+scraper run doubles as the fixture set; --synthetic generates Le360- and
+Transfermarkt-like pages instead, for a run without any cached data.
+
+    python benchmarks/html_parser_benchmark.py
+    python benchmarks/html_parser_benchmark.py --synthetic 50 --repeat 5
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from src import config
+from src.app.metrics import latency_summary
+from src.ingestion import html_parsing, processor, scraper
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+REFERENCE = ("html.parser", False)
+
+EXTRACTORS = {
+    "le360_listing": lambda url, content: scraper._parse_le360_listing(content, url),
+    "le360_article": lambda url, content: scraper._parse_le360_article(url, content),
+    "transfermarkt_squad": lambda url, content: scraper._parse_transfermarkt_players(content),
+    "generic_text": lambda url, content: processor.clean_text_from_html(content),
+}
+
+
+def page_kind(url: str) -> str:
+    if "le360.ma" in url:
+        if url.rstrip("/").endswith("/football/can") or scraper._LE360_PAGINATION_PATTERN.search(url):
+            return "le360_listing"
+        return "le360_article"
+    if "transfermarkt" in url:
+        return "transfermarkt_squad"
+    return "generic_text"
+
+
+def load_cached_pages(cache_dir: Path) -> list:
+    """Returns (kind, url, content) for every HTML page in the HTTP cache."""
+    pages = []
+    for meta_path in sorted(cache_dir.glob("*.json")):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if "html" not in meta["headers"].get("content-type", ""):
+            continue
+        content = meta_path.with_suffix(".body").read_bytes()
+        pages.append((page_kind(meta["url"]), meta["url"], content))
+    return pages
+
+
+def synthetic_pages(count: int) -> list:
+    """Generates Le360 listing/article and Transfermarkt squad pages of realistic size."""
+    chrome = "".join(f'<div class="nav"><a href="/rubrique/{i}">Rubrique {i}</a><script>var x{i} = {i};</script></div>' for i in range(150))
+    pages = []
+    for i in range(count):
+        article_links = "".join(f'<a href="/football/can/article-{i}-{j}">Article {j}</a>' for j in range(30))
+        pages.append(("le360_listing", f"https://sport.le360.ma/football/can/page/{i}",
+                      f'<html><head><title>CAN</title></head><body>{chrome}<main>{article_links}</main>'
+                      f'<a rel="next" href="/football/can/page/{i + 1}">Suivant</a>{chrome}</body></html>'.encode()))
+        paragraphs = "".join(f"<p>Paragraphe {j} de l'article {i} sur la CAN 2025 au Maroc 🏆 #CAN2025 @FRMF.</p>" for j in range(25))
+        pages.append(("le360_article", f"https://sport.le360.ma/football/can/article-{i}",
+                      f"<html><body>{chrome}<h1>Titre {i} ⚽</h1><article>{paragraphs}</article>{chrome}</body></html>".encode()))
+        rows = "".join(
+            f'<tr><td class="zentriert">{j}</td><td class="hauptlink"><a href="/p/{j}">Joueur {i}-{j}</a></td></tr>' for j in range(26)
+        )
+        pages.append(("transfermarkt_squad", f"https://www.transfermarkt.com/team-{i}/startseite/verein/{i}",
+                      f'<html><body>{chrome}<table class="items"><tbody>{rows}</tbody></table>{chrome}</body></html>'.encode()))
+    return pages
+
+
+def installed_parsers() -> list:
+    parsers = []
+    for name in html_parsing.AVAILABLE_PARSERS:
+        try:
+            BeautifulSoup("", name)
+            parsers.append(name)
+        except FeatureNotFound:
+            logger.info(f"Skipping {name}: not installed.")
+    return parsers
+
+
+def run_configuration(pages: list, parser: str, targeted: bool, repeat: int) -> tuple:
+    """Returns per-page timings, per-page peak memory and the extracted outputs."""
+    html_parsing.configure(parser=parser, targeted=targeted)
+    timings, peaks, outputs = [], [], []
+    for kind, url, content in pages:
+        extract = EXTRACTORS[kind]
+        tracemalloc.start()
+        outputs.append(extract(url, content))
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            extract(url, content)
+            timings.append(time.perf_counter() - start)
+    return timings, peaks, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTML parsing backends and targeted parsing on saved pages.")
+    parser.add_argument("--cache-dir", type=Path, default=config.SCRAPER_CACHE_PATH, help="HTTP cache directory holding the pages.")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic pages of each kind instead of the cache.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per page.")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the result of this run.")
+    args = parser.parse_args()
+
+    pages = synthetic_pages(args.synthetic) if args.synthetic else load_cached_pages(args.cache_dir) if args.cache_dir.exists() else []
+    if not pages:
+        logger.error(f"No cached HTML pages in {args.cache_dir}; run a scraper first or pass --synthetic N.")
+        sys.exit(1)
+    kinds = sorted({kind for kind, _, _ in pages})
+    logger.info(f"Benchmarking {len(pages)} pages ({', '.join(kinds)}) x{args.repeat}...")
+
+    configurations = [REFERENCE] + [(name, targeted) for name in installed_parsers() for targeted in (False, True) if (name, targeted) != REFERENCE]
+    reference_outputs = None
+    results = []
+    for name, targeted in configurations:
+        timings, peaks, outputs = run_configuration(pages, name, targeted, args.repeat)
+        if reference_outputs is None:
+            reference_outputs = outputs
+        mismatches = [url for (_, url, _), output, expected in zip(pages, outputs, reference_outputs) if output != expected]
+        summary = latency_summary(timings)
+        results.append({
+            "parser": name,
+            "targeted": targeted,
+            "seconds_per_page": {key: round(value, 6) if isinstance(value, float) else value for key, value in summary.items()},
+            "peak_memory_bytes_mean": int(sum(peaks) / len(peaks)),
+            "peak_memory_bytes_max": max(peaks),
+            "mismatches": len(mismatches),
+            "mismatched_urls": mismatches[:10],
+        })
+
+    reference_mean = results[0]["seconds_per_page"]["mean"]
+    for result in results:
+        timing = result["seconds_per_page"]
+        logger.info(
+            f"{result['parser']:<12} {'targeted' if result['targeted'] else 'full':<9} "
+            f"mean={timing['mean'] * 1000:7.2f}ms p95={timing['p95'] * 1000:7.2f}ms "
+            f"speedup={reference_mean / timing['mean']:5.2f}x  peak_mem={result['peak_memory_bytes_mean'] / 1024:8.1f}KiB  "
+            f"mismatches={result['mismatches']}"
+        )
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = RESULTS_DIR / f"html_parsers_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({"settings": {**vars(args), "cache_dir": str(args.cache_dir), "pages": len(pages)}, "results": results}, f, indent=2)
+        logger.info(f"Result saved to {output_path}")
+
+if __name__ == "__main__":
+    main()
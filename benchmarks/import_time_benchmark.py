@@ -0,0 +1,129 @@
+"""
+Cold-start import time regression check for the entry points.
+
+Each module below is imported in a fresh interpreter with `python -X importtime`
+(after one warm-up run that writes the bytecode caches), and the median
+cumulative import time over --repeat runs is compared with its budget. The
+run also fails if a module pulls in one of the heavy client libraries it must
+only load on first use (Chroma, the OpenAI/Hugging Face clients, the
+Unstructured loaders, pandas): that catches a stray top-level import even on
+a machine fast enough to stay within the budget.
+
+Budgets are in milliseconds, with a wide margin over a single-core container;
+scale them with --budget-scale on slower runners.
+
+    python benchmarks/import_time_benchmark.py
+    python benchmarks/import_time_benchmark.py --repeat 10 --budget-scale 2
+"""
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Loaded on first use by the ingestion and the chain, never at import time.
+_CLIENT_LIBRARIES = ("chromadb", "langchain_chroma", "langchain_openai", "langchain_huggingface", "openai",
+                     "langchain_community", "unstructured")
+# The ingestion side has no use for pandas either (the UI's Streamlit imports it).
+_INGESTION_FORBIDDEN = _CLIENT_LIBRARIES + ("pandas",)
+
+# (module, entry points that import it, budget in ms, top-level packages it must not import)
+ENTRY_POINTS = [
+    ("src.config", "all", 50, _INGESTION_FORBIDDEN),
+    ("src.ingestion.loader", "ingest.py", 60, _INGESTION_FORBIDDEN),
+    ("src.ingestion.scraper", "scrapers", 500, _INGESTION_FORBIDDEN),
+    ("src.ingestion.processor", "processing", 350, _INGESTION_FORBIDDEN),
+    ("src.ingestion.pipeline", "run_pipeline.py", 600, _INGESTION_FORBIDDEN),
+    ("src.app.chain", "answer_batch.py", 2000, _CLIENT_LIBRARIES),
+    ("src.app.main", "run_app.py", 2500, _CLIENT_LIBRARIES),
+    ("src.api.server", "serve_api.py", 2500, _CLIENT_LIBRARIES),
+]
+
+
+def measure_import(module: str) -> dict:
+    """Imports `module` in a new interpreter; returns its cumulative import time, wall time and imported modules."""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    total_us, imported, children = None, set(), []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name_field = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # Header line.
+        name = name_field.strip()
+        depth = (len(name_field) - len(name_field.lstrip()) - 1) // 2
+        imported.add(name.split(".")[0])
+        if depth == 0 and name == module:
+            total_us = int(cumulative)
+        elif depth == 1:
+            children.append((name, int(cumulative)))
+    return {"import_ms": (total_us or 0) / 1000, "wall_ms": wall * 1000, "imported": imported, "children": children}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the cold-start import time of the entry points against their budgets.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh-interpreter imports per module (the median is kept).")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiplier applied to every budget.")
+    parser.add_argument("--modules", nargs="+", help="Only check these modules.")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the result of this run.")
+    args = parser.parse_args()
+
+    results, failed = [], False
+    for module, used_by, budget_ms, forbidden in ENTRY_POINTS:
+        if args.modules and module not in args.modules:
+            continue
+        measure_import(module)  # Warm-up: bytecode caches and OS file cache.
+        runs = [measure_import(module) for _ in range(args.repeat)]
+        import_ms = statistics.median(run["import_ms"] for run in runs)
+        wall_ms = statistics.median(run["wall_ms"] for run in runs)
+        budget = budget_ms * args.budget_scale
+        leaked = sorted(set(forbidden) & runs[-1]["imported"])
+        heaviest = sorted(runs[-1]["children"], key=lambda child: child[1], reverse=True)[:5]
+        ok = import_ms <= budget and not leaked
+        failed |= not ok
+
+        results.append({
+            "module": module, "used_by": used_by, "import_ms": round(import_ms, 1), "wall_ms": round(wall_ms, 1),
+            "budget_ms": budget, "forbidden_imports": leaked, "ok": ok,
+            "heaviest_imports": [{"module": name, "ms": round(us / 1000, 1)} for name, us in heaviest],
+        })
+        logger.info(f"{'ok  ' if ok else 'FAIL'} {module:<24} import={import_ms:7.1f}ms (budget {budget:6.0f}ms)  "
+                    f"process={wall_ms:7.1f}ms  [{used_by}]")
+        if leaked:
+            logger.error(f"  {module} imports {', '.join(leaked)} at import time.")
+        if import_ms > budget:
+            logger.error(f"  heaviest imports: {', '.join(f'{name} {us / 1000:.0f}ms' for name, us in heaviest)}")
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = RESULTS_DIR / f"import_time_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({"settings": vars(args), "python": sys.version.split()[0], "results": results}, f, indent=2)
+        logger.info(f"Result saved to {output_path}")
+
+    if failed:
+        logger.error("Import time regression: a module exceeds its budget or imports a heavy library eagerly.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
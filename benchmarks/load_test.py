@@ -0,0 +1,187 @@
+"""
+Multi-session load test for the chat pipeline.
+
+Simulates N concurrent multi-turn conversations against the RAGChainManager
+chain, routing each turn with get_query_mode exactly as the app does. The LLM
+and embeddings are the offline models with configurable latency, jitter and
+failure rate, so the harness runs without network access and measures the
+app's own overhead and queueing rather than the remote endpoints.
+
+Concurrency is ramped through the given levels; for each level the harness
+reports throughput, latency percentiles, error rate and memory growth, and it
+stops early once p95 latency exceeds --max-p95.
+
+    python benchmarks/load_test.py --levels 1 8 32 128 --turns 4 --llm-latency 0.8
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import resource
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from src import config
+from src.app.chain import RAGChainManager
+from src.app.llm_pool import CircuitBreaker, LLMEndpointPool, PoolEndpoint
+from src.app.metrics import latency_summary
+from src.app.routing import get_query_mode
+from src.ingestion.loader import split_documents
+from src.offline_models import OfflineChatModel, OfflineEmbeddings
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+# Per-query routing and failover logs would drown the report.
+logging.getLogger("src.app.routing").setLevel(logging.WARNING)
+logging.getLogger("src.app.llm_pool").setLevel(logging.ERROR)
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCHMARK_DIR / "results"
+GOLDEN_SET = BENCHMARK_DIR / "golden" / "can_golden_v1.jsonl"
+
+FOLLOW_UPS = [
+    "Peux-tu résumer cela ?",
+    "Combien de buts ont été marqués ?",
+    "Et pour l'édition précédente ?",
+    "Quels joueurs se sont distingués ?",
+]
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (current on Linux, peak elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def build_vector_store(embeddings) -> InMemoryVectorStore:
+    """Indexes the corpus (or a synthetic one if it is missing) in memory with the offline embeddings."""
+    texts = [path.read_text(encoding='utf-8', errors='ignore') for path in sorted(config.CORPUS_PATH.glob("**/*.txt"))]
+    if not texts:
+        logger.info(f"No corpus found at {config.CORPUS_PATH}; using a synthetic corpus.")
+        texts = [
+            f"Article {i}: la Coupe d'Afrique des Nations {1957 + 2 * (i % 35)} a opposé le Maroc, le Sénégal, "
+            f"l'Égypte et le Nigeria. Le match {i} s'est joué au Stade numéro {i % 9}."
+            for i in range(2000)
+        ]
+    chunks = split_documents([Document(page_content=text) for text in texts], config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+    vector_store = InMemoryVectorStore(embeddings)
+    vector_store.add_documents(chunks)
+    logger.info(f"Indexed {len(chunks)} chunks in memory.")
+    return vector_store
+
+
+def load_questions() -> list:
+    with open(GOLDEN_SET, 'r', encoding='utf-8') as f:
+        return [json.loads(line)["question"] for line in f if line.strip()]
+
+
+async def run_session(chain_manager: RAGChainManager, questions: list, turns: int, think_time: float, rng: random.Random, results: list):
+    """One simulated conversation: a first question followed by follow-ups that carry the history."""
+    chat_history = []
+    for turn in range(turns):
+        query = rng.choice(questions) if turn == 0 else rng.choice(FOLLOW_UPS + questions)
+        mode = get_query_mode(query)
+        start = time.perf_counter()
+        try:
+            answer = await chain_manager.get_rag_chain(mode=mode).ainvoke({"chat_history": chat_history, "input": query})
+            ok = True
+        except Exception as e:
+            answer, ok = f"Désolé, une erreur est survenue: {e}", False
+        results.append((time.perf_counter() - start, ok))
+        chat_history = chat_history + [HumanMessage(content=query), AIMessage(content=answer)]
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+
+
+async def run_level(chain_manager: RAGChainManager, questions: list, sessions: int, turns: int, think_time: float, seed: int) -> dict:
+    results = []
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(chain_manager, questions, turns, think_time, random.Random(seed + i), results)
+        for i in range(sessions)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for latency, ok in results if ok]
+    errors = sum(1 for _, ok in results if not ok)
+    summary = latency_summary(latencies)
+    return {
+        "sessions": sessions,
+        "turns": len(results),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_turns_per_second": round(len(results) / elapsed, 2),
+        "error_rate": round(errors / len(results), 4) if results else 0.0,
+        "latency_seconds": {key: round(value, 4) if isinstance(value, float) else value for key, value in summary.items()},
+        "rss_bytes": current_rss_bytes(),
+        "rss_growth_bytes": current_rss_bytes() - rss_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramp concurrent chat sessions against the RAG chain with offline models.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64, 256], help="Concurrent session counts to ramp through.")
+    parser.add_argument("--turns", type=int, default=4, help="Turns per conversation.")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between turns, in seconds.")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mock LLM latency per call, in seconds.")
+    parser.add_argument("--llm-jitter", type=float, default=0.5, help="Extra uniform random LLM latency, in seconds.")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0, help="Fraction of mock LLM calls that fail.")
+    parser.add_argument("--embedding-latency", type=float, default=0.02, help="Mock query-embedding latency, in seconds.")
+    parser.add_argument("--endpoints", type=int, default=2, help="Number of mock endpoints in the LLM pool.")
+    parser.add_argument("--max-p95", type=float, default=30.0, help="Stop ramping once p95 latency exceeds this, in seconds.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    embeddings = OfflineEmbeddings(size=config.OFFLINE_EMBEDDING_SIZE, latency=args.embedding_latency)
+    llm = LLMEndpointPool(
+        [
+            PoolEndpoint(
+                name=f"mock-{i}",
+                model=OfflineChatModel(latency=args.llm_latency, latency_jitter=args.llm_jitter, failure_rate=args.llm_failure_rate),
+                breaker=CircuitBreaker(config.LLM_CIRCUIT_FAILURE_THRESHOLD, config.LLM_CIRCUIT_RESET_SECONDS),
+            )
+            for i in range(args.endpoints)
+        ],
+        request_timeout=config.LLM_REQUEST_TIMEOUT,
+        initial_hedge_delay=config.LLM_HEDGE_INITIAL_DELAY,
+    )
+    # Embedding the corpus is not part of the measurement, so it runs without the mock latency.
+    vector_store = build_vector_store(OfflineEmbeddings(size=config.OFFLINE_EMBEDDING_SIZE))
+    vector_store.embedding = embeddings
+    chain_manager = RAGChainManager(vector_store=vector_store, llm=llm)
+    questions = load_questions()
+
+    levels = []
+    for sessions in args.levels:
+        level = asyncio.run(run_level(chain_manager, questions, sessions, args.turns, args.think_time, args.seed))
+        levels.append(level)
+        latency = level["latency_seconds"]
+        logger.info(
+            f"{sessions:>5} sessions: {level['throughput_turns_per_second']:>8.2f} turns/s  "
+            f"p50={latency['p50'] or 0:.2f}s p95={latency['p95'] or 0:.2f}s p99={latency['p99'] or 0:.2f}s  "
+            f"errors={level['error_rate']:.1%}  rss={level['rss_bytes'] / 1e6:.0f}MB ({level['rss_growth_bytes'] / 1e6:+.1f}MB)"
+        )
+        if (latency["p95"] or 0) > args.max_p95:
+            logger.warning(f"p95 latency exceeded {args.max_p95}s at {sessions} sessions; stopping the ramp.")
+            break
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = RESULTS_DIR / f"load_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({"settings": vars(args), "levels": levels}, f, indent=2)
+    logger.info(f"Result saved to {output_path}")
+
+if __name__ == "__main__":
+    main()
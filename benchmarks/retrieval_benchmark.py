@@ -0,0 +1,222 @@
+"""
+Retrieval quality and latency benchmark.
+
+Runs every question of a golden set against the current vector store and
+reports recall@k, MRR, query-embedding and search latency percentiles and the
+index size. Each run is saved under benchmarks/results/ together with the
+settings that produced it, and compared with the previous run.
+
+    python benchmarks/retrieval_benchmark.py
+    MODEL_BACKEND=offline python benchmarks/retrieval_benchmark.py --repeat 5
+
+With MODEL_BACKEND=offline it uses the offline embeddings and index, so it
+needs no network access.
+"""
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import time
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src import config
+from src.app.metrics import latency_summary
+from src.app.retrieval import get_vector_store
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_GOLDEN_SET = BENCHMARK_DIR / "golden" / "can_golden_v1.jsonl"
+RESULTS_DIR = BENCHMARK_DIR / "results"
+
+
+def normalize(text: str) -> str:
+    """Lowercases and strips accents so snippets match regardless of spelling variants."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).replace("’", "'")
+
+
+def load_golden_set(path: Path) -> list:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def matches(chunk_text: str, passage: list) -> bool:
+    """True if the chunk contains any of the passage's alternative snippets."""
+    normalized = normalize(chunk_text)
+    return any(normalize(snippet) in normalized for snippet in passage)
+
+
+def score_question(chunks: list, expected: list, ks: list) -> dict:
+    """Computes recall@k for each k and the reciprocal rank of the first relevant chunk."""
+    scores = {}
+    for k in ks:
+        found = sum(1 for passage in expected if any(matches(chunk, passage) for chunk in chunks[:k]))
+        scores[f"recall@{k}"] = found / len(expected)
+    scores["reciprocal_rank"] = 0.0
+    for rank, chunk in enumerate(chunks, start=1):
+        if any(matches(chunk, passage) for passage in expected):
+            scores["reciprocal_rank"] = 1.0 / rank
+            break
+    return scores
+
+
+def index_stats(vector_store) -> dict:
+    """
+    Returns the on-disk size of the index and the number of indexed chunks:
+    the compact index or the snapshot when one is in use, otherwise Chroma's.
+    """
+    manifest = getattr(vector_store, "manifest", None)
+    if manifest is not None and "format_version" in manifest:
+        return {
+            "path": str(vector_store.path),
+            "size_bytes": vector_store.path.stat().st_size,
+            "chunks": len(vector_store),
+            "snapshot_format_version": manifest["format_version"],
+        }
+    if manifest is not None:
+        size_bytes = sum(path.stat().st_size for path in config.COMPRESSED_INDEX_PATH.rglob("*") if path.is_file())
+        return {
+            "path": str(config.COMPRESSED_INDEX_PATH),
+            "size_bytes": size_bytes,
+            "chunks": len(vector_store.documents),
+            "compression": {key: manifest[key] for key in ("method", "dims", "full_dims", "quantized", "recall")},
+        }
+    size_bytes = sum(
+        path.stat().st_size for path in config.CHROMA_DB_PATH.rglob("*")
+        if path.is_file() and config.COMPRESSED_INDEX_PATH not in path.parents
+    )
+    collection = getattr(vector_store, "_collection", None)
+    return {
+        "path": str(config.CHROMA_DB_PATH),
+        "size_bytes": size_bytes,
+        "chunks": collection.count() if collection is not None else None,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(vector_store, golden: list, ks: list, repeat: int) -> dict:
+    """Runs every golden question `repeat` times and aggregates quality and latency."""
+    max_k = max(ks)
+    embeddings = vector_store.embeddings
+    embed_latencies, search_latencies, per_question = [], [], []
+
+    for item in golden:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query_vector = embeddings.embed_query(item["question"])
+            embedded = time.perf_counter()
+            docs = vector_store.similarity_search_by_vector(query_vector, k=max_k)
+            searched = time.perf_counter()
+            embed_latencies.append(embedded - start)
+            search_latencies.append(searched - embedded)
+        scores = score_question([doc.page_content for doc in docs], item["expected"], ks)
+        per_question.append({"id": item["id"], **scores})
+
+    quality = {
+        metric: round(sum(q[metric] for q in per_question) / len(per_question), 4)
+        for metric in [f"recall@{k}" for k in ks]
+    }
+    quality["mrr"] = round(sum(q["reciprocal_rank"] for q in per_question) / len(per_question), 4)
+
+    def rounded(summary):
+        return {key: round(value, 6) if isinstance(value, float) else value for key, value in summary.items()}
+
+    return {
+        "quality": quality,
+        "latency_seconds": {
+            "embed_query": rounded(latency_summary(embed_latencies)),
+            "search": rounded(latency_summary(search_latencies)),
+        },
+        "per_question": per_question,
+    }
+
+
+def previous_result(exclude: Path = None) -> Path:
+    results = sorted(path for path in RESULTS_DIR.glob("retrieval_*.json") if path != exclude)
+    return results[-1] if results else None
+
+
+def compare(current: dict, baseline: dict):
+    """Logs the change of each headline metric against a baseline run."""
+    rows = [(metric, baseline["quality"].get(metric), value) for metric, value in current["quality"].items()]
+    for stage in ("embed_query", "search"):
+        for pct in ("p50", "p95", "p99"):
+            rows.append((f"{stage} {pct} (s)", baseline["latency_seconds"][stage][pct], current["latency_seconds"][stage][pct]))
+    rows.append(("index size (bytes)", baseline["index"]["size_bytes"], current["index"]["size_bytes"]))
+    rows.append(("index chunks", baseline["index"]["chunks"], current["index"]["chunks"]))
+
+    logger.info(f"Comparison with run {baseline['run_id']} ({baseline['settings']}):")
+    for metric, before, after in rows:
+        delta = f"{after - before:+.4g}" if isinstance(before, (int, float)) and isinstance(after, (int, float)) else "n/a"
+        logger.info(f"  {metric:<22} {before!s:>14} -> {after!s:<14} ({delta})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark retrieval quality and latency against a golden set.")
+    parser.add_argument("--golden", type=Path, default=DEFAULT_GOLDEN_SET, help="Golden set JSONL file.")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 10], help="Cut-offs for recall@k.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per question.")
+    parser.add_argument("--compare", type=Path, help="Result file to compare with (default: the previous run).")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the result of this run.")
+    args = parser.parse_args()
+
+    try:
+        vector_store = get_vector_store()
+    except Exception as e:
+        logger.error(f"Could not load the vector store: {e}")
+        sys.exit(1)
+
+    golden = load_golden_set(args.golden)
+    logger.info(f"Running {len(golden)} golden questions x{args.repeat} against {config.CHROMA_DB_PATH}...")
+
+    run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+    result = {
+        "run_id": run_id,
+        "git_revision": git_revision(),
+        "golden_set": args.golden.name,
+        "settings": {
+            "model_backend": config.MODEL_BACKEND,
+            "embedding_model": config.EMBEDDING_MODEL_NAME if config.MODEL_BACKEND != "offline" else "offline",
+            "chunking": config.CHUNKING_STRATEGY,
+            "chunk_size": config.CHUNK_SIZE,
+            "chunk_overlap": config.CHUNK_OVERLAP,
+            "retrieval_k": config.RETRIEVAL_K,
+        },
+        "index": index_stats(vector_store),
+        **run_benchmark(vector_store, golden, sorted(set(args.k)), args.repeat),
+    }
+
+    quality = "  ".join(f"{metric}={value:.3f}" for metric, value in result["quality"].items())
+    search = result["latency_seconds"]["search"]
+    logger.info(f"Quality: {quality}")
+    logger.info(f"Search latency: p50={search['p50'] * 1000:.1f}ms p95={search['p95'] * 1000:.1f}ms p99={search['p99'] * 1000:.1f}ms")
+    logger.info(f"Index: {result['index']['chunks']} chunks, {result['index']['size_bytes'] / 1e6:.1f} MB")
+
+    output_path = RESULTS_DIR / f"retrieval_{run_id}.json"
+    baseline_path = args.compare or previous_result(exclude=output_path)
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            compare(result, json.load(f))
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        logger.info(f"Result saved to {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Sharded ingestion equivalence check and timing.
+
+Builds the vector store from the same corpus once in a single process and
+once per --workers count with the sharded build (src/ingestion/loader.py),
+each into a temporary directory, then compares the collections: same chunk
+IDs, documents, metadata and embeddings. Any difference is reported and the
+run exits with status 1.
+
+The corpus is CORPUS_PATH when it holds files, otherwise a synthetic corpus of
+article records spread over several files, with repeated records so that
+chunk deduplication is exercised across files and shards. The embeddings are
+the offline ones unless MODEL_BACKEND is set explicitly.
+
+    python benchmarks/sharded_ingest_benchmark.py
+    python benchmarks/sharded_ingest_benchmark.py --workers 2 4 8 --synthetic-files 40
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault("MODEL_BACKEND", "offline")
+
+import numpy as np
+
+from src import config
+from src.ingestion import loader
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+WORDS = ("la CAN 2025 au Maroc Sénégal Côte d'Ivoire équipe match but joueur stade sélection Lions de l'Atlas "
+         "l'entraîneur a déclaré qualification finale demi-finale Égypte Nigeria groupe victoire").split(" ")
+
+
+def write_synthetic_corpus(corpus_dir: Path, files: int, records: int, rng: random.Random):
+    """Article records spread over `files` files; about one record in ten is repeated in another file."""
+    written = []
+    for file_index in range(files):
+        entries = []
+        for record_index in range(records):
+            if written and rng.random() < 0.1:
+                entries.append(rng.choice(written))
+                continue
+            body = "\n".join(" ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))) for _ in range(rng.randint(1, 8)))
+            entry = f"Titre de l'article: Article {file_index}-{record_index}\nURL: https://example.org/{file_index}/{record_index}\n{body}\n{'-' * 80}\n"
+            written.append(entry)
+            entries.append(entry)
+        (corpus_dir / f"part_{file_index:03d}.txt").write_text("\n".join(entries), encoding='utf-8')
+
+
+def read_collection(db_path: Path) -> dict:
+    from langchain_chroma import Chroma
+    data = Chroma(persist_directory=str(db_path))._collection.get(include=["documents", "metadatas", "embeddings"])
+    return {
+        chunk_id: (document, metadata, np.asarray(embedding, dtype=np.float32))
+        for chunk_id, document, metadata, embedding in zip(data["ids"], data["documents"], data["metadatas"], data["embeddings"])
+    }
+
+
+def compare(reference: dict, other: dict) -> list:
+    """Differences between two collections, as readable strings."""
+    differences = []
+    if reference.keys() != other.keys():
+        differences.append(f"{len(reference.keys() - other.keys())} chunk IDs missing, {len(other.keys() - reference.keys())} unexpected")
+    for chunk_id in reference.keys() & other.keys():
+        (document, metadata, embedding), (other_document, other_metadata, other_embedding) = reference[chunk_id], other[chunk_id]
+        if document != other_document:
+            differences.append(f"{chunk_id}: document differs")
+        elif metadata != other_metadata:
+            differences.append(f"{chunk_id}: metadata differs ({metadata} != {other_metadata})")
+        elif not np.array_equal(embedding, other_embedding):
+            differences.append(f"{chunk_id}: embedding differs")
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the sharded ingestion builds the same vector store as a single process.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4], help="Worker counts to compare with the single-process build.")
+    parser.add_argument("--synthetic-files", type=int, default=12, help="Files in the synthetic corpus (used when CORPUS_PATH is empty).")
+    parser.add_argument("--synthetic-records", type=int, default=40, help="Article records per synthetic file.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-save", action="store_true", help="Do not store the result of this run.")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="sharded-ingest-"))
+    try:
+        corpus_dir = config.CORPUS_PATH
+        if not corpus_dir.exists() or not any(path.is_file() for path in corpus_dir.rglob("*")):
+            corpus_dir = work_dir / "corpus"
+            corpus_dir.mkdir()
+            write_synthetic_corpus(corpus_dir, args.synthetic_files, args.synthetic_records, random.Random(args.seed))
+        documents = loader.load_documents_from_corpus(corpus_dir)
+        embeddings = loader.get_embeddings_model()
+
+        builds, results, failed = {}, [], False
+        for workers in [1] + [count for count in args.workers if count > 1]:
+            db_path = work_dir / f"chroma_{workers}"
+            start = time.perf_counter()
+            loader.setup_chroma_db(documents, embeddings, db_path, workers=workers)
+            seconds = time.perf_counter() - start
+            builds[workers] = read_collection(db_path)
+            differences = compare(builds[1], builds[workers]) if workers > 1 else []
+            failed |= bool(differences)
+            results.append({"workers": workers, "seconds": round(seconds, 3), "chunks": len(builds[workers]),
+                            "differences": len(differences), "difference_examples": differences[:5]})
+            logger.info(f"workers={workers:<3} {seconds:8.2f}s  chunks={len(builds[workers]):<6} "
+                        f"speedup={results[0]['seconds'] / seconds:4.2f}x  differences={len(differences)}")
+            for difference in differences[:5]:
+                logger.error(f"  {difference}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = RESULTS_DIR / f"sharded_ingest_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({"settings": {**vars(args), "model_backend": config.MODEL_BACKEND, "documents": len(documents),
+                                    "cpu_count": os.cpu_count()}, "results": results}, f, indent=2)
+        logger.info(f"Result saved to {output_path}")
+
+    if failed:
+        logger.error("The sharded build differs from the single-process build.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
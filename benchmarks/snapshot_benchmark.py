@@ -0,0 +1,202 @@
+"""
+Index snapshot check and cold-start timing.
+
+Builds a vector store in a temporary directory (from CORPUS_PATH when it holds
+files, otherwise from synthetic article records), exports its snapshot
+(src/ingestion/snapshot.py) and checks that:
+
+- searching the snapshot returns the same chunks, in the same order, as an
+  exact search over the embeddings stored in Chroma, with the same texts and
+  metadata (Chroma's own HNSW results are reported for reference);
+- the vectors are read in place from the mapping, not copied;
+- a corrupted payload fails the checksum and a foreign format version is refused.
+
+It then times, in fresh interpreters, the cold start of a replica (imports,
+opening the index and the first search) with Chroma and with the snapshot.
+Any failed check exits with status 1.
+
+    python benchmarks/snapshot_benchmark.py
+    python benchmarks/snapshot_benchmark.py --synthetic-records 5000 --repeat 5
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault("MODEL_BACKEND", "offline")
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src import config
+from src.ingestion import loader
+from src.ingestion.compression import exact_search
+from src.ingestion.snapshot import SnapshotError, SnapshotVectorStore, export_snapshot, verify_snapshot
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+WORDS = ("la CAN 2025 au Maroc Sénégal Côte d'Ivoire équipe match but joueur stade sélection Lions de l'Atlas "
+         "l'entraîneur a déclaré qualification finale demi-finale Égypte Nigeria groupe victoire").split(" ")
+
+# Run in a fresh interpreter: import, open the index, embed and search one query.
+_COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from src.ingestion.loader import get_embeddings_model
+embeddings = get_embeddings_model()
+if {snapshot!r}:
+    from src.ingestion.snapshot import SnapshotVectorStore as open_store
+else:
+    from langchain_chroma import Chroma
+    open_store = lambda path, embeddings: Chroma(persist_directory=path, embedding_function=embeddings)
+imported = time.perf_counter()
+store = open_store({path!r}, embeddings)
+opened = time.perf_counter()
+store.similarity_search("Qui a gagné la finale de la CAN ?", k=4)
+searched = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - start) * 1000, "open_ms": (opened - imported) * 1000,
+                  "first_query_ms": (searched - opened) * 1000, "total_ms": (searched - start) * 1000}}))
+"""
+
+
+def synthetic_documents(records: int, rng: random.Random) -> list:
+    return [
+        Document(page_content=f"Titre de l'article: Article {i}\n" + " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 150))),
+                 metadata={"source": f"synthetic/{i // 100:03d}.txt"})
+        for i in range(records)
+    ]
+
+
+def cold_start(path: Path, snapshot: bool, repeat: int) -> dict:
+    script = _COLD_START.format(root=str(PROJECT_ROOT), snapshot=snapshot, path=str(path))
+    runs = []
+    for _ in range(repeat + 1):  # The first run warms the bytecode and file caches.
+        completed = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                                   env={**os.environ, "MODEL_BACKEND": config.MODEL_BACKEND})
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr[-2000:])
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {key: round(statistics.median(run[key] for run in runs[1:]), 1) for key in runs[0]}
+
+
+def check_search(store: SnapshotVectorStore, chroma, queries: list, k: int) -> dict:
+    data = chroma._collection.get(include=["embeddings", "documents", "metadatas"])
+    embeddings = np.asarray(data["embeddings"], dtype=np.float32)
+    query_vectors = np.asarray(store.embeddings.embed_documents(queries), dtype=np.float32)
+    exact = exact_search(embeddings, query_vectors, k)
+    mismatches, chroma_overlap = [], []
+    for query, vector, expected in zip(queries, query_vectors, exact.tolist()):
+        found = store.similarity_search_by_vector(vector.tolist(), k=k)
+        expected_ids = [data["ids"][i] for i in expected]
+        if [doc.id for doc in found] != expected_ids:
+            mismatches.append(f"{query!r}: {[doc.id for doc in found]} != {expected_ids}")
+        for doc, i in zip(found, expected):
+            if doc.page_content != data["documents"][i] or doc.metadata != (data["metadatas"][i] or {}):
+                mismatches.append(f"{query!r}: content of {doc.id} differs")
+        hnsw = [doc.id for doc in chroma.similarity_search_by_vector(vector.tolist(), k=k)]
+        chroma_overlap.append(len(set(hnsw) & set(expected_ids)) / k)
+    return {"mismatches": mismatches, "chroma_overlap": round(float(np.mean(chroma_overlap)), 4)}
+
+
+def check_integrity(path: Path, work_dir: Path) -> list:
+    """Problems found with the corruption and version checks (none expected)."""
+    problems = []
+    store = SnapshotVectorStore(path, None)
+    if store.index.vectors.flags.owndata or store.index.vectors.flags.writeable:
+        problems.append("the vectors were copied out of the mapping")
+    payload_offset = store.manifest["payload_offset"]
+
+    corrupted = work_dir / "corrupted.snapshot"
+    content = bytearray(path.read_bytes())
+    content[payload_offset + 5] ^= 0xFF
+    corrupted.write_bytes(content)
+    if verify_snapshot(corrupted):
+        problems.append("a corrupted payload passed the checksum")
+
+    content = bytearray(path.read_bytes())
+    struct.pack_into("<I", content, 8, 99)
+    corrupted.write_bytes(content)
+    try:
+        SnapshotVectorStore(corrupted, None)
+        problems.append("a snapshot with an unknown format version was opened")
+    except SnapshotError:
+        pass
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the index snapshot against Chroma and time replica cold starts.")
+    parser.add_argument("--synthetic-records", type=int, default=2000, help="Chunks in the synthetic corpus (used when CORPUS_PATH is empty).")
+    parser.add_argument("--queries", type=int, default=50, help="Search queries compared with an exact search.")
+    parser.add_argument("--k", type=int, default=config.RETRIEVAL_K)
+    parser.add_argument("--repeat", type=int, default=3, help="Cold starts per index (the median is kept).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-save", action="store_true", help="Do not store the result of this run.")
+    args = parser.parse_args()
+
+    from langchain_chroma import Chroma
+
+    rng = random.Random(args.seed)
+    work_dir = Path(tempfile.mkdtemp(prefix="index-snapshot-"))
+    try:
+        corpus_dir = config.CORPUS_PATH
+        if corpus_dir.exists() and any(path.is_file() for path in corpus_dir.rglob("*")):
+            documents = loader.load_documents_from_corpus(corpus_dir)
+        else:
+            documents = synthetic_documents(args.synthetic_records, rng)
+        db_path, snapshot_path = work_dir / "chroma", work_dir / "index.snapshot"
+        embeddings = loader.get_embeddings_model()
+        chroma = loader.setup_chroma_db(documents, embeddings, db_path, workers=1)
+        manifest = export_snapshot(chroma, snapshot_path)
+
+        store = SnapshotVectorStore(snapshot_path, embeddings)
+        queries = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 10))) for _ in range(args.queries)]
+        search = check_search(store, Chroma(persist_directory=str(db_path), embedding_function=embeddings), queries, args.k)
+        problems = search["mismatches"] + check_integrity(snapshot_path, work_dir)
+
+        timings = {"chroma": cold_start(db_path, snapshot=False, repeat=args.repeat),
+                   "snapshot": cold_start(snapshot_path, snapshot=True, repeat=args.repeat)}
+        sizes = {"chroma_bytes": sum(path.stat().st_size for path in db_path.rglob("*") if path.is_file()),
+                 "snapshot_bytes": snapshot_path.stat().st_size}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for name, timing in timings.items():
+        logger.info(f"{name:<9} imports={timing['import_ms']:7.1f}ms  open={timing['open_ms']:7.1f}ms  "
+                    f"first query={timing['first_query_ms']:7.1f}ms  total={timing['total_ms']:7.1f}ms")
+    logger.info(f"{manifest['count']} chunks, Chroma {sizes['chroma_bytes'] / 1e6:.1f} MB, snapshot {sizes['snapshot_bytes'] / 1e6:.1f} MB; "
+                f"Chroma HNSW overlap with exact search {search['chroma_overlap']:.3f}")
+    for problem in problems[:10]:
+        logger.error(f"  {problem}")
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = RESULTS_DIR / f"index_snapshot_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({"settings": {**vars(args), "model_backend": config.MODEL_BACKEND, "chunks": manifest["count"]},
+                       "cold_start": timings, "sizes": sizes, "chroma_overlap": search["chroma_overlap"],
+                       "problems": problems}, f, indent=2)
+        logger.info(f"Result saved to {output_path}")
+
+    if problems:
+        logger.error("The index snapshot check failed.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
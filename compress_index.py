@@ -0,0 +1,75 @@
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add the 'src' directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from src import config
+
+# Ensure log directory exists
+log_dir = Path(__file__).resolve().parent / "logs"
+log_dir.mkdir(parents=True, exist_ok=True)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    handlers=[
+        logging.FileHandler(log_dir / "ingestion.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUESTIONS = Path(__file__).resolve().parent / "benchmarks" / "golden" / "can_golden_v1.jsonl"
+
+def main():
+    """
+    Builds the compact (reduced, optionally int8) index of the existing vector
+    store and activates it if its recall@k against the full-precision index
+    reaches the minimum. Real questions, when available, are part of the check.
+    """
+    parser = argparse.ArgumentParser(description="Compress the vector store's embeddings behind a recall check.")
+    parser.add_argument("--method", choices=["pca", "random"], default=config.INDEX_COMPRESSION if config.INDEX_COMPRESSION != "none" else "pca")
+    parser.add_argument("--dims", type=int, default=config.INDEX_COMPRESSION_DIMS, help="Dimensions kept.")
+    parser.add_argument("--no-quantize", action="store_true", help="Keep float32 values instead of int8.")
+    parser.add_argument("--min-recall", type=float, default=config.INDEX_COMPRESSION_MIN_RECALL)
+    parser.add_argument("--k", type=int, default=config.RETRIEVAL_K, help="Cut-off of the recall check.")
+    parser.add_argument("--questions", type=Path, default=DEFAULT_QUESTIONS, help="JSONL file of {\"question\": ...} used as extra queries.")
+    args = parser.parse_args()
+
+    try:
+        config.check_environment_variables()
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        sys.exit(1)
+
+    if not config.CHROMA_DB_PATH.exists() or not any(config.CHROMA_DB_PATH.iterdir()):
+        logger.error(f"No vector store at {config.CHROMA_DB_PATH}. Run 'python ingest.py' first.")
+        sys.exit(1)
+
+    from langchain_chroma import Chroma
+    from src.ingestion.compression import compress_vector_store
+    from src.ingestion.loader import get_embeddings_model
+
+    questions = []
+    if args.questions and args.questions.exists():
+        with open(args.questions, 'r', encoding='utf-8') as f:
+            questions = [json.loads(line)["question"] for line in f if line.strip()]
+
+    vectorstore = Chroma(persist_directory=str(config.CHROMA_DB_PATH), embedding_function=get_embeddings_model())
+    report = compress_vector_store(
+        vectorstore, config.COMPRESSED_INDEX_PATH,
+        method=args.method, dims=args.dims, quantized=not args.no_quantize,
+        k=args.k, min_recall=args.min_recall, questions=questions,
+    )
+    logger.info(f"Report: {json.dumps(report)}")
+    if not report.get("active"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,17 @@ sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
 from src.ingestion import loader
 from src import config
 
+# Ensure log directory exists
+log_dir = Path(__file__).resolve().parent / "logs"
+log_dir.mkdir(parents=True, exist_ok=True)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S',
     handlers=[
-        logging.FileHandler(Path(__file__).resolve().parent / "logs" / "ingestion.log"),
+        logging.FileHandler(log_dir / "ingestion.log"),
         logging.StreamHandler(sys.stdout)
     ]
 )
@@ -24,7 +28,8 @@ def main():
     """
     Main function to run the data ingestion pipeline.
     This script loads documents directly from the 'data/corpus' directory,
-    creates embeddings, and stores them in the ChromaDB vector store.
+    creates embeddings, and stores them in the ChromaDB vector store, then
+    exports the single-file index snapshot the app replicas load.
     """
     logger.info("Starting the simplified data ingestion pipeline...")
 
@@ -35,10 +40,6 @@ def main():
         logger.error(f"Configuration error: {e}")
         sys.exit(1) # Exit if configuration is missing
 
-    # Ensure log directory exists
-    log_dir = Path(__file__).resolve().parent / "logs"
-    log_dir.mkdir(parents=True, exist_ok=True)
-    
     # --- Ingest into Vector Store ---
     logger.info(f"Loading documents from '{config.CORPUS_PATH}' and ingesting into the vector store...")
     loader.ingest_pipeline()
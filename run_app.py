@@ -8,13 +8,17 @@ sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
 from src.app.main import main_streamlit_app
 from src import config # Import config from src
 
+# Ensure log directory exists
+log_dir = Path(__file__).resolve().parent / "logs"
+log_dir.mkdir(parents=True, exist_ok=True)
+
 # Configure logging for the application
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S',
     handlers=[
-        logging.FileHandler(Path(__file__).resolve().parent / "logs" / "application.log"),
+        logging.FileHandler(log_dir / "application.log"),
         logging.StreamHandler(sys.stdout)
     ]
 )
@@ -29,9 +33,6 @@ if __name__ == "__main__":
     2. It launches the main Streamlit application function.
     """
     logger.info("Starting Streamlit RAG application...")
-    # Ensure log directory exists
-    log_dir = Path(__file__).resolve().parent / "logs"
-    log_dir.mkdir(parents=True, exist_ok=True)
 
     try:
         # Check for environment variables before launching the app
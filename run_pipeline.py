@@ -0,0 +1,63 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add the 'src' directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from src.ingestion.pipeline import PipelineRunner, build_can_pipeline
+from src import config
+
+# Ensure log directory exists
+log_dir = Path(__file__).resolve().parent / "logs"
+log_dir.mkdir(parents=True, exist_ok=True)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    handlers=[
+        logging.FileHandler(log_dir / "pipeline.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+def main():
+    """
+    Runs the whole data pipeline (scrape -> process -> ingest), redoing only
+    the stages whose inputs changed since their last successful run.
+    """
+    parser = argparse.ArgumentParser(description="Run the cached scrape -> process -> ingest pipeline.")
+    parser.add_argument("--force", action="store_true", help="Run every stage even if its inputs are unchanged.")
+    parser.add_argument("--skip-scrape", action="store_true", help="Do not run the scrapers; process the existing raw files.")
+    parser.add_argument("--list", action="store_true", help="List the stages and their dependencies, then exit.")
+    args = parser.parse_args()
+
+    runner = PipelineRunner(build_can_pipeline())
+    if args.list:
+        for name, dependencies in runner.dependencies.items():
+            source = "(source)" if runner.stages[name].always_run else "(no dependencies)"
+            print(f"{name:<24} <- {', '.join(sorted(dependencies)) or source}")
+        return
+
+    try:
+        config.check_environment_variables()
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        sys.exit(1)
+
+    logger.info("Starting the data pipeline...")
+    outcomes = runner.run(force=args.force, skip_sources=args.skip_scrape)
+    for name, outcome in outcomes.items():
+        logger.info(f"  {name:<24} {outcome}")
+
+    if any(outcome.startswith(("failed", "blocked")) for outcome in outcomes.values()):
+        logger.error("Data pipeline finished with failures.")
+        sys.exit(1)
+    logger.info("Data pipeline finished successfully!")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import os
-import requests
-from bs4 import BeautifulSoup
-import time
+import asyncio
+from bs4 import SoupStrainer
+
+from src.ingestion.fetcher import AsyncFetcher, fetch_sync
+from src.ingestion.html_parsing import parse_html
 
 BASE_URL = "https://sport.le360.ma"
 CAN_PAGE = "https://sport.le360.ma/football/can/"
@@ -13,8 +15,10 @@ output_dir = "CAN_Data/le360_articles"
 os.makedirs(output_dir, exist_ok=True)
 
 # 1) récupérer les liens des articles CAN
-resp = requests.get(CAN_PAGE, headers=headers)
-soup = BeautifulSoup(resp.text, "html.parser")
+# (via le fetcher partagé : cache HTTP sur disque et limites de débit par site)
+resp = fetch_sync(CAN_PAGE, headers=headers)
+# (seuls les liens sont analysés)
+soup = parse_html(resp.text, parse_only=SoupStrainer("a", href=True))
 
 # extraire les liens relatifs vers les articles
 links = set()
@@ -27,11 +31,19 @@ for a in soup.find_all("a", href=True):
 
 print(f"{len(links)} liens trouvés")
 
-# 2) télécharger chaque article
-for i, link in enumerate(links):
+# 2) télécharger les articles (en parallèle, dans la limite de débit du site)
+async def fetch_articles(urls):
+    async with AsyncFetcher(headers=headers) as fetcher:
+        return await fetcher.fetch_all(urls)
+
+links = sorted(links)
+responses = asyncio.run(fetch_articles(links))
+
+for i, (link, r) in enumerate(zip(links, responses)):
     try:
-        r = requests.get(link, headers=headers)
-        article_soup = BeautifulSoup(r.text, "html.parser")
+        if isinstance(r, Exception):
+            raise r
+        article_soup = parse_html(r.text, parse_only=SoupStrainer(["h1", "p"]))
 
         # titre et texte principal
         title_tag = article_soup.find("h1")
@@ -51,7 +63,5 @@ for i, link in enumerate(links):
 
         print(f"✔ [{i+1}] {title}")
 
-        time.sleep(1)
-
     except Exception as e:
         print("❌ erreur:", e)
@@ -0,0 +1,43 @@
+import logging
+import sys
+from pathlib import Path
+
+# Add the 'src' directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+import uvicorn
+
+from src import config
+
+# Ensure log directory exists
+log_dir = Path(__file__).resolve().parent / "logs"
+log_dir.mkdir(parents=True, exist_ok=True)
+
+# Configure logging for the API service
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    handlers=[
+        logging.FileHandler(log_dir / "api.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    """
+    Entry point for the standalone assistant HTTP API.
+
+    Runs API_WORKERS uvicorn worker processes on API_HOST:API_PORT. Set
+    MODEL_BACKEND=offline (after building the offline index with
+    'MODEL_BACKEND=offline python ingest.py') to try it locally without API keys.
+    """
+    try:
+        config.check_environment_variables()
+    except ValueError as e:
+        logger.error(f"Failed to start API due to configuration error: {e}")
+        sys.exit(1)
+
+    logger.info(f"Starting assistant API on {config.API_HOST}:{config.API_PORT} with {config.API_WORKERS} worker(s)...")
+    uvicorn.run("src.api.server:app", host=config.API_HOST, port=config.API_PORT, workers=config.API_WORKERS)
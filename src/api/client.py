@@ -0,0 +1,36 @@
+import logging
+from typing import Iterator, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class AssistantAPIClient:
+    """Minimal client for the assistant HTTP API (see src/api/server.py)."""
+
+    def __init__(self, base_url: str, timeout: float = 60.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        # A Session keeps the connection to the API alive across questions.
+        self.session = requests.Session()
+
+    def _payload(self, question: str, chat_history: Optional[list], mode: Optional[str]) -> dict:
+        payload = {"question": question, "chat_history": chat_history or []}
+        if mode:
+            payload["mode"] = mode
+        return payload
+
+    def ask(self, question: str, chat_history: Optional[list] = None, mode: Optional[str] = None) -> dict:
+        """Returns the API's JSON answer: {"answer", "mode", "latency_seconds"}."""
+        response = self.session.post(f"{self.base_url}/ask", json=self._payload(question, chat_history, mode), timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def stream(self, question: str, chat_history: Optional[list] = None, mode: Optional[str] = None) -> Iterator[str]:
+        """Yields the answer text incrementally as the API streams it."""
+        with self.session.post(f"{self.base_url}/ask/stream", json=self._payload(question, chat_history, mode), timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+                if chunk:
+                    yield chunk
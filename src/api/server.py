@@ -0,0 +1,165 @@
+"""
+Standalone asynchronous HTTP API for the CAN assistant.
+
+Each worker process loads one RAGChainManager (and so one vector store and one
+LLM pool) at startup and shares it across all requests. Admission control bounds
+the number of requests answered concurrently and the number allowed to wait for
+a slot; beyond that, requests are rejected with 503 so clients back off instead
+of piling up behind a slow LLM.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field
+
+from src import config
+from src.app.chain import get_chain_manager, history_to_messages
+from src.app.routing import get_query_mode
+from src.app.tracing import LatencyTracer
+
+logger = logging.getLogger(__name__)
+
+
+# --- Request / Response Models ---
+class ChatMessage(BaseModel):
+    role: Literal["user", "assistant"]
+    content: str
+
+
+class AskRequest(BaseModel):
+    question: str = Field(min_length=1)
+    chat_history: List[ChatMessage] = Field(default_factory=list)
+    mode: Optional[Literal["default", "summary", "stats"]] = None
+
+
+class AskResponse(BaseModel):
+    answer: str
+    mode: str
+    latency_seconds: float
+    trace_id: str
+
+
+# --- Admission Control ---
+class AdmissionController:
+    """
+    Bounds in-flight requests to `max_concurrency` and waiting requests to
+    `max_queue`. Requests that cannot be admitted, or that wait longer than
+    `queue_timeout` seconds, are rejected with 503.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self.in_flight = 0
+
+    async def acquire(self):
+        if self.in_flight + self.waiting >= self.max_concurrency + self.max_queue:
+            raise HTTPException(status_code=503, detail="Server busy, please retry shortly.", headers={"Retry-After": "1"})
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Timed out waiting for a free worker slot.", headers={"Retry-After": "1"})
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+# --- Application ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the vector store and LLM pool once per worker, before serving traffic.
+    app.state.chain_manager = await asyncio.to_thread(get_chain_manager)
+    app.state.admission = AdmissionController(config.API_MAX_CONCURRENCY, config.API_MAX_QUEUE, config.API_QUEUE_TIMEOUT)
+    logger.info(f"Assistant API ready (max_concurrency={config.API_MAX_CONCURRENCY}, max_queue={config.API_MAX_QUEUE}).")
+    yield
+
+
+app = FastAPI(title="CAN Assistant API", lifespan=lifespan)
+
+
+def _chain_input(request: AskRequest) -> dict:
+    return {
+        "chat_history": history_to_messages([message.model_dump() for message in request.chat_history]),
+        "input": request.question,
+    }
+
+
+@app.get("/health")
+async def health():
+    """Liveness and load information for this worker."""
+    admission = app.state.admission
+    return {"status": "ok", "in_flight": admission.in_flight, "waiting": admission.waiting}
+
+
+@app.post("/ask", response_model=AskResponse)
+async def ask(request: AskRequest):
+    """Answers one question and returns the complete answer."""
+    mode = request.mode or get_query_mode(request.question)
+    admission = app.state.admission
+    await admission.acquire()
+    try:
+        start = time.perf_counter()
+        rag_chain = app.state.chain_manager.get_rag_chain(mode=mode)
+        tracer = LatencyTracer(mode=mode, source="api")
+        answer = await rag_chain.ainvoke(_chain_input(request), config={"callbacks": [tracer]})
+        return AskResponse(answer=answer, mode=mode, latency_seconds=round(time.perf_counter() - start, 4), trace_id=tracer.trace_id)
+    except Exception as e:
+        logger.error(f"Error while invoking RAG chain: {e}", exc_info=True)
+        raise HTTPException(status_code=502, detail=f"Error while generating the answer: {e}")
+    finally:
+        admission.release()
+
+
+@app.post("/ask/stream")
+async def ask_stream(request: AskRequest):
+    """Answers one question, streaming the answer text as it is generated."""
+    mode = request.mode or get_query_mode(request.question)
+    # Built before taking an admission slot: a failure here must not leak one.
+    try:
+        rag_chain = app.state.chain_manager.get_rag_chain(mode=mode)
+    except Exception as e:
+        logger.error(f"Error while building RAG chain: {e}", exc_info=True)
+        raise HTTPException(status_code=502, detail=f"Error while generating the answer: {e}")
+    admission = app.state.admission
+    await admission.acquire()
+    tracer = LatencyTracer(mode=mode, source="api")
+    released = False
+
+    def release_once():
+        # Called when the stream ends and again once the response is done, so the
+        # slot is freed even if the client disconnects before streaming starts.
+        nonlocal released
+        if not released:
+            released = True
+            admission.release()
+
+    async def generate():
+        try:
+            async for chunk in rag_chain.astream(_chain_input(request), config={"callbacks": [tracer]}):
+                yield chunk
+        except Exception as e:
+            logger.error(f"Error while streaming RAG chain: {e}", exc_info=True)
+            yield f"\n[Erreur: {e}]"
+        finally:
+            release_once()
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/plain; charset=utf-8",
+        headers={"X-Query-Mode": mode, "X-Trace-Id": tracer.trace_id},
+        background=BackgroundTask(release_once),
+    )
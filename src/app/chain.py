@@ -1,43 +1,90 @@
 import logging
-import streamlit as st
+import threading
+import time
+from functools import lru_cache
 from operator import itemgetter
 
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 
+from src import config
 from src.app import prompts, llm_services
+from src.app.context_compression import ContextCompressor
+from src.app.entities import get_entity_index
 from src.app.retrieval import get_vector_store
+from src.app.routing import QueryRouter
+from src.app.tracing import SPAN_ATTRIBUTES_KEY
 
 logger = logging.getLogger(__name__)
 
+def history_to_messages(chat_history: list) -> list:
+    """
+    Converts a serialized chat history, a list of
+    {"role": "user"|"assistant", "content": ...} dicts, into LangChain messages.
+    """
+    return [
+        HumanMessage(content=message["content"]) if message["role"] == "user" else AIMessage(content=message["content"])
+        for message in chat_history
+    ]
+
+def messages_to_history(messages: list) -> list:
+    """Inverse of history_to_messages: serializes LangChain messages to role/content dicts."""
+    return [
+        {"role": "user" if isinstance(message, HumanMessage) else "assistant", "content": message.content}
+        for message in messages
+    ]
+
 class RAGChainManager:
     """
     A manager class to encapsulate the creation and management of the RAG chain
     using the LangChain Expression Language (LCEL).
+
+    It has no UI dependencies: the Streamlit app, the HTTP API and the command-line
+    tools all share one instance per process. Chains are built once per mode.
     """
 
-    def __init__(self):
-        """Initializes the RAGChainManager by loading the vector store."""
-        with st.spinner("Chargement de la base de connaissances vectorielle..."):
-            self.vector_store = get_vector_store()
-        if self.vector_store is None:
-            st.error("La base de connaissances vectorielle n'a pas pu être chargée. L'application ne peut pas démarrer.")
-            st.stop()
+    def __init__(self, vector_store=None, llm=None, entity_index=None, context_compressor=None, query_router=None):
+        """
+        Initializes the RAGChainManager by loading the vector store. A vector store,
+        LLM, entity index, context compressor or query router passed in (e.g.
+        offline mocks) replaces the configured one.
+        """
+        self.vector_store = vector_store if vector_store is not None else get_vector_store()
+        self.llm = llm
+        if entity_index is None and config.ENTITY_ROUTING_ENABLED:
+            entity_index = get_entity_index()
+        self.entity_index = entity_index
+        if context_compressor is None and config.CONTEXT_COMPRESSION_ENABLED:
+            context_compressor = ContextCompressor(config.CONTEXT_COMPRESSION_BUDGET, config.CONTEXT_COMPRESSION_NEIGHBORS)
+        self.context_compressor = context_compressor
+        if query_router is None and config.INTENT_ROUTING_ENABLED:
+            query_router = QueryRouter()
+        self.query_router = query_router
+        self._chains = {}
+        self._lock = threading.Lock()
 
     def get_rag_chain(self, mode: str = "default"):
         """
-        Main method to construct and return the complete, end-to-end RAG chain using LCEL.
+        Returns the complete, end-to-end RAG chain for `mode`, building it on first use.
+        """
+        with self._lock:
+            if mode not in self._chains:
+                self._chains[mode] = self._build_rag_chain(mode)
+            return self._chains[mode]
+
+    def _build_rag_chain(self, mode: str):
+        """
+        Main method to construct the complete, end-to-end RAG chain using LCEL.
         It dynamically selects the prompt.
         """
         logger.info(f"Constructing LCEL RAG chain with mode='{mode}'")
 
         try:
-            llm = llm_services.get_huggingface_chat_llm()
+            llm = self.llm or llm_services.get_huggingface_chat_llm()
         except Exception as e:
             logger.error(f"Failed to initialize LLM: {e}")
-            st.error(f"Erreur d'initialisation du modèle de langue (LLM): {e}")
-            st.stop()
-            return None
+            raise
 
         # --- 1. History-Aware Standalone Question Chain ---
         # This chain takes the user's input and chat history, and formulates a
@@ -54,13 +101,58 @@ class RAGChainManager:
             if input_dict.get("chat_history"):
                 return contextualize_q_chain
             else:
-                return itemgetter("input")
+                return input_dict["input"]
 
         # --- 2. Document Retrieval and Formatting ---
-        retriever = self.vector_store.as_retriever()
-        
-        def format_docs(docs):
-            return "\n\n".join(doc.page_content for doc in docs)
+        # Query embedding and vector search are separate steps (instead of
+        # vector_store.as_retriever()) so each can be timed on its own.
+        embeddings = self.vector_store.embeddings
+        k = config.RETRIEVAL_K_BY_MODE.get(mode, config.RETRIEVAL_K)
+
+        def search(embedding):
+            return self.vector_store.similarity_search_by_vector(embedding, k=k)
+
+        async def asearch(embedding):
+            return await self.vector_store.asimilarity_search_by_vector(embedding, k=k)
+
+        # Teams and players named in the question are looked up in the entity
+        # index: the query gets their other names (the squads are indexed under
+        # their English names, the articles use the French ones) and their
+        # records are put first in the context.
+        entities = self.entity_index
+
+        def expand_query(question):
+            if entities is None:
+                return {"query": question, "facts": ""}
+            return {"query": entities.expand_query(question), "facts": entities.facts(question)}
+
+        # The retrieved chunks are cut down to the sentences that match the
+        # question before they reach the prompt; summaries keep whole chunks.
+        compressor = self.context_compressor if mode in config.CONTEXT_COMPRESSION_MODES else None
+
+        def compress_context(inputs):
+            start = time.perf_counter()
+            docs, stats = compressor.compress(inputs["query"], inputs["docs"])
+            logger.info(f"Context compressed: {stats['context_chars_in']} -> {stats['context_chars_out']} chars "
+                        f"(~{stats.get('estimated_tokens_saved', 0)} tokens saved) in {(time.perf_counter() - start) * 1000:.1f}ms.")
+            return {**inputs, "docs": docs, SPAN_ATTRIBUTES_KEY: stats}
+
+        def format_context(inputs):
+            parts = [inputs["facts"]] if inputs["facts"] else []
+            return "\n\n".join(parts + [doc.page_content for doc in inputs["docs"]])
+
+        retrieve_context = (
+            RunnableLambda(get_standalone_question).with_config(run_name="rephrase")
+            | RunnableLambda(expand_query).with_config(run_name="expand_query")
+            | RunnablePassthrough.assign(docs=(
+                itemgetter("query")
+                | RunnableLambda(embeddings.embed_query, afunc=embeddings.aembed_query).with_config(run_name="embed_query")
+                | RunnableLambda(search, afunc=asearch).with_config(run_name="vector_search")
+            ))
+        )
+        if compressor is not None:
+            retrieve_context = retrieve_context | RunnableLambda(compress_context).with_config(run_name="compress_context")
+        retrieve_context = retrieve_context | RunnableLambda(format_context).with_config(run_name="format_context")
 
         # --- 3. Final Answer Generation Chain Assembly (LCEL) ---
         # Get the appropriate prompt template for the final answer.
@@ -70,26 +162,73 @@ class RAGChainManager:
         rag_chain = (
             RunnablePassthrough.assign(
                 # The 'context' is generated here. First, a standalone question is created.
-                # That question is then passed to the retriever. The retrieved docs are
-                # then formatted into a string.
-                context=RunnableLambda(get_standalone_question) | retriever | format_docs
+                # That question is then embedded and used to search the vector store.
+                # The retrieved docs are then formatted into a string.
+                context=retrieve_context
             )
             # The dictionary now contains 'input', 'chat_history', and 'context'.
-            # This is piped into our final prompt.
-            | qa_prompt
-            # The formatted prompt is piped into the LLM.
-            | llm
+            # This is piped into our final prompt, and the formatted prompt into the LLM.
+            | (qa_prompt | llm).with_config(run_name="generate")
             # The LLM's output is parsed into a string.
             | StrOutputParser()
         )
-        
-        logger.info("Complete LCEL RAG chain constructed successfully.")
-        return rag_chain
 
-@st.cache_resource
+        router = self.query_router
+        if router is not None:
+            # The full chain's duration is what a templated reply saves.
+            rag_chain = rag_chain.with_listeners(
+                on_end=lambda run: router.record_full_request((run.end_time - run.start_time).total_seconds())
+            )
+
+        chain = rag_chain
+        if entities is not None:
+            chain = self._with_entity_routing(rag_chain, entities)
+        if router is not None:
+            chain = self._with_intent_routing(chain, router, mode, k)
+        logger.info(f"Complete LCEL RAG chain constructed successfully (k={k}).")
+        return chain
+
+    def _with_entity_routing(self, rag_chain, entities):
+        # --- 4. Entity Routing ---
+        # Roster and player questions the index settles on its own are answered
+        # from it, skipping retrieval and the LLM; the others go to the RAG chain.
+        def lookup(input_dict):
+            return entities.direct_answer(input_dict["input"])
+
+        def route(input_dict):
+            if input_dict["entity_answer"] is None:
+                return rag_chain
+            logger.info("Question answered from the entity index.")
+            return input_dict["entity_answer"]
+
+        return (
+            RunnablePassthrough.assign(entity_answer=RunnableLambda(lookup).with_config(run_name="entity_route"))
+            | RunnableLambda(route)
+        )
+
+    def _with_intent_routing(self, chain, router: QueryRouter, mode: str, k: int):
+        # --- 5. Intent Routing ---
+        # Small talk and off-topic questions get a templated reply, skipping
+        # entity lookup, retrieval and the LLM; the others go to `chain`.
+        def classify(input_dict):
+            intent, reply = router.route(input_dict["input"], has_history=bool(input_dict.get("chat_history")))
+            if reply is None:
+                logger.info(f"Intent '{intent}': answered in mode '{mode}' with k={k}.")
+            return {"intent": intent, "reply": reply, SPAN_ATTRIBUTES_KEY: {"intent": intent}}
+
+        def route(input_dict):
+            reply = input_dict["intent_route"]["reply"]
+            return chain if reply is None else reply
+
+        return (
+            RunnablePassthrough.assign(intent_route=RunnableLambda(classify).with_config(run_name="intent_route"))
+            | RunnableLambda(route)
+        )
+
+@lru_cache(maxsize=None)
 def get_chain_manager():
     """
-    Cached factory function to get a singleton instance of the RAGChainManager.
+    Cached factory function to get a process-wide singleton instance of the RAGChainManager.
     """
     logger.info("Initializing RAGChainManager (LCEL)...")
     return RAGChainManager()
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Extractive compression of the retrieved context.
+
+The retriever returns whole chunks (up to CHUNK_SIZE characters each) when
+one or two of their sentences usually answer the question. ContextCompressor
+splits the chunks into sentences (and lines, for the corpus' structured
+records), scores each one against the standalone question and keeps the best
+ones, with their neighbours, within a character budget. A heading line
+("Titre de l'article: ...", "Équipe: ...") is not scored on its own: its
+matches count for every sentence of its chunk. Chunks keep their order and
+their heading whenever one of their sentences is kept; chunks with none are
+dropped.
+
+Scoring is lexical and runs on the CPU in well under a millisecond per
+request: question words (accents and case folded, stop words removed,
+truncated to a common prefix so that "qualifié" meets "qualification") are
+weighted by their rarity among the retrieved sentences. When no sentence
+shares a word with the question, the context is left as it is.
+"""
+import logging
+import math
+import re
+from collections import Counter
+from typing import List, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from src.app.entities import normalize
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends followed by whitespace; line breaks always separate sentences.
+_SENTENCE_END = re.compile(r'(?<=[.!?…])\s+')
+_HEADING = re.compile(r"^(?:Titre de l'article|Équipe|Édition \d{4})\s*:|^--- .+ ---")
+# Words shorter than this are ignored; longer ones are cut to this prefix length.
+_MIN_TOKEN_LENGTH = 3
+_STEM_LENGTH = 6
+# Rough characters per token for French text, to report savings in tokens.
+_CHARS_PER_TOKEN = 4
+
+_STOP_WORDS = frozenset(normalize(
+    "les des une est que qui quoi quel quelle quels quelles dans pour par sur avec son sa ses leur leurs aux "
+    "du de la le et au en ce cet cette ces il elle ils elles ont été etre être plus pas comment combien où "
+    "quand pourquoi lors entre sont était avait fait faire peut the and for"
+).split())
+
+
+def _tokens(text: str) -> set:
+    return {
+        token[:_STEM_LENGTH] for token in normalize(text).split()
+        if len(token) >= _MIN_TOKEN_LENGTH and token not in _STOP_WORDS
+    }
+
+
+def split_sentences(text: str) -> List[Tuple[str, str]]:
+    """Splits text into (sentence, separator that followed it) pairs."""
+    pieces = []
+    for line in text.split("\n"):
+        parts = _SENTENCE_END.split(line.strip())
+        pieces += [(part, " ") for part in parts[:-1] if part] + ([(parts[-1], "\n")] if parts[-1] else [])
+    return pieces
+
+
+class ContextCompressor:
+    """
+    Keeps the sentences of the retrieved chunks that best match the question,
+    plus `neighbors` sentences on each side, within `budget` characters.
+    """
+
+    def __init__(self, budget: int, neighbors: int = 1):
+        self.budget = budget
+        self.neighbors = neighbors
+
+    def compress(self, question: str, docs: Sequence[Document]) -> Tuple[List[Document], dict]:
+        """Returns the compressed documents and statistics for the request trace."""
+        chunks = [split_sentences(doc.page_content) for doc in docs]
+        chars_in = sum(len(doc.page_content) for doc in docs)
+        stats = {"context_chars_in": chars_in, "sentences_in": sum(len(chunk) for chunk in chunks)}
+
+        query = _tokens(question)
+        sentence_tokens = [[_tokens(sentence) for sentence, _ in chunk] for chunk in chunks]
+        document_frequency = Counter(token for chunk in sentence_tokens for tokens in chunk for token in tokens & query)
+        total = stats["sentences_in"]
+        weights = {token: math.log((total + 1) / (count + 0.5)) for token, count in document_frequency.items()}
+        headed = [bool(chunk) and bool(_HEADING.match(chunk[0][0])) for chunk in chunks]
+        # A heading is not kept for itself, but its matches count for every sentence under it:
+        # the lines of "Équipe: Morocco" answer a question about Morocco's goalkeepers.
+        heading_matches = [chunk[0] & query if headed[doc_index] else set() for doc_index, chunk in enumerate(sentence_tokens)]
+        # Best sentences first; ties go to the better-ranked chunk, then to the earlier sentence.
+        scored = []
+        for doc_index, chunk in enumerate(sentence_tokens):
+            for index, tokens in enumerate(chunk):
+                matches = (tokens & query) | heading_matches[doc_index]
+                if matches and not (index == 0 and headed[doc_index]):
+                    scored.append((-sum(weights[token] for token in matches), doc_index, index))
+        scored.sort()
+        if not scored:
+            return list(docs), {**stats, "context_chars_out": chars_in, "compressed": False}
+
+        selected = [set() for _ in chunks]
+        used = 0
+
+        def take(doc_index: int, index: int) -> bool:
+            nonlocal used
+            if index in selected[doc_index]:
+                return True
+            cost = len(chunks[doc_index][index][0]) + 1
+            if used + cost > self.budget:
+                return False
+            selected[doc_index].add(index)
+            used += cost
+            return True
+
+        for _, doc_index, index in scored:
+            # A chunk's first kept sentence brings its heading along, or neither is kept.
+            needed = [0, index] if headed[doc_index] and not selected[doc_index] else [index]
+            if used + sum(len(chunks[doc_index][i][0]) + 1 for i in needed if i not in selected[doc_index]) > self.budget:
+                continue
+            for i in needed:
+                take(doc_index, i)
+            for offset in range(1, self.neighbors + 1):
+                for neighbor in (index - offset, index + offset):
+                    if 0 <= neighbor < len(chunks[doc_index]):
+                        take(doc_index, neighbor)
+
+        compressed = []
+        for doc, chunk, keep in zip(docs, chunks, selected):
+            if not keep:
+                continue
+            indices = sorted(keep)
+            text = "".join(
+                chunk[i][0] + (chunk[i][1] if i + 1 in keep else "\n")
+                for i in indices
+            ).rstrip()
+            compressed.append(Document(page_content=text, metadata=doc.metadata, id=getattr(doc, "id", None)))
+
+        chars_out = sum(len(doc.page_content) for doc in compressed)
+        stats.update({
+            "context_chars_out": chars_out,
+            "sentences_kept": sum(len(keep) for keep in selected),
+            "chunks_kept": len(compressed),
+            "estimated_tokens_saved": (chars_in - chars_out) // _CHARS_PER_TOKEN,
+            "compressed": True,
+        })
+        return compressed, stats
@@ -0,0 +1,294 @@
+"""
+Player/team entity index built from the Transfermarkt squads.
+
+The squads collected by scrape_transfermarkt (player names and positions for
+each national team) used to reach the assistant only as flat text in the
+vector store. EntityIndex keeps them in memory, with French and English names
+and nicknames for every team ("Maroc", "Morocco", "Lions de l'Atlas"...), and
+resolves the entities a question mentions with dictionary lookups on its
+word n-grams. The RAG chain uses it to:
+
+- answer roster questions ("Quel est l'effectif du Maroc ?") and player
+  questions ("À quel poste joue Yassine Bounou ?") directly, without
+  retrieval or an LLM call;
+- expand the retrieval query with the other names of the entities it
+  mentions, since the squads are stored under their English names and the
+  articles use the French ones;
+- put the records of the mentioned players and, for roster questions, teams
+  at the top of the context, whatever the vector search returns.
+
+Positions are reported as scraped from Transfermarkt.
+"""
+import logging
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from src import config
+from src.ingestion.jsonl import iter_records
+
+logger = logging.getLogger(__name__)
+
+# --- Team Names ---
+# Canonical (Transfermarkt) name -> French name first, then other names and nicknames.
+TEAM_ALIASES = {
+    "Morocco": ("Maroc", "Lions de l'Atlas", "marocain", "marocaine", "marocains"),
+    "Senegal": ("Sénégal", "Lions de la Teranga", "sénégalais", "sénégalaise"),
+    "Côte d'Ivoire": ("Côte d'Ivoire", "Ivory Coast", "Éléphants", "ivoirien", "ivoirienne", "ivoiriens"),
+    "Egypt": ("Égypte", "Pharaons", "égyptien", "égyptienne", "égyptiens"),
+    "Nigeria": ("Nigeria", "Nigéria", "Super Eagles", "nigérian", "nigériane", "nigérians"),
+    "Cameroon": ("Cameroun", "Lions Indomptables", "camerounais", "camerounaise"),
+    "Algeria": ("Algérie", "Fennecs", "algérien", "algérienne", "algériens"),
+    "Tunisia": ("Tunisie", "Aigles de Carthage", "tunisien", "tunisienne", "tunisiens"),
+    "South Africa": ("Afrique du Sud", "Bafana Bafana", "sud-africain", "sud-africaine", "sud-africains"),
+    "Burkina Faso": ("Burkina Faso", "Burkina", "Étalons", "burkinabè"),
+    "Angola": ("Angola", "Palancas Negras", "angolais", "angolaise"),
+    "Benin": ("Bénin", "Guépards", "béninois", "béninoise"),
+    "Botswana": ("Botswana", "Zèbres", "Zebras"),
+    "Comoros": ("Comores", "Cœlacanthes", "comorien", "comorienne", "comoriens"),
+    "DR Congo": ("RD Congo", "RDC", "République démocratique du Congo", "Léopards"),
+    "Equatorial Guinea": ("Guinée équatoriale", "Nzalang Nacional", "équato-guinéen"),
+    "Gabon": ("Gabon", "Panthères", "gabonais", "gabonaise"),
+    "Mali": ("Mali", "Aigles du Mali", "malien", "malienne", "maliens"),
+    "Mozambique": ("Mozambique", "Mambas", "mozambicain", "mozambicaine"),
+    "Sudan": ("Soudan", "Crocodiles du Nil", "soudanais", "soudanaise"),
+    "Tanzania": ("Tanzanie", "Taifa Stars", "tanzanien", "tanzanienne"),
+    "Uganda": ("Ouganda", "Uganda Cranes", "ougandais", "ougandaise"),
+    "Zambia": ("Zambie", "Chipolopolo", "zambien", "zambienne"),
+    "Zimbabwe": ("Zimbabwe", "Warriors", "zimbabwéen", "zimbabwéenne"),
+}
+
+# --- Question Patterns (matched on normalized text) ---
+_ROSTER_KEYWORDS = ("effectif", "liste des joueurs", "joueurs de", "joueurs du", "joueurs des", "quels joueurs",
+                    "selectionnes", "squad", "roster", "players")
+# "Composition" asks for a squad, unless it is that of a group ("la composition du groupe du Maroc").
+_COMPOSITION_KEYWORDS = ("composition",)
+_GROUP_KEYWORDS = ("groupe", "groupes", "poule", "poules")
+# Words a roster question may hold besides its keywords and team name and still be answered by the squad list
+# alone: "Quel est l'effectif du Maroc ?" is, "Quels joueurs du Maroc jouent en Europe ?" is not.
+_ROSTER_WORDS = frozenset(word for keyword in _ROSTER_KEYWORDS + _COMPOSITION_KEYWORDS for word in keyword.split()) | {
+    "quel", "quelle", "quels", "quelles", "qui", "que", "qu", "c", "est", "sont", "l", "le", "la", "les", "d", "de",
+    "du", "des", "donne", "donnez", "moi", "nous", "me", "peux", "pouvez", "tu", "vous", "actuel", "actuelle",
+    "complet", "complete", "equipe", "selection", "nationale", "tous", "toute", "what", "is", "are", "the", "of",
+}
+_PLAYER_KEYWORDS = ("poste", "position", "quelle equipe", "quelle selection", "quel pays", "joue pour",
+                    "joue t il", "joue t elle", "joue au poste", "nationalite", "plays for")
+# Questions about events, performance or a given edition need the articles, not the current squad list.
+_EVENT_KEYWORDS = ("but", "buts", "buteur", "buteurs", "marque", "score", "match", "matchs", "blesse", "blessure",
+                   "titulaire", "remplacant", "meilleur", "statistique", "statistiques", "combien", "resultat",
+                   "edition", "editions")
+YEAR_PATTERN = re.compile(r'\b(?:19|20)\d{2}\b')
+# Shorter last names ("Ba", "Sow") are not used on their own to identify a player.
+_MIN_SURNAME_LENGTH = 4
+
+_SQUAD_TEAM_LINE = re.compile(r'^Équipe:\s*(.+?)\s*$')
+_SQUAD_PLAYER_LINE = re.compile(r'^- (.+) \((.*)\)\s*$')
+
+
+def normalize(text: str) -> str:
+    """Lowercases, strips accents and turns punctuation into single spaces."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(char if char.isalnum() else " " for char in text if not unicodedata.combining(char))
+    return " ".join(text.split())
+
+
+def _contains(normalized_query: str, keywords: Sequence[str]) -> bool:
+    padded = f" {normalized_query} "
+    return any(f" {keyword} " in padded for keyword in keywords)
+
+
+def _is_roster_question(normalized_query: str) -> bool:
+    return _contains(normalized_query, _ROSTER_KEYWORDS) or (
+        _contains(normalized_query, _COMPOSITION_KEYWORDS) and not _contains(normalized_query, _GROUP_KEYWORDS)
+    )
+
+
+# --- Index ---
+class Player:
+    """A squad member: name, canonical team name and position as scraped."""
+
+    __slots__ = ("name", "team", "position")
+
+    def __init__(self, name: str, team: str, position: str):
+        self.name = name
+        self.team = team
+        self.position = position
+
+    def describe(self, index: "EntityIndex") -> str:
+        position = f", poste : {self.position}" if self.position and self.position != "N/A" else ""
+        return f"{self.name} : joueur de la sélection {index.display_name(self.team)}{position} (Transfermarkt)."
+
+
+class EntityIndex:
+    """
+    In-memory index of teams and players. Every team name, alias, player full
+    name and unambiguous player last name maps to its entities in a single
+    dict keyed by normalized text, so resolving a question costs one lookup
+    per word n-gram.
+    """
+
+    def __init__(self, squads: Dict[str, List[tuple]]):
+        # Canonical team name -> [(player name, position)], in squad order.
+        self.squads = squads
+        self._lookup: Dict[str, list] = {}
+        surnames: Dict[str, list] = {}
+
+        for team in list(TEAM_ALIASES) + [team for team in squads if team not in TEAM_ALIASES]:
+            for alias in (team, *TEAM_ALIASES.get(team, ())):
+                self._add(normalize(alias), ("team", team))
+        for team, players in squads.items():
+            for name, position in players:
+                player = Player(name, team, position)
+                self._add(normalize(name), player)
+                tokens = normalize(name).split()
+                if len(tokens) > 1 and len(tokens[-1]) >= _MIN_SURNAME_LENGTH:
+                    surnames.setdefault(tokens[-1], []).append(player)
+        # A last name only identifies a player if no one else, and no team, has it.
+        for surname, players in surnames.items():
+            if len(players) == 1 and surname not in self._lookup:
+                self._lookup[surname] = players
+        self._max_tokens = max((len(key.split()) for key in self._lookup), default=0)
+        logger.info(f"Entity index built: {len(squads)} squads, {sum(len(p) for p in squads.values())} players, {len(self._lookup)} names.")
+
+    def _add(self, key: str, entity):
+        if key:
+            entities = self._lookup.setdefault(key, [])
+            if entity not in entities:
+                entities.append(entity)
+
+    def __len__(self):
+        return len(self._lookup)
+
+    def display_name(self, team: str) -> str:
+        """French name of a team followed by its Transfermarkt name, e.g. "Maroc (Morocco)"."""
+        french = TEAM_ALIASES.get(team, (team,))[0]
+        return french if french == team else f"{french} ({team})"
+
+    # --- Resolution ---
+    def match(self, query: str) -> List:
+        """
+        Entities mentioned in `query`, in order of appearance: ("team", name)
+        tuples and Player objects. The longest name starting at each word wins.
+        """
+        tokens = normalize(query).split()
+        found, i = [], 0
+        while i < len(tokens):
+            for n in range(min(self._max_tokens, len(tokens) - i), 0, -1):
+                entities = self._lookup.get(" ".join(tokens[i:i + n]))
+                if entities:
+                    found.extend(entity for entity in entities if entity not in found)
+                    i += n
+                    break
+            else:
+                i += 1
+        return found
+
+    def _resolve(self, query: str):
+        entities = self.match(query)
+        teams = list(dict.fromkeys(entity[1] for entity in entities if isinstance(entity, tuple)))
+        players = [entity for entity in entities if isinstance(entity, Player)]
+        return teams, players
+
+    def expand_query(self, query: str) -> str:
+        """Appends the other names of the mentioned entities (FR/EN team names, full player names and teams)."""
+        teams, players = self._resolve(query)
+        names = []
+        for team in teams + [player.team for player in players]:
+            names += [team, TEAM_ALIASES.get(team, (team,))[0]]
+        names += [player.name for player in players]
+        normalized_query = f" {normalize(query)} "
+        extra = [name for name in dict.fromkeys(names) if f" {normalize(name)} " not in normalized_query]
+        return f"{query} ({', '.join(extra)})" if extra else query
+
+    def roster(self, team: str) -> str:
+        players = self.squads.get(team, [])
+        lines = "\n".join(f"- {name} ({position})" for name, position in players)
+        return f"Effectif de la sélection {self.display_name(team)} selon Transfermarkt ({len(players)} joueurs) :\n{lines}"
+
+    def facts(self, query: str) -> str:
+        """
+        Index records for the context: the mentioned players, plus the squads of
+        the mentioned teams when the question is about rosters.
+        """
+        teams, players = self._resolve(query)
+        facts = [player.describe(self) for player in players]
+        if _is_roster_question(normalize(query)):
+            facts += [self.roster(team) for team in teams if team in self.squads]
+        return "\n".join(facts)
+
+    @staticmethod
+    def _only_roster_words(normalized_query: str, team: str) -> bool:
+        """Whether nothing is left of the question once the team's names and the roster wording are removed."""
+        padded = f" {normalized_query} "
+        for name in sorted({normalize(name) for name in (team, *TEAM_ALIASES.get(team, ()))}, key=len, reverse=True):
+            padded = padded.replace(f" {name} ", " ")
+        return all(word in _ROSTER_WORDS for word in padded.split())
+
+    def direct_answer(self, query: str) -> Optional[str]:
+        """
+        The answer to a roster or player question that the index settles on its
+        own, or None when the question needs retrieval: several candidate
+        entities, words about matches, goals or performances, a year or
+        edition (the index only holds the current squads), or a roster question
+        that asks more than the list ("Quels joueurs du Maroc jouent en
+        Europe ?"), for which facts() puts the squad in the context instead.
+        """
+        normalized_query = normalize(query)
+        if _contains(normalized_query, _EVENT_KEYWORDS) or YEAR_PATTERN.search(normalized_query):
+            return None
+        teams, players = self._resolve(query)
+        if (not players and len(teams) == 1 and teams[0] in self.squads and _is_roster_question(normalized_query)
+                and self._only_roster_words(normalized_query, teams[0])):
+            return self.roster(teams[0])
+        if (len(players) == 1 and set(teams) <= {players[0].team}
+                and _contains(normalized_query, _PLAYER_KEYWORDS)):
+            return players[0].describe(self)
+        return None
+
+
+# --- Loading ---
+def _read_squad_list(path: Path) -> Dict[str, List[tuple]]:
+    """Parses a squad list in the processor's format ("Équipe: <name>" then "- <player> (<position>)" lines)."""
+    squads, team = {}, None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = _SQUAD_TEAM_LINE.match(line)
+            if match:
+                team = match.group(1)
+                squads.setdefault(team, [])
+                continue
+            match = _SQUAD_PLAYER_LINE.match(line)
+            if match and team is not None:
+                squads[team].append((match.group(1), match.group(2)))
+    return squads
+
+
+def build_entity_index(sources: Iterable[Path] = None) -> EntityIndex:
+    """
+    Builds the index from the scraped Transfermarkt teams (JSON Lines) and/or
+    processed squad lists (text). The first source that lists a team wins;
+    missing sources are skipped.
+    """
+    squads: Dict[str, List[tuple]] = {}
+    for path in map(Path, sources if sources is not None else config.ENTITY_SOURCES):
+        if not path.exists():
+            logger.warning(f"Entity source not found: {path}")
+            continue
+        if path.suffix == ".jsonl":
+            found = {
+                team['name']: [(player['name'], player.get('position', 'N/A')) for player in team.get('players', [])]
+                for team in iter_records(path) if team.get('name')
+            }
+        else:
+            found = _read_squad_list(path)
+        for team, players in found.items():
+            squads.setdefault(team, players)
+    return EntityIndex(squads)
+
+
+@lru_cache(maxsize=None)
+def get_entity_index() -> EntityIndex:
+    """Cached factory for the process-wide entity index."""
+    return build_entity_index()
@@ -0,0 +1,501 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from src.app.metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+# Shared worker threads used to run (and hedge) blocking LLM calls.
+_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-pool")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when every endpoint of the pool is currently circuit-broken."""
+
+
+# --- Circuit Breaker ---
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker. After `failure_threshold` consecutive failures
+    the circuit opens and the endpoint is skipped for `reset_timeout` seconds,
+    after which a single trial request is let through (half-open). A failure
+    while half-open re-opens the circuit immediately.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        # When the half-open trial request was let through; a trial that never
+        # reports back frees its slot after reset_timeout.
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """
+        Returns True if a request may be sent to the endpoint right now. While
+        half-open, the first caller gets the trial slot and the others are
+        refused until the trial succeeds or fails.
+        """
+        with self._lock:
+            state = self._state()
+            if state != "half_open":
+                return state == "closed"
+            now = time.monotonic()
+            if self._trial_started is not None and now - self._trial_started < self.reset_timeout:
+                return False
+            self._trial_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_started = None
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+# --- Endpoint ---
+class PoolEndpoint:
+    """A single chat model in the pool with its circuit breaker and latency window."""
+
+    def __init__(self, name: str, model: Runnable, breaker: CircuitBreaker, window: int = 200):
+        self.name = name
+        self.model = model
+        self.breaker = breaker
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_latency(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def sample_count(self) -> int:
+        with self._lock:
+            return len(self._latencies)
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = list(self._latencies)
+        return percentile(samples, pct)
+
+
+# --- Pooled Chat LLM ---
+class LLMEndpointPool(Runnable):
+    """
+    A Runnable chat model that spreads requests over several endpoints.
+
+    Every request gets a hard deadline. If the primary endpoint has not answered
+    after the hedge delay (a fixed value or the observed p95 latency), a duplicate
+    request is sent to the next healthy endpoint and the first answer wins.
+    Failed endpoints are circuit-broken and the request fails over to the others;
+    an endpoint still working at the deadline counts as failed. Streams get the
+    same treatment up to their first token; after it, an endpoint that sends
+    nothing for stream_idle_timeout seconds is stopped and counts as failed.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[PoolEndpoint],
+        request_timeout: float = 30.0,
+        hedge_delay: Optional[float] = None,
+        hedge_percentile: float = 95.0,
+        initial_hedge_delay: float = 5.0,
+        min_hedge_samples: int = 20,
+        stream_idle_timeout: Optional[float] = None,
+    ):
+        if not endpoints:
+            raise ValueError("LLMEndpointPool requires at least one endpoint.")
+        self.endpoints = endpoints
+        self.request_timeout = request_timeout
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_hedge_samples = min_hedge_samples
+        self.stream_idle_timeout = stream_idle_timeout if stream_idle_timeout is not None else request_timeout
+        self._next = 0
+        self._lock = threading.Lock()
+
+    # --- Endpoint selection ---
+    def _candidates(self) -> List[PoolEndpoint]:
+        """Returns healthy endpoints in round-robin order, starting after the last primary."""
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.endpoints)
+        ordered = self.endpoints[start:] + self.endpoints[:start]
+        healthy = [endpoint for endpoint in ordered if endpoint.breaker.state != "open"]
+        if not healthy:
+            raise CircuitOpenError("All LLM endpoints are circuit-broken. Try again later.")
+        if len(healthy) == 1:
+            # With a single endpoint the hedge goes to the same endpoint, which
+            # usually lands on another replica behind its load balancer.
+            healthy.append(healthy[0])
+        return healthy
+
+    @staticmethod
+    def _admit(candidates: List[PoolEndpoint]) -> Optional[PoolEndpoint]:
+        """Pops candidates until one whose circuit breaker lets the request through."""
+        while candidates:
+            endpoint = candidates.pop(0)
+            if endpoint.breaker.allow_request():
+                return endpoint
+        return None
+
+    def _current_hedge_delay(self, endpoint: PoolEndpoint) -> float:
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        if endpoint.sample_count() < self.min_hedge_samples:
+            return self.initial_hedge_delay
+        return endpoint.latency_percentile(self.hedge_percentile) or self.initial_hedge_delay
+
+    def _call(self, endpoint: PoolEndpoint, input: Any, config: Optional[RunnableConfig], abandoned: threading.Event):
+        # A call still running at the deadline was already counted as a failure;
+        # its late outcome must not close the circuit again.
+        start = time.perf_counter()
+        try:
+            result = endpoint.model.invoke(input, config)
+        except Exception:
+            if not abandoned.is_set():
+                endpoint.breaker.record_failure()
+            raise
+        if not abandoned.is_set():
+            endpoint.breaker.record_success()
+            endpoint.record_latency(time.perf_counter() - start)
+        return result
+
+    async def _acall(self, endpoint: PoolEndpoint, input: Any, config: Optional[RunnableConfig]):
+        start = time.perf_counter()
+        try:
+            result = await endpoint.model.ainvoke(input, config)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            endpoint.breaker.record_failure()
+            raise
+        endpoint.breaker.record_success()
+        endpoint.record_latency(time.perf_counter() - start)
+        return result
+
+    # --- Runnable interface ---
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        deadline = time.monotonic() + self.request_timeout
+        candidates = self._candidates()
+        pending = {}
+        abandoned = threading.Event()
+        last_error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            endpoint = self._admit(candidates)
+            if endpoint is not None:
+                pending[_EXECUTOR.submit(self._call, endpoint, input, config, abandoned)] = endpoint
+            return endpoint is not None
+
+        if not launch():
+            raise CircuitOpenError("All LLM endpoints are circuit-broken. Try again later.")
+        hedge_at = time.monotonic() + self._current_hedge_delay(next(iter(pending.values())))
+
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wake_at = min(deadline, hedge_at) if candidates else deadline
+            done, _ = wait(list(pending), timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"LLM endpoint '{endpoint.name}' failed: {e}")
+            if candidates and (not pending or time.monotonic() >= hedge_at):
+                reason = "failover" if not pending else "hedge"
+                logger.info(f"Sending {reason} request to LLM endpoint '{candidates[0].name}'.")
+                launch()
+                hedge_at = deadline
+
+        if pending:
+            # The calls keep their worker threads until the endpoint answers, but
+            # the breaker stops sending new requests to an endpoint that hangs.
+            abandoned.set()
+            for future, endpoint in pending.items():
+                future.cancel()
+                endpoint.breaker.record_failure()
+            raise TimeoutError(f"LLM request exceeded the {self.request_timeout:.1f}s deadline.")
+        raise last_error or RuntimeError("No LLM endpoint could serve the request.")
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.request_timeout
+        candidates = self._candidates()
+        pending = {}
+        last_error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            endpoint = self._admit(candidates)
+            if endpoint is not None:
+                pending[asyncio.ensure_future(self._acall(endpoint, input, config))] = endpoint
+            return endpoint is not None
+
+        if not launch():
+            raise CircuitOpenError("All LLM endpoints are circuit-broken. Try again later.")
+        hedge_at = loop.time() + self._current_hedge_delay(next(iter(pending.values())))
+
+        try:
+            while pending:
+                now = loop.time()
+                if now >= deadline:
+                    break
+                wake_at = min(deadline, hedge_at) if candidates else deadline
+                done, _ = await asyncio.wait(list(pending), timeout=max(0.0, wake_at - now), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    endpoint = pending.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        last_error = e
+                        logger.warning(f"LLM endpoint '{endpoint.name}' failed: {e}")
+                if candidates and (not pending or loop.time() >= hedge_at):
+                    reason = "failover" if not pending else "hedge"
+                    logger.info(f"Sending {reason} request to LLM endpoint '{candidates[0].name}'.")
+                    launch()
+                    hedge_at = deadline
+        finally:
+            # Losing hedges are cancelled so they stop consuming endpoint capacity.
+            for task in pending:
+                task.cancel()
+
+        if pending:
+            for endpoint in pending.values():
+                endpoint.breaker.record_failure()
+            raise TimeoutError(f"LLM request exceeded the {self.request_timeout:.1f}s deadline.")
+        raise last_error or RuntimeError("No LLM endpoint could serve the request.")
+
+    def _stream_worker(self, attempt: int, endpoint: PoolEndpoint, input: Any, config: Optional[RunnableConfig],
+                       kwargs: dict, events: queue.Queue, stop: threading.Event):
+        """Runs one streaming attempt in a worker thread, posting (attempt, kind, value) events."""
+        start = time.perf_counter()
+        try:
+            for chunk in endpoint.model.stream(input, config, **kwargs):
+                if stop.is_set():
+                    return
+                events.put((attempt, "chunk", chunk))
+        except Exception as e:
+            if not stop.is_set():
+                endpoint.breaker.record_failure()
+            events.put((attempt, "error", e))
+            return
+        if not stop.is_set():
+            endpoint.breaker.record_success()
+            endpoint.record_latency(time.perf_counter() - start)
+        events.put((attempt, "done", None))
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator:
+        """
+        Streams from the first healthy endpoint. Until the first token the
+        request is hedged and failed over as in invoke, and the first token must
+        arrive before the deadline; after it, the chunks come from that endpoint
+        only, each within stream_idle_timeout of the previous one, and a failure
+        is raised to the caller.
+        """
+        deadline = time.monotonic() + self.request_timeout
+        candidates = self._candidates()
+        events = queue.Queue()
+        attempts = {}  # attempt -> (endpoint, stop event)
+        active = set()
+        last_error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            endpoint = self._admit(candidates)
+            if endpoint is None:
+                return False
+            attempt, stop = len(attempts), threading.Event()
+            attempts[attempt] = (endpoint, stop)
+            active.add(attempt)
+            _EXECUTOR.submit(self._stream_worker, attempt, endpoint, input, config, kwargs, events, stop)
+            return True
+
+        if not launch():
+            raise CircuitOpenError("All LLM endpoints are circuit-broken. Try again later.")
+        hedge_at = time.monotonic() + self._current_hedge_delay(attempts[0][0])
+
+        try:
+            winner = None
+            while winner is None:
+                if not active:
+                    if candidates:
+                        logger.info(f"Sending failover stream request to LLM endpoint '{candidates[0].name}'.")
+                    if not launch():
+                        raise last_error or RuntimeError("No LLM endpoint could serve the request.")
+                    continue
+                now = time.monotonic()
+                if now >= deadline:
+                    for attempt in active:
+                        attempts[attempt][1].set()
+                        attempts[attempt][0].breaker.record_failure()
+                    raise TimeoutError(f"LLM stream produced no token within the {self.request_timeout:.1f}s deadline.")
+                wake_at = min(deadline, hedge_at) if candidates else deadline
+                try:
+                    attempt, kind, value = events.get(timeout=max(0.0, wake_at - now))
+                except queue.Empty:
+                    if candidates and time.monotonic() >= hedge_at:
+                        logger.info(f"Sending hedge stream request to LLM endpoint '{candidates[0].name}'.")
+                        launch()
+                        hedge_at = deadline
+                    continue
+                if kind == "error":
+                    active.discard(attempt)
+                    last_error = value
+                    logger.warning(f"LLM endpoint '{attempts[attempt][0].name}' failed before streaming: {value}")
+                else:
+                    winner = attempt
+
+            for loser in active - {winner}:
+                attempts[loser][1].set()
+            while True:
+                if attempt == winner:
+                    if kind == "done":
+                        return
+                    if kind == "error":
+                        raise value
+                    yield value
+                    idle_at = time.monotonic() + self.stream_idle_timeout
+                try:
+                    attempt, kind, value = events.get(timeout=max(0.0, idle_at - time.monotonic()))
+                except queue.Empty:
+                    endpoint, stop = attempts[winner]
+                    stop.set()
+                    endpoint.breaker.record_failure()
+                    raise TimeoutError(f"LLM endpoint '{endpoint.name}' stalled for {self.stream_idle_timeout:.1f}s mid-stream.")
+        finally:
+            # Also stops the winner when the caller closes the stream early.
+            for _, stop in attempts.values():
+                stop.set()
+
+    async def _astream_worker(self, attempt: int, endpoint: PoolEndpoint, input: Any, config: Optional[RunnableConfig],
+                              kwargs: dict, events: asyncio.Queue):
+        start = time.perf_counter()
+        try:
+            async for chunk in endpoint.model.astream(input, config, **kwargs):
+                await events.put((attempt, "chunk", chunk))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            endpoint.breaker.record_failure()
+            await events.put((attempt, "error", e))
+            return
+        endpoint.breaker.record_success()
+        endpoint.record_latency(time.perf_counter() - start)
+        await events.put((attempt, "done", None))
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.request_timeout
+        candidates = self._candidates()
+        events = asyncio.Queue()
+        attempts = {}  # attempt -> (endpoint, task)
+        active = set()
+        last_error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            endpoint = self._admit(candidates)
+            if endpoint is None:
+                return False
+            attempt = len(attempts)
+            attempts[attempt] = (endpoint, asyncio.ensure_future(
+                self._astream_worker(attempt, endpoint, input, config, kwargs, events)))
+            active.add(attempt)
+            return True
+
+        if not launch():
+            raise CircuitOpenError("All LLM endpoints are circuit-broken. Try again later.")
+        hedge_at = loop.time() + self._current_hedge_delay(attempts[0][0])
+
+        try:
+            winner = None
+            while winner is None:
+                if not active:
+                    if candidates:
+                        logger.info(f"Sending failover stream request to LLM endpoint '{candidates[0].name}'.")
+                    if not launch():
+                        raise last_error or RuntimeError("No LLM endpoint could serve the request.")
+                    continue
+                now = loop.time()
+                if now >= deadline:
+                    for attempt in active:
+                        attempts[attempt][0].breaker.record_failure()
+                    raise TimeoutError(f"LLM stream produced no token within the {self.request_timeout:.1f}s deadline.")
+                wake_at = min(deadline, hedge_at) if candidates else deadline
+                try:
+                    attempt, kind, value = await asyncio.wait_for(events.get(), timeout=max(0.0, wake_at - now))
+                except asyncio.TimeoutError:
+                    if candidates and loop.time() >= hedge_at:
+                        logger.info(f"Sending hedge stream request to LLM endpoint '{candidates[0].name}'.")
+                        launch()
+                        hedge_at = deadline
+                    continue
+                if kind == "error":
+                    active.discard(attempt)
+                    last_error = value
+                    logger.warning(f"LLM endpoint '{attempts[attempt][0].name}' failed before streaming: {value}")
+                else:
+                    winner = attempt
+
+            # Losing hedges are cancelled so they stop consuming endpoint capacity.
+            for loser in active - {winner}:
+                attempts[loser][1].cancel()
+            while True:
+                if attempt == winner:
+                    if kind == "done":
+                        return
+                    if kind == "error":
+                        raise value
+                    yield value
+                    idle_at = loop.time() + self.stream_idle_timeout
+                try:
+                    attempt, kind, value = await asyncio.wait_for(events.get(), timeout=max(0.0, idle_at - loop.time()))
+                except asyncio.TimeoutError:
+                    endpoint, task = attempts[winner]
+                    task.cancel()
+                    endpoint.breaker.record_failure()
+                    raise TimeoutError(f"LLM endpoint '{endpoint.name}' stalled for {self.stream_idle_timeout:.1f}s mid-stream.")
+        finally:
+            for _, task in attempts.values():
+                task.cancel()
+
+    def health(self) -> List[dict]:
+        """Returns a snapshot of each endpoint's circuit state and p95 latency."""
+        return [
+            {
+                "name": endpoint.name,
+                "state": endpoint.breaker.state,
+                "p95_latency": endpoint.latency_percentile(95.0),
+            }
+            for endpoint in self.endpoints
+        ]
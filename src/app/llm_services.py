@@ -1,15 +1,19 @@
 import logging
-import streamlit as st
-from langchain_huggingface import HuggingFaceEndpoint, ChatHuggingFace
-from langchain_openai import AzureOpenAIEmbeddings
+from functools import lru_cache
 from src import config
+from src.app.llm_pool import CircuitBreaker, LLMEndpointPool, PoolEndpoint
+from src.offline_models import OfflineChatModel, OfflineEmbeddings
 
 logger = logging.getLogger(__name__)
 
-# This function for Azure embeddings remains unchanged.
-@st.cache_resource
+# These factories are cached per process and free of any UI code, so the
+# Streamlit app, the HTTP API and the command-line tools share them. The
+# Hugging Face and Azure OpenAI clients are imported on first use: importing
+# them costs about a second, which the offline backend never needs.
+@lru_cache(maxsize=None)
 def get_azure_openai_embeddings_model():
     """Initializes and returns the Azure OpenAI Embeddings model."""
+    from langchain_openai import AzureOpenAIEmbeddings
     logger.info("Initializing Azure OpenAI Embeddings model for application...")
     try:
         embeddings = AzureOpenAIEmbeddings(
@@ -21,40 +25,75 @@ def get_azure_openai_embeddings_model():
         return embeddings
     except Exception as e:
         logger.error(f"Error initializing Azure OpenAI Embeddings: {e}. Please check AZURE_OPENAI_ environment variables.", exc_info=True)
-        st.error(f"Error initializing Azure OpenAI Embeddings: {e}. Please check AZURE_OPENAI_ environment variables.")
-        st.stop()
-        return None
+        raise
+
+def get_embeddings_model():
+    """Returns the embeddings model for the configured MODEL_BACKEND."""
+    if config.MODEL_BACKEND == "offline":
+        return OfflineEmbeddings(size=config.OFFLINE_EMBEDDING_SIZE, latency=config.OFFLINE_EMBEDDING_LATENCY)
+    return get_azure_openai_embeddings_model()
+
+def _build_chat_endpoint(spec: str):
+    """
+    Builds one ChatHuggingFace model from an LLM_ENDPOINTS entry, either a
+    repo id or "repo_id@https://endpoint-url".
+    """
+    if config.MODEL_BACKEND == "offline":
+        return OfflineChatModel(latency=config.OFFLINE_LLM_LATENCY)
+
+    from langchain_huggingface import HuggingFaceEndpoint, ChatHuggingFace
+
+    repo_id, _, endpoint_url = spec.partition("@")
+    endpoint_kwargs = {"endpoint_url": endpoint_url} if endpoint_url else {"repo_id": repo_id}
+
+    # 1. Create the object that connects to the remote API endpoint
+    llm_endpoint = HuggingFaceEndpoint(
+        **endpoint_kwargs,
+        huggingfacehub_api_token=config.HUGGINGFACEHUB_API_TOKEN,
+        temperature=config.LLM_TEMPERATURE,
+        max_new_tokens=config.LLM_MAX_NEW_TOKENS,
+        timeout=config.LLM_REQUEST_TIMEOUT,
+    )
+
+    # 2. Wrap the endpoint in the ChatHuggingFace class to make it
+    #    conform to the standard chat model interface for LCEL.
+    return ChatHuggingFace(llm=llm_endpoint, model_id=repo_id)
 
 # Renamed the function to be more accurate
-@st.cache_resource
+@lru_cache(maxsize=None)
 def get_huggingface_chat_llm():
     """
-    Initializes a LangChain Chat LLM object that calls a conversational model 
-    on the Hugging Face Inference API.
+    Initializes a pooled LangChain Chat LLM that calls the conversational models
+    listed in LLM_ENDPOINTS on the Hugging Face Inference API, with per-request
+    deadlines, hedged requests and circuit breaking.
     """
-    logger.info("Initializing Hugging Face Chat endpoint (Mistral-7B-Instruct-v0.2)...")
-    
-    repo_id = "mistralai/Mistral-7B-Instruct-v0.2"
-    
+    logger.info(f"Initializing Hugging Face Chat endpoint pool ({', '.join(config.LLM_ENDPOINTS)}, backend={config.MODEL_BACKEND})...")
+
     try:
-        # 1. Create the object that connects to the remote API endpoint
-        llm_endpoint = HuggingFaceEndpoint(
-            repo_id=repo_id,
-            huggingfacehub_api_token=config.HUGGINGFACEHUB_API_TOKEN,
-            temperature=0.2,
-            max_new_tokens=512,
+        endpoints = [
+            PoolEndpoint(
+                name=spec,
+                model=_build_chat_endpoint(spec),
+                breaker=CircuitBreaker(
+                    failure_threshold=config.LLM_CIRCUIT_FAILURE_THRESHOLD,
+                    reset_timeout=config.LLM_CIRCUIT_RESET_SECONDS,
+                ),
+            )
+            for spec in config.LLM_ENDPOINTS
+        ]
+        hedge_delay = None if config.LLM_HEDGE_DELAY == "auto" else float(config.LLM_HEDGE_DELAY)
+        chat_model = LLMEndpointPool(
+            endpoints,
+            request_timeout=config.LLM_REQUEST_TIMEOUT,
+            hedge_delay=hedge_delay,
+            initial_hedge_delay=config.LLM_HEDGE_INITIAL_DELAY,
+            stream_idle_timeout=config.LLM_STREAM_IDLE_TIMEOUT,
         )
-        
-        # 2. Wrap the endpoint in the ChatHuggingFace class to make it
-        #    conform to the standard chat model interface for LCEL.
-        chat_model = ChatHuggingFace(llm=llm_endpoint)
-        
-        logger.info("Hugging Face Chat endpoint loaded successfully.")
+
+        logger.info(f"Hugging Face Chat endpoint pool loaded with {len(endpoints)} endpoint(s).")
         return chat_model
-        
+
     except Exception as e:
-        error_message = f"Failed to initialize Hugging Face Chat API for model '{repo_id}'. Ensure your HUGGINGFACEHUB_API_TOKEN is correct. Error: {e}"
+        error_message = f"Failed to initialize Hugging Face Chat API pool for models '{', '.join(config.LLM_ENDPOINTS)}'. Ensure your HUGGINGFACEHUB_API_TOKEN is correct. Error: {e}"
         logger.error(error_message, exc_info=True)
-        st.error(error_message)
-        st.stop()
-        return None
+        raise RuntimeError(error_message) from e
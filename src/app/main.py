@@ -1,341 +1,290 @@
 import streamlit as st
 import logging
 import re
-from langchain_core.messages import HumanMessage, AIMessage
-from src.app.chain import get_chain_manager
+from src import config
+from src.api.client import AssistantAPIClient
+from src.app.chain import get_chain_manager, history_to_messages, messages_to_history
+from src.app.routing import get_query_mode
+from src.app.session_store import get_session_store
+from src.app.tracing import LatencyTracer
+import hashlib
+import time
+import uuid
 
 logger = logging.getLogger(__name__)
 
-# --- Mode Selection Logic ---
-def get_query_mode(query: str) -> str:
-    """
-    Analyzes the user query to determine the appropriate prompt mode.
-    """
-    query = query.lower()
-    if any(keyword in query for keyword in ["résume", "résumer", "synthétise", "synthétiser"]):
-        logger.info("Query identified as 'summary' mode.")
-        return "summary"
-    elif any(keyword in query for keyword in ["combien", "quel est le score", "statistique", "donnée"]):
-        logger.info("Query identified as 'stats' mode.")
-        return "stats"
-    else:
-        logger.info("Query identified as 'default' mode.")
-        return "default"
+# --- Backend Access ---
+# The UI is one client of the assistant: it either calls the HTTP API
+# (ASSISTANT_API_URL) or runs the shared, UI-free chain in-process.
+@st.cache_resource
+def get_streamlit_chain_manager():
+    """Loads the process-wide RAGChainManager behind a Streamlit spinner."""
+    with st.spinner("Chargement de la base de connaissances vectorielle..."):
+        return get_chain_manager()
 
-# --- Streamlit UI Components ---
-def display_message(role, content, mascott_b64, coupe_b64):
-    """Displays a chat message in the Streamlit UI."""
-    if role == "user":
-        st.markdown(f'<div class="chat-message-user">{content}</div>', unsafe_allow_html=True)
-    else:
-        # For AI messages, include the avatar and the expert badge
-        badge_html = f'<span class="expert-badge"><img src="data:image/svg+xml;base64,{coupe_b64}" class="mini-coupe"> Expert CAN</span>'
-        message_html = f'''
-        <div class="chat-message-ai">
-            <img src="data:image/png;base64,{mascott_b64}" class="ai-avatar">
-            <div class="ai-content">
-                {badge_html}
-                <p>{content}</p>
-            </div>
-        </div>
-        '''
-        st.markdown(message_html, unsafe_allow_html=True)
-        st.session_state.ai_responding = False
+@st.cache_resource
+def get_api_client():
+    """Returns a client for the assistant HTTP API."""
+    return AssistantAPIClient(config.ASSISTANT_API_URL)
 
-import streamlit as st
-import logging
-import re
-from langchain_core.messages import HumanMessage, AIMessage
-from src.app.chain import get_chain_manager
-import base64
-from pathlib import Path
+def stream_answer(query: str, chat_history: list, mode: str):
+    """
+    Yields the answer to `query` as it is generated, through the HTTP API if
+    configured, otherwise in-process. `chat_history` holds the previous turns
+    only. In-process answers are traced and the trace is kept for the debug panel.
+    """
+    if config.ASSISTANT_API_URL:
+        yield from get_api_client().stream(query, messages_to_history(chat_history), mode=mode)
+        return
+    rag_chain = get_streamlit_chain_manager().get_rag_chain(mode=mode)
+    tracer = LatencyTracer(mode=mode, source="streamlit")
+    try:
+        yield from rag_chain.stream({
+            "chat_history": chat_history,
+            "input": query
+        }, config={"callbacks": [tracer]})
+    finally:
+        st.session_state.last_trace = tracer.trace
 
-logger = logging.getLogger(__name__)
+def display_trace_panel():
+    """Collapsible sidebar panel showing where the time of the last answer went."""
+    trace = st.session_state.get("last_trace")
+    with st.expander("Débogage : latence de la dernière réponse", expanded=False):
+        if not trace:
+            st.caption("Aucune trace disponible pour le moment.")
+            return
+        st.markdown(f"**Total :** {trace['total_seconds']:.2f} s — mode `{trace['mode']}` — statut `{trace['status']}`")
+        st.table([
+            {
+                "étape": span["name"],
+                "durée (s)": span["duration"],
+                "1er token (s)": span.get("time_to_first_token"),
+                "tokens in/out": f"{span.get('input_tokens', '')}/{span.get('output_tokens', '')}" if "output_tokens" in span else "",
+                "contexte (car.)": f"{span['context_chars_in']} → {span['context_chars_out']}" if "context_chars_out" in span else "",
+            }
+            for span in trace["spans"]
+        ])
+        st.caption(f"Trace {trace['trace_id']}")
 
 # --- Asset Handling ---
-def get_image_as_base64(path_str: str) -> str:
-    """Read an image file and return it as a base64 encoded string."""
-    path = Path(path_str)
+# Images and the stylesheet live in the app's static folder and are served by
+# Streamlit's static file serving (see .streamlit/config.toml), so each rerun
+# sends short URLs and the browser caches the files themselves.
+def get_static_asset_url(filename: str) -> str:
+    """
+    Returns the URL of a static asset with a content-hash suffix for cache busting,
+    or an empty string if the file is missing.
+    """
+    path = config.STATIC_ASSETS_PATH / filename
     if not path.is_file():
-        logger.error(f"Image file not found at {path}")
+        logger.error(f"Static asset not found at {path}")
         return ""
     try:
-        with open(path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode()
-    except Exception as e:
-        logger.error(f"Error reading or encoding image {path}: {e}")
+        digest = hashlib.md5(path.read_bytes()).hexdigest()[:10]
+    except OSError as e:
+        logger.error(f"Error reading static asset {path}: {e}")
         return ""
+    return f"{config.STATIC_URL_PREFIX}/{filename}?v={digest}"
 
-# --- Mode Selection Logic ---
-def get_query_mode(query: str) -> str:
-    """
-    Analyzes the user query to determine the appropriate prompt mode.
-    """
-    query = query.lower()
-    if any(keyword in query for keyword in ["résume", "résumer", "synthétise", "synthétiser"]):
-        logger.info("Query identified as 'summary' mode.")
-        return "summary"
-    elif any(keyword in query for keyword in ["combien", "quel est le score", "statistique", "donnée"]):
-        logger.info("Query identified as 'stats' mode.")
-        return "stats"
-    else:
-        logger.info("Query identified as 'default' mode.")
-        return "default"
+@st.cache_resource
+def get_asset_urls() -> dict:
+    """Resolves every UI asset URL once per process."""
+    filenames = [
+        "styles.css", "coupe.svg", "logo.png", "png-ball.png", "mascott.png",
+        "logo_alg.svg", "logo_cmr.svg", "logo_egy.svg", "logo_mar.svg", "logo_ngr.svg", "logo_sen.svg",
+    ]
+    return {filename: get_static_asset_url(filename) for filename in filenames}
 
 # --- Streamlit UI Components ---
-def display_message(role, content, mascott_b64, coupe_b64):
-    """Displays a chat message in the Streamlit UI."""
+def img_tag(url: str, css_class: str, style: str = "") -> str:
+    """Returns an <img> tag for a static asset, or nothing if the asset is missing."""
+    if not url:
+        return ""
+    style_attribute = f' style="{style}"' if style else ""
+    return f'<img src="{url}" class="{css_class}"{style_attribute}>'
+
+def message_html(role, content, assets):
+    """Returns the HTML of one chat message."""
     if role == "user":
-        st.markdown(f'<div class="chat-message-user">{content}</div>', unsafe_allow_html=True)
-    else:
-        # For AI messages, include the avatar and the expert badge
-        badge_html = f'<span class="expert-badge"><img src="data:image/svg+xml;base64,{coupe_b64}" class="mini-coupe"> Expert CAN</span>'
-        message_html = f'''
-        <div class="chat-message-ai">
-            <img src="data:image/png;base64,{mascott_b64}" class="ai-avatar">
-            <div class="ai-content">
-                {badge_html}
-                <p>{content}</p>
-            </div>
+        return f'<div class="chat-message-user">{content}</div>'
+    # For AI messages, include the avatar and the expert badge
+    badge_html = f'<span class="expert-badge">{img_tag(assets["coupe.svg"], "mini-coupe")} Expert CAN</span>'
+    return f'''
+    <div class="chat-message-ai">
+        {img_tag(assets["mascott.png"], "ai-avatar")}
+        <div class="ai-content">
+            {badge_html}
+            <p>{content}</p>
         </div>
-        '''
-        st.markdown(message_html, unsafe_allow_html=True)
-        st.session_state.ai_responding = False
+    </div>
+    '''
 
-def main_streamlit_app():
-    """Main function for the Streamlit RAG application, with integrated visual assets."""
-    st.set_page_config(page_title="CAN Assistant Pro", page_icon="⚽", layout="wide")
+# --- Chat Sessions ---
+# Conversations are persisted in the SQLite session store. Session state only
+# holds a window of the conversation (messages_display, with the matching
+# pre-rendered HTML in history_html): its tail, or older pages loaded on demand,
+# never more than SESSION_WINDOW_MESSAGES messages.
+def get_session_id() -> str:
+    """Returns this conversation's id, kept in the URL so it survives reloads and restarts."""
+    session_id = st.query_params.get("session")
+    if not session_id:
+        session_id = uuid.uuid4().hex
+        st.query_params["session"] = session_id
+    return session_id
 
-    # --- Load and Encode Assets ---
-    assets_path = Path(__file__).parent / "public"
-    coupe_b64 = get_image_as_base64(str(assets_path / "coupe.svg"))
-    logo_b64 = get_image_as_base64(str(assets_path / "logo.png"))
-    ball_b64 = get_image_as_base64(str(assets_path / "png-ball.png"))
-    mascott_b64 = get_image_as_base64(str(assets_path / "mascott.png"))
-    
-    flags = {
-        "Algérie": get_image_as_base64(str(assets_path / "logo_alg.svg")),
-        "Cameroun": get_image_as_base64(str(assets_path / "logo_cmr.svg")),
-        "Égypte": get_image_as_base64(str(assets_path / "logo_egy.svg")),
-        "Maroc": get_image_as_base64(str(assets_path / "logo_mar.svg")),
-        "Nigeria": get_image_as_base64(str(assets_path / "logo_ngr.svg")),
-        "Sénégal": get_image_as_base64(str(assets_path / "logo_sen.svg")),
-    }
-    
-    # Initialize session state for mascot visibility
-    if "ai_responding" not in st.session_state:
-        st.session_state.ai_responding = False
+def show_tail(assets):
+    """Loads the tail of the conversation into session state, replacing the current window."""
+    session_id = st.session_state.session_id
+    messages = get_session_store().tail(session_id, config.SESSION_TAIL_MESSAGES)
+    st.session_state.messages_display = messages
+    st.session_state.history_html = [message_html(m["role"], m["content"], assets) for m in messages]
+    st.session_state.has_older = bool(messages) and get_session_store().has_before(session_id, messages[0]["id"])
+    st.session_state.at_tail = True
 
-    # Apply custom CSS
-    st.markdown(f"""
-    <style>
-        @keyframes float {{
-            0% {{ transform: translateY(0px); }}
-            50% {{ transform: translateY(-20px); }}
-            100% {{ transform: translateY(0px); }}
-        }}
+def load_session(session_id: str, assets):
+    """Loads the tail of the conversation into session state, once per browser session."""
+    if st.session_state.get("session_id") == session_id:
+        return
+    st.session_state.session_id = session_id
+    show_tail(assets)
 
-        .stApp {{
-            background-color: #800000;
-            background-attachment: fixed;
-        }}
-        
-        .floating-ball {{
-            position: fixed;
-            bottom: -50px;
-            right: 10%;
-            width: 150px;
-            height: auto;
-            z-index: 0;
-            animation: float 6s ease-in-out infinite;
-        }}
+def load_older_messages(assets):
+    """
+    Prepends the previous page of the conversation to the loaded messages and
+    drops the newest ones beyond SESSION_WINDOW_MESSAGES.
+    """
+    store = get_session_store()
+    session_id = st.session_state.session_id
+    first_id = st.session_state.messages_display[0]["id"]
+    older = store.page(session_id, config.SESSION_PAGE_MESSAGES, before_id=first_id)
+    st.session_state.messages_display = older + st.session_state.messages_display
+    st.session_state.history_html = [message_html(m["role"], m["content"], assets) for m in older] + st.session_state.history_html
+    st.session_state.has_older = bool(older) and store.has_before(session_id, older[0]["id"])
+    overflow = len(st.session_state.messages_display) - config.SESSION_WINDOW_MESSAGES
+    if overflow > 0:
+        del st.session_state.messages_display[-overflow:]
+        del st.session_state.history_html[-overflow:]
+        st.session_state.at_tail = False
 
-        .mascott-container {{
-            position: fixed;
-            bottom: 0;
-            left: 10px;
-            width: 250px;
-            height: auto;
-            z-index: 10;
-            transition: opacity 0.5s ease-in-out, transform 0.5s ease-in-out;
-            opacity: {'1' if st.session_state.get('ai_responding', False) else '0'};
-            transform: {'translateY(0)' if st.session_state.get('ai_responding', False) else 'translateY(100%)'};
-        }}
-        
-        .main-header {{
-            position: relative;
-            background-color: rgba(0,0,0,0.3);
-            backdrop-filter: blur(10px);
-            padding: 5px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-            text-align: center;
-        }}
+def add_message(role, content, assets):
+    """Stores a message and appends it to the in-memory tail, dropping what falls out of it."""
+    message = get_session_store().append(st.session_state.session_id, role, content)
+    if not st.session_state.at_tail:
+        # The window shows an older part of the conversation: go back to its end.
+        show_tail(assets)
+        return
+    st.session_state.messages_display.append(message)
+    st.session_state.history_html.append(message_html(role, content, assets))
+    overflow = len(st.session_state.messages_display) - config.SESSION_TAIL_MESSAGES
+    if overflow > 0:
+        del st.session_state.messages_display[:overflow]
+        del st.session_state.history_html[:overflow]
+        st.session_state.has_older = True
 
-        .main-logo {{
-            width: 300px;
-            height: auto;
-        }}
+def mascott_html(assets, visible: bool) -> str:
+    visibility = " visible" if visible else ""
+    return f'<div class="mascott-container{visibility}">{img_tag(assets["mascott.png"], "", "width:100%;")}</div>'
 
-        .top-right-logo {{
-            position: absolute;
-            top: 10px;
-            right: 15px;
-            width: 70px;
-            height: auto;
-        }}
-        
-        .main .block-container {{ padding-top: 1rem; padding-bottom: 2rem; }}
-        .stTextInput > div > div > input {{ border-radius: 10px; border: 1px solid #07A88F; padding: 10px; color: #000000; }}
-        .stButton > button {{ background-color: #07A88F; color: #FFFFFF; border-radius: 10px; border: none; padding: 10px 20px; font-weight: bold; }}
-        
-        .chat-message-user {{ background-color: #FFFFFF; color: #000000; border: 1px solid #B2382D; padding: 10px; border-radius: 10px; margin-bottom: 10px; margin-left: 20%; text-align: right; box-shadow: 2px 2px 5px rgba(0,0,0,0.2); }}
-        
-        .chat-message-ai {{
-            display: flex;
-            align-items: flex-start;
-            background: #FFFFFF;
-            color: #006051;
-            padding: 15px;
-            border-radius: 10px;
-            margin-bottom: 10px;
-            margin-right: 20%;
-            text-align: left;
-            box-shadow: 2px 2px 5px rgba(0,0,0,0.2);
-        }}
-        
-        .ai-avatar {{
-            width: 48px;
-            height: 48px;
-            border-radius: 50%;
-            margin-right: 15px;
-            border: 2px solid #07A88F;
-        }}
-        .ai-content p {{
-            margin: 0;
-            padding-top: 5px;
-        }}
+def render_streamed_answer(chunks, placeholder, assets, min_interval: float = 0.1) -> str:
+    """
+    Renders an answer into `placeholder` as its chunks arrive and returns the full text.
+    Redraws are throttled to one every `min_interval` seconds, since each one
+    resends the whole message to the browser.
+    """
+    content = ""
+    last_render = 0.0
+    for chunk in chunks:
+        content += chunk
+        now = time.monotonic()
+        if now - last_render >= min_interval:
+            placeholder.markdown(message_html("assistant", content + " ▌", assets), unsafe_allow_html=True)
+            last_render = now
+    placeholder.markdown(message_html("assistant", content, assets), unsafe_allow_html=True)
+    return content
 
-        .expert-badge {{
-            background-color: #07A88F;
-            color: #FFFFFF;
-            padding: 3px 8px;
-            border-radius: 5px;
-            font-size: 0.8em;
-            font-weight: bold;
-            display: inline-flex;
-            align-items: center;
-        }}
-        .mini-coupe {{
-            width: 16px;
-            height: 16px;
-            margin-right: 5px;
-        }}
+def main_streamlit_app():
+    """Main function for the Streamlit RAG application, with integrated visual assets."""
+    st.set_page_config(page_title="CAN Assistant Pro", page_icon="⚽", layout="wide")
 
-        [data-testid="stSidebar"] > div:first-child {{
-            background-color: #006051;
-            color: #FFFFFF;
-        }}
-        [data-testid="stSidebar"] h2, [data-testid="stSidebar"] h3 {{
-             color: #FDB913;
-        }}
-        .flag-container {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 15px;
-            justify-content: center;
-        }}
-        .flag-item {{
-            text-align: center;
-        }}
-        .flag-item a {{
-            display: block;
-            transition: transform 0.2s;
-        }}
-        .flag-item a:hover {{
-            transform: scale(1.1);
-        }}
-        .flag-image {{
-            width: 50px;
-            height: 50px;
-            object-fit: contain;
-        }}
-    </style>
-    """, unsafe_allow_html=True)
+    # --- Resolve Asset URLs (cached per process) ---
+    assets = get_asset_urls()
+    
+    flags = {
+        "Algérie": assets["logo_alg.svg"],
+        "Cameroun": assets["logo_cmr.svg"],
+        "Égypte": assets["logo_egy.svg"],
+        "Maroc": assets["logo_mar.svg"],
+        "Nigeria": assets["logo_ngr.svg"],
+        "Sénégal": assets["logo_sen.svg"],
+    }
+    
+    # Apply custom CSS (a one-line import of the cached stylesheet)
+    st.markdown(f'<style>@import url("{assets["styles.css"]}");</style>', unsafe_allow_html=True)
     
     # --- Floating Ball and Mascot ---
-    st.markdown(f'<img src="data:image/png;base64,{ball_b64}" class="floating-ball">', unsafe_allow_html=True)
-    st.markdown(f'<div class="mascott-container"><img src="data:image/png;base64,{mascott_b64}" style="width:100%;"></div>', unsafe_allow_html=True)
+    # The mascot lives in a placeholder so it can be shown while an answer is
+    # generated and hidden again within the same run.
+    st.markdown(img_tag(assets["png-ball.png"], "floating-ball"), unsafe_allow_html=True)
+    mascott_placeholder = st.empty()
+    mascott_placeholder.markdown(mascott_html(assets, visible=False), unsafe_allow_html=True)
 
     # --- Header ---
     st.markdown(f'''
     <div class="main-header">
-        <img src="data:image/svg+xml;base64,{coupe_b64}" class="main-logo">
-        <img src="data:image/png;base64,{logo_b64}" class="top-right-logo">
+        {img_tag(assets["coupe.svg"], "main-logo")}
+        {img_tag(assets["logo.png"], "top-right-logo")}
     </div>
     ''', unsafe_allow_html=True)
     st.markdown("### Votre expert IA pour la Coupe d'Afrique des Nations 2025", unsafe_allow_html=True)
 
     # --- RAG Pipeline Initialization ---
-    try:
-        chain_manager = get_chain_manager()
-    except Exception as e:
-        st.error(f"Erreur critique lors de l'initialisation du gestionnaire de chaîne RAG: {{e}}")
-        logger.error(f"Critical error during RAG chain manager initialization: {{e}}", exc_info=True)
-        st.stop()
+    if not config.ASSISTANT_API_URL:
+        try:
+            get_streamlit_chain_manager()
+        except Exception as e:
+            st.error(f"Erreur critique lors de l'initialisation du gestionnaire de chaîne RAG: {e}")
+            logger.error(f"Critical error during RAG chain manager initialization: {e}", exc_info=True)
+            st.stop()
 
-    # Initialize chat history
-    if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
-    
-    # Display chat messages from history on app rerun
-    for message in st.session_state.get("messages_display", []):
-        display_message(message["role"], message["content"], mascott_b64, coupe_b64)
+    # Load the conversation tail from the session store
+    load_session(get_session_id(), assets)
+
+    if st.session_state.has_older and st.button("Afficher les messages précédents"):
+        load_older_messages(assets)
+    if not st.session_state.at_tail and st.button("Revenir aux derniers messages"):
+        show_tail(assets)
+
+    # Previous messages are drawn as one element from HTML rendered when each
+    # message was added, so a run only builds the markup of its new messages.
+    if st.session_state.history_html:
+        st.markdown("".join(st.session_state.history_html), unsafe_allow_html=True)
 
     # Chat input
     user_query = st.chat_input("Posez votre question ici...")
 
+    # A question is answered and displayed within the run that received it.
     if user_query:
-        if "messages_display" not in st.session_state:
-             st.session_state.messages_display = []
-        st.session_state.messages_display.append({{"role": "user", "content": user_query}})
-        display_message("user", user_query, mascott_b64, coupe_b64)
-
+        st.markdown(message_html("user", user_query, assets), unsafe_allow_html=True)
         mode = get_query_mode(user_query)
-        st.session_state.chat_history.append(HumanMessage(content=user_query))
-        
-        # Set state to show mascot, then rerun to update UI
-        st.session_state.ai_responding = True
-        st.rerun()
-
-    if st.session_state.ai_responding:
-        last_query = st.session_state.chat_history[-1].content
-        mode = get_query_mode(last_query)
+        # Read from the store: the window in memory may show an older part of the conversation.
+        previous_turns = history_to_messages(get_session_store().tail(st.session_state.session_id, config.SESSION_CONTEXT_MESSAGES))
+        add_message("user", user_query, assets)
 
-        with st.spinner(f"L'assistant réfléchit (Mode: {{mode}})..."):
-            try:
-                rag_chain = chain_manager.get_rag_chain(mode=mode)
-                response = rag_chain.invoke({
-                    "chat_history": st.session_state.chat_history,
-                    "input": last_query
-                })
-                ai_response_content = response
-                st.session_state.messages_display.append({{"role": "assistant", "content": ai_response_content}})
-                st.session_state.chat_history.append(AIMessage(content=ai_response_content))
-                
-                # Immediately hide mascot and rerun to display message
-                st.session_state.ai_responding = False
-                st.rerun()
+        mascott_placeholder.markdown(mascott_html(assets, visible=True), unsafe_allow_html=True)
+        answer_placeholder = st.empty()
+        try:
+            with st.spinner(f"L'assistant réfléchit (Mode: {mode})..."):
+                ai_response_content = render_streamed_answer(
+                    stream_answer(user_query, previous_turns, mode), answer_placeholder, assets
+                )
+        except Exception as e:
+            ai_response_content = f"Désolé, une erreur est survenue: {e}"
+            answer_placeholder.markdown(message_html("assistant", ai_response_content, assets), unsafe_allow_html=True)
+            logger.error(f"Error while invoking RAG chain: {e}", exc_info=True)
+        finally:
+            mascott_placeholder.markdown(mascott_html(assets, visible=False), unsafe_allow_html=True)
 
-            except Exception as e:
-                error_message = f"Désolé, une erreur est survenue: {{e}}"
-                st.session_state.messages_display.append({{"role": "assistant", "content": error_message}})
-                st.session_state.chat_history.append(AIMessage(content=error_message))
-                logger.error(f"Error while invoking RAG chain: {{e}}", exc_info=True)
-                
-                # Hide mascot on error and rerun
-                st.session_state.ai_responding = False
-                st.rerun()
+        add_message("assistant", ai_response_content, assets)
 
     # Sidebar for additional features
     with st.sidebar:
@@ -344,12 +293,12 @@ def main_streamlit_app():
         
         st.subheader("Équipes favorites")
         flag_html = '<div class="flag-container">'
-        for country, b64_str in flags.items():
-            if b64_str:
+        for country, flag_url in flags.items():
+            if flag_url:
                 flag_html += f'''
                 <div class="flag-item">
                     <a href="#" title="{country}">
-                        <img src="data:image/svg+xml;base64,{b64_str}" class="flag-image">
+                        {img_tag(flag_url, "flag-image")}
                     </a>
                 </div>
                 '''
@@ -357,8 +306,12 @@ def main_streamlit_app():
         st.markdown(flag_html, unsafe_allow_html=True)
         
         st.markdown("---")
+        if config.TRACING_ENABLED:
+            display_trace_panel()
         if st.button("Effacer la conversation"):
-            st.session_state.chat_history = []
+            get_session_store().clear(st.session_state.session_id)
             st.session_state.messages_display = []
-            st.session_state.ai_responding = False
+            st.session_state.history_html = []
+            st.session_state.has_older = False
+            st.session_state.at_tail = True
             st.rerun()
\ No newline at end of file
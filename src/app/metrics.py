@@ -0,0 +1,26 @@
+"""
+Small helpers for summarising latency samples, shared by the LLM pool and the
+batch, benchmark and load-test entry points.
+"""
+from typing import Dict, Iterable, Optional
+
+
+def percentile(samples: Iterable[float], pct: float) -> Optional[float]:
+    """Returns the nearest-rank percentile of `samples`, or None if there are none."""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_summary(samples: Iterable[float]) -> Dict[str, Optional[float]]:
+    """Returns count, mean and p50/p95/p99 of latency samples (in seconds)."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) if ordered else None,
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+    }
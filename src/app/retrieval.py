@@ -1,32 +1,51 @@
 import logging
-import streamlit as st
-from langchain_chroma import Chroma
+from functools import lru_cache
 from src import config
-from src.app.llm_services import get_azure_openai_embeddings_model
+from src.app.llm_services import get_embeddings_model
 
 logger = logging.getLogger(__name__)
 
-@st.cache_resource
+def _has_compact_index() -> bool:
+    return config.USE_COMPRESSED_INDEX and (config.COMPRESSED_INDEX_PATH / "manifest.json").exists()
+
+@lru_cache(maxsize=None)
 def get_vector_store():
-    """Initializes and returns the ChromaDB vector store."""
+    """
+    Initializes and returns the vector store: the activated compact index if
+    any, else the index snapshot, else ChromaDB. Raises FileNotFoundError if
+    the ingestion pipeline has not been run yet.
+    """
+    # A snapshot is enough on its own: replicas may have it without the Chroma directory.
+    if config.USE_INDEX_SNAPSHOT and config.INDEX_SNAPSHOT_PATH.exists() and not _has_compact_index():
+        from src.ingestion.snapshot import open_snapshot
+        vectorstore = open_snapshot(config.INDEX_SNAPSHOT_PATH, get_embeddings_model(), verify=config.INDEX_SNAPSHOT_VERIFY)
+        if vectorstore is not None and vectorstore.manifest["model_backend"] != config.MODEL_BACKEND:
+            logger.warning(f"Ignoring index snapshot built with the '{vectorstore.manifest['model_backend']}' backend.")
+        elif vectorstore is not None:
+            manifest = vectorstore.manifest
+            logger.info(f"Index snapshot loaded from {config.INDEX_SNAPSHOT_PATH} ({manifest['count']} chunks, "
+                        f"format v{manifest['format_version']}, created {manifest['created_at']}).")
+            return vectorstore
+
     logger.info(f"Attempting to load ChromaDB from {config.CHROMA_DB_PATH}...")
-    try:
-        embeddings = get_azure_openai_embeddings_model()
-        if embeddings is None:
-            st.error("Embeddings model failed to initialize. Cannot load vector store.")
-            st.stop()
-            return None
-            
-        if not config.CHROMA_DB_PATH.exists() or not any(config.CHROMA_DB_PATH.iterdir()):
-            st.warning(f"ChromaDB not found at {config.CHROMA_DB_PATH}. Please run the ingestion pipeline ('python ingest.py') first.")
-            st.stop()
-            return None
+    if not config.CHROMA_DB_PATH.exists() or not any(config.CHROMA_DB_PATH.iterdir()):
+        raise FileNotFoundError(f"ChromaDB not found at {config.CHROMA_DB_PATH}. Please run the ingestion pipeline ('python ingest.py') first.")
 
+    if _has_compact_index():
+        from src.ingestion.compression import CompressedVectorStore
+        vectorstore = CompressedVectorStore(config.COMPRESSED_INDEX_PATH, get_embeddings_model())
+        manifest = vectorstore.manifest
+        logger.info(f"Compact index loaded ({manifest['method']}, {manifest['dims']} dims, int8={manifest['quantized']}, "
+                    f"recall@{manifest['k']}={manifest['recall']}).")
+        return vectorstore
+
+    try:
+        # Imported here: Chroma's client takes about half a second to import.
+        from langchain_chroma import Chroma
+        embeddings = get_embeddings_model()
         vectorstore = Chroma(persist_directory=str(config.CHROMA_DB_PATH), embedding_function=embeddings)
         logger.info("ChromaDB loaded successfully.")
         return vectorstore
     except Exception as e:
         logger.error(f"Error loading ChromaDB: {e}. Ensure the ingestion pipeline has run successfully.", exc_info=True)
-        st.error(f"Error loading ChromaDB: {e}. Please ensure the data ingestion pipeline has been run.")
-        st.stop()
-        return None
\ No newline at end of file
+        raise
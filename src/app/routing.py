@@ -0,0 +1,173 @@
+"""
+Query intent routing.
+
+classify_intent sorts a question into one of INTENTS with keyword rules on its
+normalized text, in well under a millisecond and without any model call:
+
+- chit_chat: greetings, thanks, farewells and "what can you do" questions;
+- out_of_domain: questions on an unrelated topic (weather, recipes...) that
+  mention nothing about football or the CAN;
+- summary / stats: requests for a summary or for figures, each with its prompt;
+- factoid: everything else, answered by the default prompt.
+
+QueryRouter answers the first two from templates, so the chain skips the
+query embedding, the vector search and the LLM for them; the other intents go
+through retrieval with the depth configured for their mode
+(config.RETRIEVAL_K_BY_MODE).
+"""
+import logging
+import threading
+from collections import Counter
+from typing import Optional, Tuple
+
+from src.app.entities import TEAM_ALIASES, YEAR_PATTERN, normalize
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ("chit_chat", "out_of_domain", "summary", "stats", "factoid")
+# Prompt mode of the intents that go through retrieval.
+INTENT_MODES = {"summary": "summary", "stats": "stats", "factoid": "default"}
+
+# --- Vocabulary (normalized: lowercase, no accents) ---
+_GREETINGS = {"bonjour", "salut", "bonsoir", "coucou", "hello", "hi", "hey", "bjr", "slt"}
+_THANKS = {"merci", "thanks", "thx"}
+_FAREWELLS = {"revoir", "bye", "ciao", "adieu", "bientot"}
+# Words that may accompany the ones above in a message that is still only small talk.
+_SMALL_TALK = {"ok", "okay", "d", "accord", "daccord", "super", "top", "parfait", "genial", "cool", "tres", "bien",
+               "beaucoup", "a", "au", "plus", "ca", "va", "vas", "tu", "toi", "vous", "allez", "et", "comment",
+               "bonne", "journee", "soiree", "nuit", "oui", "pour", "tout", "l", "aide", "mon", "ami", "encore"}
+_HELP_PHRASES = ("qui es tu", "tu es qui", "que sais tu faire", "que peux tu faire", "tu peux faire quoi",
+                 "comment ca marche", "comment tu marches")
+
+_SUMMARY_PREFIXES = ("resum", "synthe", "recapitul")
+_STATS_PREFIXES = ("combien", "statisti", "donnee", "classement", "pourcentage", "moyenne")
+_STATS_PHRASES = ("quel est le score", "nombre de")
+
+# Any of these makes a question in domain, whatever else it says.
+_DOMAIN_WORDS = {"can", "caf", "but", "buts", "var", "nul", "foot", "coach"}
+_DOMAIN_PREFIXES = ("football", "match", "buteur", "equipe", "selection", "joueur", "entraineur", "stade", "groupe",
+                    "final", "demi", "quart", "huitieme", "tournoi", "competition", "afriq", "africain", "coupe",
+                    "arbitr", "penalt", "score", "classement", "gardien", "attaquant", "defenseur", "milieu",
+                    "ballon", "qualif", "victoire", "defaite", "champion", "edition", "maillot", "supporter",
+                    "carton", "sponsor", "billet", "mascotte")
+_DOMAIN_NAMES = frozenset(normalize(name) for canonical, aliases in TEAM_ALIASES.items() for name in (canonical, *aliases))
+# Topics the corpus cannot cover, by words that cannot be about the tournament on their own
+# (not "programme", "chanson" or "musique": the match schedule, the official song).
+_OFF_TOPIC_PREFIXES = ("meteo", "recette", "cuisin", "bourse", "crypto", "bitcoin", "python", "javascript",
+                       "film", "politiq", "election", "impot", "medecin", "maladi", "hotel",
+                       "tennis", "basket", "nba", "rugby", "cyclism", "mathemati", "horoscope")
+
+# --- Templated Replies ---
+_GREETING_REPLY = ("Bonjour ! Je suis l'assistant de la Coupe d'Afrique des Nations. Posez-moi une question sur "
+                   "les équipes, les joueurs, les matchs ou l'histoire de la CAN.")
+_THANKS_REPLY = "Avec plaisir ! N'hésitez pas si vous avez d'autres questions sur la CAN."
+_FAREWELL_REPLY = "Au revoir et bonne CAN !"
+_HELP_REPLY = ("Je réponds aux questions sur la Coupe d'Afrique des Nations à partir d'articles et de données "
+               "collectés : équipes et effectifs, résultats, statistiques, résumés de l'actualité du tournoi.")
+_OUT_OF_DOMAIN_REPLY = ("Je suis spécialisé dans la Coupe d'Afrique des Nations et ne peux pas répondre à cette "
+                        "question. Posez-moi plutôt une question sur la CAN, ses équipes ou ses joueurs.")
+
+
+def _has_prefix(tokens, prefixes) -> bool:
+    return any(token.startswith(prefixes) for token in tokens)
+
+
+def _small_talk_reply(text: str, tokens: list) -> Optional[str]:
+    """The templated reply when the whole message is small talk, else None."""
+    words = set(tokens)
+    small_talk = _GREETINGS | _THANKS | _FAREWELLS | _SMALL_TALK
+    padded = f" {text} "
+    for phrase in _HELP_PHRASES:
+        # "Comment ça marche la VAR ?" is a question, not a request for help.
+        if f" {phrase} " in padded and set(padded.replace(f" {phrase} ", " ").split()) <= small_talk:
+            return _HELP_REPLY
+    if not words or not words <= small_talk:
+        return None
+    if words & _FAREWELLS:
+        return _FAREWELL_REPLY
+    if words & _THANKS:
+        return _THANKS_REPLY
+    if words & _GREETINGS:
+        return _GREETING_REPLY
+    return None
+
+
+def _in_domain(text: str, tokens: list) -> bool:
+    padded = f" {text} "
+    return (
+        bool(set(tokens) & _DOMAIN_WORDS)
+        or _has_prefix(tokens, _DOMAIN_PREFIXES)
+        or bool(YEAR_PATTERN.search(text))
+        or any(f" {name} " in padded for name in _DOMAIN_NAMES)
+    )
+
+
+def _classify(query: str, has_history: bool = False) -> Tuple[str, Optional[str]]:
+    text = normalize(query)
+    tokens = text.split()
+    reply = _small_talk_reply(text, tokens)
+    if reply is not None:
+        return "chit_chat", reply
+    # A follow-up ("Et contre le Nigeria ?") is only judged after rephrasing, so never refused here.
+    if not has_history and _has_prefix(tokens, _OFF_TOPIC_PREFIXES) and not _in_domain(text, tokens):
+        return "out_of_domain", _OUT_OF_DOMAIN_REPLY
+    if _has_prefix(tokens, _SUMMARY_PREFIXES):
+        return "summary", None
+    if _has_prefix(tokens, _STATS_PREFIXES) or any(phrase in text for phrase in _STATS_PHRASES):
+        return "stats", None
+    return "factoid", None
+
+
+def classify_intent(query: str, has_history: bool = False) -> str:
+    """Returns the intent of `query`, one of INTENTS."""
+    return _classify(query, has_history)[0]
+
+
+# --- Mode Selection Logic ---
+def get_query_mode(query: str) -> str:
+    """
+    Analyzes the user query to determine the appropriate prompt mode.
+    """
+    mode = INTENT_MODES.get(classify_intent(query), "default")
+    logger.info(f"Query identified as '{mode}' mode.")
+    return mode
+
+
+class QueryRouter:
+    """
+    Decides, per request, whether the chain answers from a template or goes
+    through retrieval and generation, and keeps count of its decisions. The
+    latency saved by a templated reply is estimated from the running average
+    of the requests that went through the full chain (record_full_request).
+    """
+
+    # Weight of the latest full request in the running average.
+    _SMOOTHING = 0.2
+
+    def __init__(self):
+        self.decisions = Counter()
+        self._full_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def route(self, query: str, has_history: bool = False) -> Tuple[str, Optional[str]]:
+        """Returns (intent, templated reply), the reply being None when the chain must answer."""
+        intent, reply = _classify(query, has_history)
+        with self._lock:
+            self.decisions[intent] += 1
+            saved = self._full_seconds
+        if reply is not None:
+            estimate = f"~{saved:.2f}s saved" if saved is not None else "no full request timed yet"
+            logger.info(f"Intent '{intent}': templated reply, retrieval and generation skipped ({estimate}).")
+        return intent, reply
+
+    def record_full_request(self, seconds: float):
+        with self._lock:
+            if self._full_seconds is None:
+                self._full_seconds = seconds
+            else:
+                self._full_seconds += self._SMOOTHING * (seconds - self._full_seconds)
+
+    @property
+    def estimated_saving(self) -> Optional[float]:
+        """Average seconds of a request through the full chain, None before the first one."""
+        return self._full_seconds
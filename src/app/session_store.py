@@ -0,0 +1,99 @@
+"""
+SQLite-backed storage for chat conversations.
+
+Messages are appended to a local database as they are exchanged, so a
+conversation survives process restarts and the UI only needs to keep its
+latest messages in memory; older ones are read back a page at a time.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id);
+"""
+
+
+class SessionStore:
+    """
+    Stores messages as {"id", "role", "content"} rows per session. Message ids
+    increase with time, so a page of older messages is "the `limit` messages
+    before id X". One connection is shared by all threads behind a lock.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            # WAL lets readers proceed while a message is being written.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def append(self, session_id: str, role: str, content: str) -> dict:
+        """Stores one message and returns it with its id."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                (session_id, role, content, time.time()),
+            )
+        return {"id": cursor.lastrowid, "role": role, "content": content}
+
+    def tail(self, session_id: str, limit: int) -> List[dict]:
+        """Returns the latest `limit` messages of a session, oldest first."""
+        return self.page(session_id, limit)
+
+    def page(self, session_id: str, limit: int, before_id: Optional[int] = None) -> List[dict]:
+        """Returns up to `limit` messages preceding `before_id` (or the latest ones), oldest first."""
+        query = "SELECT id, role, content FROM messages WHERE session_id = ?"
+        params = [session_id]
+        if before_id is not None:
+            query += " AND id < ?"
+            params.append(before_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def has_before(self, session_id: str, before_id: int) -> bool:
+        """True if the session has messages older than `before_id`."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM messages WHERE session_id = ? AND id < ? LIMIT 1", (session_id, before_id)
+            ).fetchone()
+        return row is not None
+
+    def clear(self, session_id: str):
+        """Deletes every message of a session."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def get_session_store() -> SessionStore:
+    """Returns the process-wide session store."""
+    logger.info(f"Opening session store at {config.SESSION_DB_PATH}")
+    return SessionStore(config.SESSION_DB_PATH)
@@ -0,0 +1,181 @@
+"""
+Per-request latency tracing for the RAG chain.
+
+The chain in chain.py names each stage (rephrase, embed_query, vector_search,
+compress_context, format_context, generate). LatencyTracer is a LangChain callback handler that
+times those named runs, attributes LLM activity to the stage it belongs to
+(time-to-first-token and token counts) and, when the root run finishes, appends
+the trace as one JSON line to TRACE_LOG_PATH. A stage whose output dict holds
+SPAN_ATTRIBUTES_KEY has those attributes added to its span.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+TRACED_STAGES = ("intent_route", "entity_route", "rephrase", "expand_query", "embed_query", "vector_search",
+                 "compress_context", "format_context", "generate")
+SPAN_ATTRIBUTES_KEY = "span_attributes"
+
+_write_lock = threading.Lock()
+
+
+def write_trace(trace: dict, path: Path = None):
+    """Appends one trace to the JSONL trace log."""
+    path = path or config.TRACE_LOG_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _write_lock, open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(trace, ensure_ascii=False) + "\n")
+
+
+class LatencyTracer(BaseCallbackHandler):
+    """
+    Collects one trace per chain invocation. Pass a fresh instance in the
+    `callbacks` of each invoke/ainvoke/stream call; `trace` holds the result
+    once the invocation has finished.
+    """
+
+    # Run synchronously in the calling thread / event loop so timestamps are exact.
+    run_inline = True
+
+    def __init__(self, mode: str = "default", write: bool = True, **attributes: Any):
+        self.trace_id = uuid.uuid4().hex
+        self.mode = mode
+        self.write = write
+        self.attributes = attributes
+        self.trace: Optional[dict] = None
+        self._root: Optional[UUID] = None
+        self._start = time.perf_counter()
+        self._parents: Dict[UUID, Optional[UUID]] = {}
+        self._stage_of: Dict[UUID, str] = {}
+        self._spans: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _offset(self) -> float:
+        return time.perf_counter() - self._start
+
+    def _stage_for(self, run_id: Optional[UUID]) -> Optional[str]:
+        """Finds the traced stage a run belongs to by walking up its parents."""
+        while run_id is not None:
+            if run_id in self._stage_of:
+                return self._stage_of[run_id]
+            run_id = self._parents.get(run_id)
+        return None
+
+    def _span(self, stage: str) -> dict:
+        return self._spans.setdefault(stage, {"name": stage})
+
+    # --- Chain runs ---
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any):
+        with self._lock:
+            if self.trace is not None:
+                return
+            if self._root is None:
+                self._root = run_id
+                self._start = time.perf_counter()
+            self._parents[run_id] = parent_run_id
+            name = kwargs.get("name") or (serialized or {}).get("name")
+            if name in TRACED_STAGES:
+                self._stage_of[run_id] = name
+                self._span(name).setdefault("start", self._offset())
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            if self.trace is not None:
+                return
+            stage = self._stage_of.get(run_id)
+            if stage:
+                self._spans[stage]["end"] = self._offset()
+                if isinstance(outputs, dict) and isinstance(outputs.get(SPAN_ATTRIBUTES_KEY), dict):
+                    self._spans[stage].update(outputs[SPAN_ATTRIBUTES_KEY])
+            if run_id == self._root:
+                self._finish("ok")
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            if self.trace is None and run_id == self._root:
+                self._finish("error", error=str(error))
+
+    # --- LLM runs ---
+    def _on_model_start(self, run_id: UUID, parent_run_id: Optional[UUID]):
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+            stage = self._stage_for(run_id)
+            if self.trace is None and stage:
+                self._span(stage).setdefault("_llm_start", self._offset())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any):
+        self._on_model_start(run_id, parent_run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any):
+        self._on_model_start(run_id, parent_run_id)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            stage = self._stage_for(run_id)
+            if self.trace is not None or not stage:
+                return
+            span = self._span(stage)
+            if "time_to_first_token" not in span and "_llm_start" in span:
+                # Measured from the model call, not the stage start, which may be
+                # earlier when the stage is set up before its input is streamed in.
+                span["time_to_first_token"] = round(self._offset() - span["_llm_start"], 4)
+            span["streamed_tokens"] = span.get("streamed_tokens", 0) + 1
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            stage = self._stage_for(run_id)
+            if self.trace is not None or not stage:
+                return
+            span = self._span(stage)
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if usage:
+                        span["input_tokens"] = span.get("input_tokens", 0) + usage.get("input_tokens", 0)
+                        span["output_tokens"] = span.get("output_tokens", 0) + usage.get("output_tokens", 0)
+
+    # --- Result ---
+    def _finish(self, status: str, error: Optional[str] = None):
+        spans = []
+        previous_end = 0.0
+        for stage in TRACED_STAGES:
+            if stage not in self._spans or "end" not in self._spans[stage]:
+                continue
+            span = {key: value for key, value in self._spans[stage].items() if not key.startswith("_")}
+            # Stages run one after another; when streaming, a stage's run opens
+            # before its input is ready, so its time starts at the previous stage's end.
+            start = max(span["start"], previous_end)
+            span["start"] = round(start, 4)
+            span["duration"] = round(span.pop("end") - start, 4)
+            previous_end = start + span["duration"]
+            if "output_tokens" not in span and "streamed_tokens" in span:
+                span["output_tokens"] = span["streamed_tokens"]
+            spans.append(span)
+        self.trace = {
+            "trace_id": self.trace_id,
+            "timestamp": datetime.now().isoformat(),
+            "mode": self.mode,
+            "status": status,
+            "total_seconds": round(self._offset(), 4),
+            "spans": spans,
+            **self.attributes,
+        }
+        if error:
+            self.trace["error"] = error
+        if self.write and config.TRACING_ENABLED:
+            try:
+                write_trace(self.trace)
+            except OSError as e:
+                logger.warning(f"Could not write trace {self.trace_id}: {e}")
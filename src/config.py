@@ -19,28 +19,229 @@ AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2023-05-15")
 AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME")
 
+# --- Model Backend ---
+# "remote" uses the Hugging Face and Azure OpenAI APIs. "offline" swaps in the
+# local deterministic models from src/offline_models.py so the app, the HTTP API
+# and the tooling run without network access or API keys.
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "remote")
+OFFLINE_EMBEDDING_SIZE = 512
+# Artificial latency (seconds) added by the offline models to mimic the real endpoints.
+OFFLINE_LLM_LATENCY = float(os.getenv("OFFLINE_LLM_LATENCY", "0"))
+OFFLINE_EMBEDDING_LATENCY = float(os.getenv("OFFLINE_EMBEDDING_LATENCY", "0"))
+
 # --- Data Paths ---
 # Defines the structured paths for data storage.
 DATA_PATH = PROJECT_ROOT / "data"
 CORPUS_PATH = DATA_PATH / "corpus"
 RAW_DATA_PATH = DATA_PATH / "raw"
 PROCESSED_DATA_PATH = DATA_PATH / "processed"
+MASTER_RAG_DOCUMENT_PATH = DATA_PATH / "master_rag_document.txt"
+
+# --- Static UI Assets ---
+# Served by Streamlit's static file serving (.streamlit/config.toml), which maps
+# the "static" folder next to the main script (run_app.py) to /app/static.
+STATIC_ASSETS_PATH = PROJECT_ROOT / "static"
+STATIC_URL_PREFIX = "app/static"
 
 # --- Vector Store Path ---
 # Defines the location for the persistent ChromaDB vector store.
 CHROMA_DB_PATH = DATA_PATH / "chroma_db" # Changed from previous to match new architecture
+# Offline embeddings are incompatible with the Azure ones, so they get their own index.
+if MODEL_BACKEND == "offline":
+    CHROMA_DB_PATH = DATA_PATH / "chroma_db_offline"
 
 # --- LLM & Embedding Model Parameters ---
 # Centralizes model names and parameters for easy swapping and tuning.
 EMBEDDING_MODEL_NAME = "text-embedding-ada-002" # Or your specific Azure deployment name
 
+# --- LLM Endpoint Pool ---
+# Comma-separated list of Hugging Face chat endpoints. Each entry is either a
+# repo id (served by the Inference API) or "repo_id@https://endpoint-url" for a
+# dedicated Inference Endpoint. Requests are hedged and failed over across them.
+LLM_ENDPOINTS = [
+    endpoint.strip()
+    for endpoint in os.getenv("LLM_ENDPOINTS", "mistralai/Mistral-7B-Instruct-v0.2").split(",")
+    if endpoint.strip()
+]
+LLM_TEMPERATURE = 0.2
+LLM_MAX_NEW_TOKENS = 512
+# Hard deadline (seconds) for a single LLM request, hedges included.
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "30"))
+# Once a stream has started, longest wait (seconds) for its next chunk before
+# the endpoint is stopped and counted as failed.
+LLM_STREAM_IDLE_TIMEOUT = float(os.getenv("LLM_STREAM_IDLE_TIMEOUT", "15"))
+# Delay before a hedged duplicate request is sent. "auto" uses the observed
+# p95 latency of the primary endpoint once enough samples are available.
+LLM_HEDGE_DELAY = os.getenv("LLM_HEDGE_DELAY", "auto")
+LLM_HEDGE_INITIAL_DELAY = float(os.getenv("LLM_HEDGE_INITIAL_DELAY", "5"))
+# Consecutive failures before an endpoint is circuit-broken, and for how long.
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "3"))
+LLM_CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+
+# --- Retrieval ---
+# Number of chunks retrieved from the vector store per question.
+RETRIEVAL_K = 4
+# Per intent (src/app/routing.py), keyed by the prompt mode the intent uses:
+# factoid questions use "default"; figures and summaries need more chunks.
+RETRIEVAL_K_BY_MODE = {
+    "default": RETRIEVAL_K,
+    "stats": int(os.getenv("RETRIEVAL_K_STATS", "6")),
+    "summary": int(os.getenv("RETRIEVAL_K_SUMMARY", "8")),
+}
+
+# --- Index Compression ---
+# Optional post-ingestion step (src/ingestion/compression.py, compress_index.py):
+# the chunk embeddings are reduced to INDEX_COMPRESSION_DIMS dimensions ("pca"
+# or "random" projection; "none" disables the step), optionally int8-quantized,
+# and the compact index replaces Chroma for searches only if its recall@k
+# against the full-precision index reaches INDEX_COMPRESSION_MIN_RECALL.
+INDEX_COMPRESSION = os.getenv("INDEX_COMPRESSION", "none")
+INDEX_COMPRESSION_DIMS = int(os.getenv("INDEX_COMPRESSION_DIMS", "256"))
+INDEX_COMPRESSION_QUANTIZE = os.getenv("INDEX_COMPRESSION_QUANTIZE", "true").lower() == "true"
+INDEX_COMPRESSION_MIN_RECALL = float(os.getenv("INDEX_COMPRESSION_MIN_RECALL", "0.95"))
+# Kept inside the Chroma directory, so rebuilding the store also discards it.
+COMPRESSED_INDEX_PATH = CHROMA_DB_PATH / "compressed"
+# Set to false to search Chroma even when an activated compact index exists.
+USE_COMPRESSED_INDEX = os.getenv("USE_COMPRESSED_INDEX", "true").lower() == "true"
+
+# --- Index Snapshot ---
+# Single-file, memory-mapped copy of the vector store (src/ingestion/snapshot.py)
+# written at the end of each ingestion, for app replicas to load in milliseconds
+# instead of opening the Chroma directory. Replicas only need this one file.
+INDEX_SNAPSHOT_ENABLED = os.getenv("INDEX_SNAPSHOT_ENABLED", "true").lower() == "true"
+INDEX_SNAPSHOT_PATH = Path(os.getenv("INDEX_SNAPSHOT_PATH", str(CHROMA_DB_PATH.with_name(CHROMA_DB_PATH.name + ".snapshot"))))
+# Set to false to search Chroma even when a snapshot exists.
+USE_INDEX_SNAPSHOT = os.getenv("USE_INDEX_SNAPSHOT", "true").lower() == "true"
+# Check the payload checksum when the app opens the snapshot (reads the whole file).
+INDEX_SNAPSHOT_VERIFY = os.getenv("INDEX_SNAPSHOT_VERIFY", "false").lower() == "true"
+
+# --- Entity Index ---
+# Player/team index built from the Transfermarkt squads (src/app/entities.py). It
+# answers roster questions directly and expands queries that name a team or player.
+ENTITY_ROUTING_ENABLED = os.getenv("ENTITY_ROUTING_ENABLED", "true").lower() == "true"
+ENTITY_SOURCES = [
+    RAW_DATA_PATH / "transfermarkt_african_teams_with_players.jsonl",
+    PROCESSED_DATA_PATH / "transfermarkt_squads.txt",
+]
+
+# --- Intent Routing ---
+# Greetings, thanks and off-topic questions are answered from templates by the
+# query router (src/app/routing.py), without retrieval or an LLM call.
+INTENT_ROUTING_ENABLED = os.getenv("INTENT_ROUTING_ENABLED", "true").lower() == "true"
+
+# --- Context Compression ---
+# Extractive compression of the retrieved chunks before generation (src/app/context_compression.py):
+# the sentences that match the question, with their neighbours, within a character budget.
+# Summary answers need the whole chunks and keep them.
+CONTEXT_COMPRESSION_ENABLED = os.getenv("CONTEXT_COMPRESSION_ENABLED", "true").lower() == "true"
+CONTEXT_COMPRESSION_BUDGET = int(os.getenv("CONTEXT_COMPRESSION_BUDGET", "1500"))
+CONTEXT_COMPRESSION_NEIGHBORS = int(os.getenv("CONTEXT_COMPRESSION_NEIGHBORS", "1"))
+CONTEXT_COMPRESSION_MODES = ("default", "stats")
+
+# --- Tracing ---
+# Per-request latency traces (one JSON line per answer) for finding where time goes.
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACE_LOG_PATH = PROJECT_ROOT / "logs" / "traces.jsonl"
+
+# --- Chat Sessions ---
+# Conversations are stored in SQLite; the UI keeps only their tail in memory.
+SESSION_DB_PATH = Path(os.getenv("SESSION_DB_PATH", str(DATA_PATH / "sessions.sqlite3")))
+SESSION_TAIL_MESSAGES = int(os.getenv("SESSION_TAIL_MESSAGES", "20"))  # Messages kept in memory and shown on load.
+SESSION_PAGE_MESSAGES = 20  # Older messages loaded per "show earlier messages" click.
+# Most messages held in memory while paging back; the newest ones are dropped
+# beyond it and reloaded from the store when the user returns to the end.
+SESSION_WINDOW_MESSAGES = int(os.getenv("SESSION_WINDOW_MESSAGES", str(SESSION_TAIL_MESSAGES + SESSION_PAGE_MESSAGES)))
+SESSION_CONTEXT_MESSAGES = 10  # Latest messages passed to the chain as chat history.
+
+# --- Batch Answering ---
+# Default number of questions answered concurrently by answer_batch.py.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+# --- HTTP API ---
+# Settings for the standalone assistant service (serve_api.py).
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+# Number of worker processes; each one holds its own chain and vector store.
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+# Requests answered concurrently per worker, and how many more may wait for a slot
+# before new ones are rejected with 503.
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "16"))
+API_MAX_QUEUE = int(os.getenv("API_MAX_QUEUE", "64"))
+API_QUEUE_TIMEOUT = float(os.getenv("API_QUEUE_TIMEOUT", "10"))
+# When set, the Streamlit UI sends questions to this API instead of running the chain itself.
+ASSISTANT_API_URL = os.getenv("ASSISTANT_API_URL")
+
+# --- Scraping ---
+# All scrapers share one async fetch engine (src/ingestion/fetcher.py). Each
+# host gets its own connection pool, concurrency cap and token-bucket rate
+# (requests per second, with a small burst) so refreshes stay polite.
+SCRAPER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "15"))
+SCRAPER_MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", "3"))
+SCRAPER_BACKOFF_BASE = 1.0  # Seconds; retries wait a random time up to base * 2**attempt.
+SCRAPER_HOST_POLICIES = {
+    "sport.le360.ma": {"concurrency": 4, "rate": 2.0, "burst": 4},
+    "www.transfermarkt.com": {"concurrency": 2, "rate": 1.0, "burst": 2},
+    "fr.wikipedia.org": {"concurrency": 4, "rate": 5.0, "burst": 5},
+    "api.sofascore.com": {"concurrency": 1, "rate": 0.5, "burst": 1},
+}
+SCRAPER_DEFAULT_HOST_POLICY = {"concurrency": 2, "rate": 1.0, "burst": 2}
+# On-disk HTTP cache (src/ingestion/http_cache.py). Entries younger than their
+# host's TTL (seconds) are used without a request; older ones are revalidated
+# with ETag/If-Modified-Since. SCRAPER_OFFLINE replays the cache only.
+SCRAPER_CACHE_ENABLED = os.getenv("SCRAPER_CACHE_ENABLED", "true").lower() == "true"
+SCRAPER_CACHE_PATH = DATA_PATH / "http_cache"
+SCRAPER_OFFLINE = os.getenv("SCRAPER_OFFLINE", "false").lower() == "true"
+SCRAPER_CACHE_TTL = {
+    "sport.le360.ma": 15 * 60,  # News; listings change during the tournament.
+    "www.transfermarkt.com": 24 * 3600,
+    "fr.wikipedia.org": 24 * 3600,
+    "api.sofascore.com": 10 * 60,
+}
+SCRAPER_DEFAULT_CACHE_TTL = 3600
+# HTML parsing (src/ingestion/html_parsing.py): BeautifulSoup tree builder
+# (falls back to html.parser if not installed) and whether pages are parsed
+# only for the elements each scraper needs.
+HTML_PARSER = os.getenv("HTML_PARSER", "lxml")
+HTML_TARGETED_PARSING = os.getenv("HTML_TARGETED_PARSING", "true").lower() == "true"
+
+# Le360 CAN landing page the crawler starts from.
+LE360_CAN_URL = "https://sport.le360.ma/football/can/"
+# Incremental Le360 crawl: listing pages to walk at most, consecutive pages with
+# no unseen article before stopping, and age (seconds) after which a known
+# article is fetched again to detect updates.
+LE360_MAX_PAGES = int(os.getenv("LE360_MAX_PAGES", "30"))
+LE360_STOP_AFTER_KNOWN_PAGES = 1
+LE360_RECHECK_AFTER = 6 * 3600
+
+# --- Data Pipeline ---
+# run_pipeline.py records each stage's input fingerprint here to skip unchanged
+# stages, and runs up to PIPELINE_MAX_WORKERS independent stages at once.
+PIPELINE_STATE_PATH = DATA_PATH / "pipeline_state.json"
+PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", "4"))
+# Master corpus build: processes cleaning the processed files in parallel, and
+# size in bytes of the content hashes used for deduplication (8 or 16).
+CORPUS_BUILD_WORKERS = int(os.getenv("CORPUS_BUILD_WORKERS", str(os.cpu_count() or 1)))
+CORPUS_DEDUP_DIGEST_SIZE = int(os.getenv("CORPUS_DEDUP_DIGEST_SIZE", "16"))
+# Vector store build: processes embedding the corpus chunks (one partial index
+# each, merged at the end). 1 builds in a single process; with the remote
+# embeddings, every worker sends its own requests to the Azure endpoint.
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+
 # --- Text Splitting Parameters ---
 # Defines the parameters for document chunking.
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
+# "structured" cuts chunks on the corpus' file, article and section boundaries
+# (src/ingestion/chunking.py) and needs no overlap; "recursive" is the plain
+# RecursiveCharacterTextSplitter with CHUNK_OVERLAP.
+CHUNKING_STRATEGY = os.getenv("CHUNKING_STRATEGY", "structured")
 
 def check_environment_variables():
     """Checks if all required environment variables are set."""
+    if MODEL_BACKEND == "offline":
+        print("Offline model backend selected; no API keys required.")
+        return
     required_vars = [
         "HUGGINGFACEHUB_API_TOKEN",
         "AZURE_OPENAI_API_KEY",
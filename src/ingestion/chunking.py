@@ -0,0 +1,156 @@
+"""
+Structure-aware chunking for the RAG corpus.
+
+The corpus built by processor.py keeps the boundaries of what it contains:
+`--- Contenu de <file> ---` headers between source files; one record per
+article, Wikipedia edition or team, opened by its "Titre de l'article:",
+"Édition <year>:" or "Équipe:" line and followed by its "URL:" line
+('-'*80 separators between records); and `--- <Section> ---` headers such
+as the groups and match schedule of the Le360 details document.
+
+StructuredSplitter cuts on those boundaries first, so no chunk straddles two
+articles, and stores each chunk's source file, title, URL and section as
+metadata. Consecutive small sections of a document are packed together up to
+chunk_size. A record or section larger than chunk_size is split on lines,
+then sentences, and its heading is repeated at the top of every continuation
+chunk, which keeps each chunk self-describing without an overlap.
+"""
+import logging
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+logger = logging.getLogger(__name__)
+
+_DOCUMENT_HEADER = re.compile(r'^--- Contenu de (.+?) ---\s*$')
+_SECTION_HEADER = re.compile(r'^(--- (.+?) ---)')
+_SEPARATOR = re.compile(r'^-{20,}\s*$')
+_RECORD_TITLE = re.compile(r"^(?:Titre de l'article|Équipe|Édition \d{4})\s*:\s*(.*)$")
+_URL_LINE = re.compile(r'^URL:\s*(\S*)')
+
+# Sub-splitting of oversized units: lines, then sentences, then words.
+_UNIT_SEPARATORS = ["\n", ". ", " ", ""]
+
+
+class _Unit:
+    """Lines that belong together: a record, a section, or text outside both."""
+
+    def __init__(self, kind: str, metadata: dict, heading: Optional[str] = None):
+        self.kind = kind
+        self.metadata = metadata
+        self.heading = heading
+        self.lines: List[str] = []
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def _parse_units(text: str) -> List[_Unit]:
+    """Splits a corpus text into units along its file, record and section boundaries."""
+    units: List[_Unit] = []
+    document: dict = {}
+    current: Optional[_Unit] = None
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line.strip():
+            continue
+        match = _DOCUMENT_HEADER.match(line)
+        if match:
+            document, current = {"source_file": match.group(1)}, None
+            continue
+        if _SEPARATOR.match(line):
+            current = None
+            continue
+        match = _RECORD_TITLE.match(line)
+        if match:
+            current = _Unit("record", {**document, "title": match.group(1).strip()}, heading=line)
+            units.append(current)
+        elif _SECTION_HEADER.match(line):
+            header = _SECTION_HEADER.match(line)
+            current = _Unit("section", {**document, "section": header.group(2).strip()}, heading=header.group(1))
+            units.append(current)
+        else:
+            match = _URL_LINE.match(line)
+            if match and current is not None and current.kind == "record":
+                if match.group(1):
+                    current.metadata["url"] = match.group(1)
+                continue
+            if current is None:
+                current = _Unit("text", dict(document))
+                units.append(current)
+        current.lines.append(line)
+    return units
+
+
+def _merge_metadata(units: List[_Unit]) -> dict:
+    metadata = dict(units[0].metadata)
+    sections = list(dict.fromkeys(unit.metadata["section"] for unit in units if "section" in unit.metadata))
+    if sections:
+        metadata["section"] = " | ".join(sections)
+    return metadata
+
+
+class StructuredSplitter:
+    """Splits corpus documents into chunks that follow the corpus structure (see module docstring)."""
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        self._unit_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=0, separators=_UNIT_SEPARATORS, keep_separator="end"
+        )
+
+    def _split_unit(self, unit: _Unit) -> Iterator[str]:
+        """Splits an oversized unit, repeating its heading at the top of each continuation chunk."""
+        heading = unit.heading if unit.heading and len(unit.heading) <= self.chunk_size // 4 else None
+        if heading is None:
+            yield from self._unit_splitter.split_text(unit.text)
+            return
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.chunk_size - len(heading) - 1, chunk_overlap=0, separators=_UNIT_SEPARATORS, keep_separator="end"
+        )
+        # The heading is split off the body so that no chunk holds it alone; a section
+        # header line may carry text after the header itself.
+        rest = unit.lines[0][len(heading):].strip()
+        body = "\n".join(([rest] if rest else []) + unit.lines[1:])
+        for piece in splitter.split_text(body):
+            yield f"{heading}\n{piece}"
+
+    def split_text(self, text: str) -> List[Tuple[str, dict]]:
+        """Returns (chunk text, structure metadata) pairs for one corpus text."""
+        chunks: List[Tuple[str, dict]] = []
+        packed: List[_Unit] = []
+
+        def flush():
+            if packed:
+                chunks.append(("\n".join(unit.text for unit in packed), _merge_metadata(packed)))
+                packed.clear()
+
+        for unit in _parse_units(text):
+            unit_text = unit.text
+            if len(unit_text) > self.chunk_size:
+                flush()
+                chunks.extend((piece, dict(unit.metadata)) for piece in self._split_unit(unit))
+            elif unit.kind == "record":
+                flush()
+                chunks.append((unit_text, dict(unit.metadata)))
+            else:
+                # Sections and loose text of the same file are packed while they fit.
+                if packed and (
+                    packed[0].metadata.get("source_file") != unit.metadata.get("source_file")
+                    or sum(len(other.text) + 1 for other in packed) + len(unit_text) > self.chunk_size
+                ):
+                    flush()
+                packed.append(unit)
+        flush()
+        return chunks
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        """Splits documents, keeping each document's metadata and adding the chunk's structure metadata."""
+        return [
+            Document(page_content=chunk, metadata={**document.metadata, **metadata})
+            for document in documents
+            for chunk, metadata in self.split_text(document.page_content)
+        ]
@@ -0,0 +1,253 @@
+"""
+Compact vector index: reduced and quantized corpus embeddings.
+
+Chroma keeps every chunk as a full-width float32 vector (1536 dimensions for
+ada-002). compress_vector_store is an optional post-ingestion step that
+reads the corpus embeddings back from Chroma, fits a linear reduction to
+`dims` dimensions (a truncated SVD, "pca", or a seeded Gaussian "random"
+projection), optionally quantizes the reduced vectors to int8 with one
+scale per dimension, and measures recall@k of the result against an exact
+full-precision search before writing anything.
+
+The compact index is only written, and therefore used, when its recall
+reaches `min_recall` and it is smaller than the full vectors. It lives in a subdirectory of the Chroma directory (so
+rebuilding the store discards it) as a manifest, one .npz of arrays and the
+chunks as JSON Lines. CompressedVectorStore loads it and answers the
+chain's searches: the query embedding goes through the same projection and
+chunks are ranked by the squared L2 distance, the metric of the Chroma
+collection, with an exact scan of the matrix.
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+ARRAYS_NAME = "vectors.npz"
+DOCUMENTS_NAME = "documents.jsonl"
+METHODS = ("pca", "random")
+
+
+# --- Transform ---
+def fit_projection(embeddings: np.ndarray, dims: int, method: str, seed: int = 0) -> np.ndarray:
+    """
+    Returns a (full dims x `dims`) projection matrix. "pca" keeps the top
+    right singular vectors of the uncentered embeddings, which best preserve
+    their inner products; "random" is a Gaussian random projection.
+    """
+    if method == "pca":
+        # Eigenvectors of the Gram matrix X^T X are the right singular vectors of X.
+        gram = embeddings.T.astype(np.float64) @ embeddings.astype(np.float64)
+        eigenvalues, eigenvectors = np.linalg.eigh(gram)
+        return eigenvectors[:, np.argsort(eigenvalues)[::-1][:dims]].astype(np.float32)
+    if method == "random":
+        rng = np.random.default_rng(seed)
+        return (rng.standard_normal((embeddings.shape[1], dims)) / np.sqrt(dims)).astype(np.float32)
+    raise ValueError(f"Unknown reduction method '{method}' (expected one of {', '.join(METHODS)}).")
+
+
+def quantize(vectors: np.ndarray) -> tuple:
+    """Symmetric int8 quantization with one scale per dimension; returns (codes, scales)."""
+    scales = np.abs(vectors).max(axis=0) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class CompactIndex:
+    """Reduced (and optionally int8) vectors, searched by exact squared L2 distance."""
+
+    def __init__(self, projection: Optional[np.ndarray], vectors: np.ndarray, scales: Optional[np.ndarray],
+                 norms: Optional[np.ndarray] = None):
+        self.projection = projection
+        self.vectors = vectors
+        self.scales = scales
+        # ||x||^2 of the stored (dequantized) vectors; ||q||^2 is constant per query.
+        if norms is None:
+            stored = vectors.astype(np.float32) * scales if scales is not None else vectors
+            norms = np.einsum("ij,ij->i", stored, stored).astype(np.float32)
+        self.norms = norms
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, dims: int, method: str, quantized: bool, seed: int = 0) -> "CompactIndex":
+        projection = fit_projection(embeddings, dims, method, seed) if dims < embeddings.shape[1] else None
+        reduced = embeddings @ projection if projection is not None else embeddings
+        if quantized:
+            codes, scales = quantize(reduced)
+            return cls(projection, codes, scales)
+        return cls(projection, reduced.astype(np.float32), None)
+
+    def transform(self, queries: np.ndarray) -> np.ndarray:
+        return queries @ self.projection if self.projection is not None else queries
+
+    def search(self, queries: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k nearest stored vectors for each query row, nearest first."""
+        reduced = self.transform(np.atleast_2d(queries).astype(np.float32))
+        if self.scales is not None:
+            reduced = reduced * self.scales
+        distances = self.norms[None, :] - 2.0 * (reduced @ self.vectors.T.astype(np.float32, copy=False))
+        return _top_k(distances, k)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.projection, self.vectors, self.scales, self.norms) if array is not None)
+
+
+def _top_k(distances: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, distances.shape[1])
+    candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(distances, candidates, axis=1).argsort(axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def exact_search(embeddings: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Full-precision reference: k nearest embeddings by squared L2 distance."""
+    norms = np.einsum("ij,ij->i", embeddings, embeddings)
+    return _top_k(norms[None, :] - 2.0 * (queries @ embeddings.T), k)
+
+
+def recall_at_k(approximate: np.ndarray, exact: np.ndarray) -> float:
+    """Mean fraction of each query's exact top-k found in its approximate top-k."""
+    return float(np.mean([len(set(a) & set(e)) / len(e) for a, e in zip(approximate.tolist(), exact.tolist())]))
+
+
+# --- Evaluation ---
+def evaluate(index: CompactIndex, embeddings: np.ndarray, k: int, queries: Optional[np.ndarray] = None,
+             sample_size: int = 500, seed: int = 0) -> dict:
+    """
+    recall@k of `index` against exact search over `embeddings`. Queries are a
+    sample of the chunks themselves (each excluded from its own results) and,
+    when given, real question embeddings.
+    """
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(embeddings), size=min(sample_size, len(embeddings)), replace=False)
+    # k + 1 results, minus the query chunk itself.
+    exact = exact_search(embeddings, embeddings[sample], k + 1)
+    approximate = index.search(embeddings[sample], k + 1)
+    exact = np.array([[i for i in row if i != own][:k] for row, own in zip(exact.tolist(), sample)])
+    approximate = np.array([[i for i in row if i != own][:k] for row, own in zip(approximate.tolist(), sample)])
+    scores = {"chunk_queries": len(sample), "recall_chunk_queries": recall_at_k(approximate, exact)}
+    if queries is not None and len(queries):
+        scores["question_queries"] = len(queries)
+        scores["recall_question_queries"] = recall_at_k(index.search(queries, k), exact_search(embeddings, queries, k))
+    # The guardrail takes the worse of the two query sets.
+    scores["recall"] = min(value for key, value in scores.items() if key.startswith("recall_"))
+    return scores
+
+
+# --- Build ---
+def compress_vector_store(vector_store, output_dir: Path, method: str = "pca", dims: int = 256, quantized: bool = True,
+                          k: int = 4, min_recall: float = 0.95, questions: Sequence[str] = (), seed: int = 0) -> dict:
+    """
+    Builds a compact index from the embeddings of a Chroma `vector_store` and
+    writes it to `output_dir` if its recall@k reaches `min_recall` and it is
+    smaller than the full vectors. Returns a report with the recall, sizes
+    and whether the index was activated. A previously activated index is left
+    in place when the new one is rejected.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown reduction method '{method}' (expected one of {', '.join(METHODS)}).")
+    data = vector_store._collection.get(include=["embeddings", "documents", "metadatas"])
+    if not data["ids"]:
+        logger.warning("The vector store is empty; nothing to compress.")
+        return {"active": False, "reason": "empty vector store"}
+    embeddings = np.asarray(data["embeddings"], dtype=np.float32)
+    logger.info(f"Compressing {len(embeddings)} embeddings of {embeddings.shape[1]} dims ({method}, {dims} dims, int8={quantized})...")
+
+    index = CompactIndex.build(embeddings, dims, method, quantized, seed)
+    question_embeddings = np.asarray(vector_store.embeddings.embed_documents(list(questions)), dtype=np.float32) if questions else None
+    scores = evaluate(index, embeddings, k, queries=question_embeddings, seed=seed)
+    report = {
+        "method": method,
+        "dims": int(index.vectors.shape[1]),
+        "full_dims": int(embeddings.shape[1]),
+        "quantized": quantized,
+        "k": k,
+        "min_recall": min_recall,
+        "chunks": len(embeddings),
+        "full_bytes": int(embeddings.nbytes),
+        "compact_bytes": int(index.nbytes),
+        **{key: round(value, 4) if isinstance(value, float) else value for key, value in scores.items()},
+        "created_at": datetime.now().isoformat(),
+    }
+    logger.info(f"Compact index: recall@{k}={scores['recall']:.4f} (minimum {min_recall}), "
+                f"{report['full_bytes'] / 1e6:.1f} MB -> {report['compact_bytes'] / 1e6:.1f} MB.")
+    # On a small corpus the projection matrix can outweigh what it saves.
+    if scores["recall"] < min_recall:
+        report["reason"] = "recall below the minimum"
+    elif report["compact_bytes"] >= report["full_bytes"]:
+        report["reason"] = "not smaller than the full-precision vectors"
+    report["active"] = "reason" not in report
+    if not report["active"]:
+        logger.warning(f"Compact index rejected: {report['reason']}. Retrieval keeps the current index.")
+        return report
+
+    _write_index(output_dir, index, data, report)
+    logger.info(f"Compact index activated at {output_dir}.")
+    return report
+
+
+def _write_index(output_dir: Path, index: CompactIndex, data: dict, report: dict):
+    """Writes the index next to its final place, then swaps it in."""
+    output_dir = Path(output_dir)
+    partial_dir = output_dir.with_name(output_dir.name + ".partial")
+    shutil.rmtree(partial_dir, ignore_errors=True)
+    partial_dir.mkdir(parents=True)
+    arrays = {"vectors": index.vectors}
+    if index.projection is not None:
+        arrays["projection"] = index.projection
+    if index.scales is not None:
+        arrays["scales"] = index.scales
+    np.savez(partial_dir / ARRAYS_NAME, **arrays)
+    with open(partial_dir / DOCUMENTS_NAME, 'w', encoding='utf-8') as f:
+        for chunk_id, text, metadata in zip(data["ids"], data["documents"], data["metadatas"]):
+            f.write(json.dumps({"id": chunk_id, "text": text, "metadata": metadata or {}}, ensure_ascii=False) + "\n")
+    with open(partial_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(partial_dir, output_dir)
+
+
+# --- Query Side ---
+def has_compact_index(index_dir: Path) -> bool:
+    return (Path(index_dir) / MANIFEST_NAME).exists()
+
+
+class CompressedVectorStore:
+    """
+    Read-only vector store over a compact index, with the search methods the
+    RAG chain uses. `embeddings` embeds the queries at full width, as for the
+    Chroma store; the projection is applied here.
+    """
+
+    def __init__(self, index_dir: Path, embeddings):
+        index_dir = Path(index_dir)
+        with open(index_dir / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        with np.load(index_dir / ARRAYS_NAME) as arrays:
+            self.index = CompactIndex(arrays.get("projection"), arrays["vectors"], arrays.get("scales"))
+        with open(index_dir / DOCUMENTS_NAME, 'r', encoding='utf-8') as f:
+            self.documents = [
+                Document(id=record["id"], page_content=record["text"], metadata=record["metadata"])
+                for record in map(json.loads, f)
+            ]
+        self.embeddings = embeddings
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Document]:
+        return [self.documents[i] for i in self.index.search(np.asarray(embedding, dtype=np.float32), k)[0]]
+
+    async def asimilarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Document]:
+        return await asyncio.get_running_loop().run_in_executor(None, partial(self.similarity_search_by_vector, embedding, k))
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k)
@@ -0,0 +1,198 @@
+"""
+Shared asyncio fetch engine for the scrapers.
+
+Every host gets its own HTTP connection pool, a cap on concurrent requests and
+a token-bucket rate limit, so pages from different sites are fetched in
+parallel while each site sees a bounded, steady request rate. Transient
+failures (connection errors, timeouts, 429 and 5xx responses) are retried with
+jittered exponential backoff, honouring Retry-After when the server sends it.
+
+Responses go through the on-disk HTTPCache (see http_cache.py) unless it is
+disabled, so repeated runs mostly cost conditional requests answered by 304.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from src import config
+from src.ingestion.http_cache import CacheMissError, HTTPCache
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 60.0
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                # Holding the lock while waiting keeps callers in FIFO order.
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostPool:
+    """Connection pool, concurrency cap and rate limit for one host."""
+
+    def __init__(self, host: str, concurrency: int, rate: float, burst: float, headers: dict, timeout: float):
+        self.host = host
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+
+class AsyncFetcher:
+    """
+    Fetches URLs through per-host pools. Use it as an async context manager so
+    the connections are closed at the end:
+
+        async with AsyncFetcher() as fetcher:
+            responses = await fetcher.fetch_all(urls)
+    """
+
+    def __init__(
+        self,
+        host_policies: Optional[Dict[str, dict]] = None,
+        default_policy: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        timeout: float = config.SCRAPER_TIMEOUT,
+        max_retries: int = config.SCRAPER_MAX_RETRIES,
+        backoff_base: float = config.SCRAPER_BACKOFF_BASE,
+        cache: Optional[HTTPCache] = None,
+        use_cache: bool = config.SCRAPER_CACHE_ENABLED,
+        offline: bool = config.SCRAPER_OFFLINE,
+        cache_ttl: Optional[Dict[str, float]] = None,
+    ):
+        self.host_policies = config.SCRAPER_HOST_POLICIES if host_policies is None else host_policies
+        self.default_policy = default_policy or config.SCRAPER_DEFAULT_HOST_POLICY
+        self.headers = {"User-Agent": config.SCRAPER_USER_AGENT, **(headers or {})}
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.cache = cache or (HTTPCache(config.SCRAPER_CACHE_PATH) if use_cache or offline else None)
+        self.offline = offline
+        self.cache_ttl = config.SCRAPER_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.cache_stats = Counter()
+        self._pools: Dict[str, HostPool] = {}
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self.cache_stats:
+            logger.info(f"HTTP cache: {dict(self.cache_stats)}")
+        await asyncio.gather(*(pool.client.aclose() for pool in self._pools.values()))
+        self._pools.clear()
+
+    def _pool_for(self, url: str) -> HostPool:
+        host = urlsplit(url).netloc
+        if host not in self._pools:
+            policy = self.host_policies.get(host, self.default_policy)
+            self._pools[host] = HostPool(host, headers=self.headers, timeout=self.timeout, **policy)
+        return self._pools[host]
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_AFTER)
+        # "Full jitter": spreads retries out so they do not hit the host in waves.
+        return random.uniform(0, self.backoff_base * 2 ** attempt)
+
+    def _ttl(self, url: str) -> float:
+        return self.cache_ttl.get(urlsplit(url).netloc, config.SCRAPER_DEFAULT_CACHE_TTL)
+
+    async def fetch(self, url: str, headers: Optional[dict] = None, params: Optional[dict] = None) -> httpx.Response:
+        """
+        GETs `url`, from the cache when possible, retrying transient failures.
+        Returns the final response (X-Cache tells whether it was a cache hit,
+        revalidated or a miss); raises httpx.HTTPStatusError for error statuses,
+        httpx.TransportError once retries are exhausted and CacheMissError for
+        uncached URLs in offline mode.
+        """
+        if params:
+            url = str(httpx.URL(url, params=params))
+        entry = self.cache.get(url) if self.cache else None
+        if entry and self.offline:
+            self.cache_stats["offline"] += 1
+            return HTTPCache.to_response(entry, "offline")
+        if self.offline:
+            self.cache_stats["offline_miss"] += 1
+            raise CacheMissError(f"{url} is not cached (offline mode).")
+        if entry and time.time() - entry["validated_at"] < self._ttl(url):
+            self.cache_stats["hit"] += 1
+            return HTTPCache.to_response(entry, "hit")
+        if entry:
+            headers = {**(headers or {}), **HTTPCache.conditional_headers(entry)}
+
+        response = await self._get(url, headers)
+        if entry and response.status_code == 304:
+            self.cache.touch(url)
+            self.cache_stats["revalidated"] += 1
+            return HTTPCache.to_response(entry, "revalidated")
+        response.raise_for_status()
+        if self.cache:
+            self.cache.put(url, response)
+            self.cache_stats["miss"] += 1
+        response.headers["X-Cache"] = "miss"
+        return response
+
+    async def _get(self, url: str, headers: Optional[dict]) -> httpx.Response:
+        """GETs `url` through its host pool, retrying transient failures."""
+        pool = self._pool_for(url)
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with pool.semaphore:
+                    await pool.bucket.acquire()
+                    response = await pool.client.get(url, headers=headers)
+                if response.status_code not in RETRYABLE_STATUSES:
+                    return response
+                error = httpx.HTTPStatusError(f"{response.status_code} for {url}", request=response.request, response=response)
+            except httpx.TransportError as e:
+                error = e
+            if attempt == self.max_retries:
+                raise error
+            delay = self._backoff(attempt, response)
+            logger.warning(f"Fetching {url} failed ({error!r}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+
+    async def fetch_all(self, urls: Iterable[str], **kwargs) -> List:
+        """Fetches all URLs concurrently; failed URLs yield their exception instead of a response."""
+        return await asyncio.gather(*(self.fetch(url, **kwargs) for url in urls), return_exceptions=True)
+
+
+def fetch_sync(url: str, **kwargs) -> httpx.Response:
+    """Fetches a single URL from synchronous code (a one-off fetcher with the default settings)."""
+    async def _fetch():
+        async with AsyncFetcher() as fetcher:
+            return await fetcher.fetch(url, **kwargs)
+    return asyncio.run(_fetch())
@@ -0,0 +1,56 @@
+"""
+HTML parsing backend shared by the scrapers and processors.
+
+parse_html builds a BeautifulSoup tree with the configured tree builder
+(HTML_PARSER: lxml by default, much faster than the pure-Python html.parser)
+and, when a SoupStrainer is given, builds only the matching subtrees instead
+of the whole page. Callers keep the BeautifulSoup API whatever the backend.
+benchmarks/html_parser_benchmark.py compares the backends on saved pages.
+"""
+import logging
+from typing import Optional
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+# Tree builders BeautifulSoup can use, fastest first.
+AVAILABLE_PARSERS = ("lxml", "html.parser", "html5lib")
+
+_settings = {"parser": None, "targeted": config.HTML_TARGETED_PARSING}
+
+
+def _resolve_parser(name: str) -> str:
+    """Returns `name` if its tree builder is installed, otherwise html.parser."""
+    try:
+        BeautifulSoup("", name)
+        return name
+    except FeatureNotFound:
+        logger.warning(f"HTML parser '{name}' is not installed; falling back to html.parser.")
+        return "html.parser"
+
+
+def configure(parser: Optional[str] = None, targeted: Optional[bool] = None):
+    """Overrides the parser backend and/or targeted parsing (used by the benchmark)."""
+    if parser is not None:
+        _settings["parser"] = _resolve_parser(parser)
+    if targeted is not None:
+        _settings["targeted"] = targeted
+
+
+def current_parser() -> str:
+    if _settings["parser"] is None:
+        _settings["parser"] = _resolve_parser(config.HTML_PARSER)
+    return _settings["parser"]
+
+
+def parse_html(markup, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """
+    Parses `markup` (str or bytes) with the configured backend. `parse_only`
+    restricts the tree to the matching elements and their subtrees; it is
+    ignored when targeted parsing is disabled.
+    """
+    strainer = parse_only if _settings["targeted"] else None
+    return BeautifulSoup(markup, current_parser(), parse_only=strainer)
@@ -0,0 +1,102 @@
+"""
+On-disk HTTP response cache for the scrapers.
+
+Each response body is stored under SCRAPER_CACHE_PATH, keyed by a hash of its
+URL, next to a small JSON file with its validators (ETag, Last-Modified) and
+when it was last confirmed fresh. AsyncFetcher serves entries younger than the
+host's TTL without any request, revalidates older ones with a conditional GET
+(a 304 costs no body transfer) and, in offline mode, replays the cache without
+touching the network. The stored pages double as fixtures for reproducible
+parser benchmarks.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept with a cached body.
+_STORED_HEADERS = ("content-type", "etag", "last-modified")
+
+
+class CacheMissError(LookupError):
+    """Raised in offline mode when a URL is not in the cache."""
+
+
+class HTTPCache:
+    """Stores GET responses as <key>.body / <key>.json file pairs in `cache_dir`."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _paths(self, url: str) -> tuple:
+        key = self.key(url)
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.json"
+
+    def get(self, url: str) -> Optional[dict]:
+        """Returns the cached entry for `url` ({"url", "headers", "validated_at", "content"}), or None."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            entry["content"] = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, url: str, response: httpx.Response):
+        """Stores a 200 response, replacing any previous entry atomically."""
+        body_path, meta_path = self._paths(url)
+        headers = {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers}
+        _atomic_write(body_path, response.content)
+        self._write_meta(meta_path, {"url": url, "headers": headers, "validated_at": time.time()})
+
+    def touch(self, url: str):
+        """Marks an entry as fresh again after a 304 Not Modified."""
+        _, meta_path = self._paths(url)
+        entry = self.get(url)
+        if entry:
+            entry.pop("content")
+            entry["validated_at"] = time.time()
+            self._write_meta(meta_path, entry)
+
+    def _write_meta(self, path: Path, entry: dict):
+        _atomic_write(path, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        """Request headers that let the server answer 304 if the entry is still current."""
+        headers = {}
+        if "etag" in entry["headers"]:
+            headers["If-None-Match"] = entry["headers"]["etag"]
+        if "last-modified" in entry["headers"]:
+            headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+        return headers
+
+    @staticmethod
+    def to_response(entry: dict, status: str) -> httpx.Response:
+        """Builds a 200 response from a cache entry; `status` (hit, revalidated, offline) goes in X-Cache."""
+        return httpx.Response(
+            200,
+            headers={**entry["headers"], "X-Cache": status},
+            content=entry["content"],
+            request=httpx.Request("GET", entry["url"]),
+        )
+
+
+def _atomic_write(path: Path, data: bytes):
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
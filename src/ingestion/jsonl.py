@@ -0,0 +1,92 @@
+"""
+Streaming JSON Lines files for the scrape -> process -> ingest path.
+
+JSONLWriter writes each record as soon as it is produced, so a crash keeps
+everything scraped so far and memory does not grow with the output. In the
+default mode the records go to `<name>.partial.jsonl`, which replaces
+`path` atomically only once the run completes (the previous version is kept
+as `<name>.prev.jsonl`); readers never see a half-written file. In append
+mode records are added to `path` directly, for incremental crawls.
+
+iter_records reads such files back one record at a time.
+"""
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class JSONLWriter:
+    """
+    Writes one JSON object per line, flushed after every record. Use it as a
+    context manager: the file is committed on success and the partial file is
+    left in place if the block raises.
+    """
+
+    def __init__(self, path: Path, append: bool = False, keep_previous: bool = True):
+        self.path = Path(path)
+        self.append = append
+        self.keep_previous = keep_previous
+        self.partial_path = self.path if append else self._sibling("partial")
+        self.count = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.partial_path, 'a' if append else 'w', encoding='utf-8')
+
+    def _sibling(self, tag: str) -> Path:
+        return self.path.with_name(f"{self.path.stem}.{tag}{self.path.suffix}")
+
+    def write(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def commit(self):
+        """Closes the file and, unless appending, rotates it into place."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if self.append:
+            return
+        if self.keep_previous and self.path.exists():
+            previous_path = self._sibling("prev")
+            previous_path.unlink(missing_ok=True)
+            # A hard link keeps the old version without ever leaving `path` missing.
+            try:
+                os.link(self.path, previous_path)
+            except OSError:
+                shutil.copy2(self.path, previous_path)
+        os.replace(self.partial_path, self.path)
+
+    def abort(self):
+        """Closes the file, keeping the records written so far in the partial file."""
+        self._file.close()
+        if not self.append:
+            logger.warning(f"Run did not complete; {self.count} records kept in {self.partial_path}")
+
+    def __enter__(self) -> "JSONLWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+def iter_records(path: Path) -> Iterator[dict]:
+    """
+    Yields the records of a JSON Lines file one at a time. A legacy JSON array
+    file (any other suffix) is loaded whole and yielded item by item.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix != ".jsonl":
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
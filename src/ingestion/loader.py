@@ -1,14 +1,19 @@
+import hashlib
+import json
 import logging
+import pickle
 from pathlib import Path
 import shutil
-from langchain_community.document_loaders import DirectoryLoader, UnstructuredFileLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import AzureOpenAIEmbeddings
-from langchain_chroma import Chroma
+import tempfile
+from typing import List, Optional
 from src import config # Import config from src
 
 logger = logging.getLogger(__name__)
 
+# The document loaders, embedding clients and Chroma (several seconds of
+# imports) are imported by the functions that use them, so entry points that
+# only check the configuration or list the pipeline start fast.
+
 def load_documents_from_corpus(corpus_path: Path):
     """Loads all text documents from the specified corpus path."""
     logger.info(f"Loading documents from {corpus_path}...")
@@ -17,22 +22,49 @@ def load_documents_from_corpus(corpus_path: Path):
         logger.error(f"Corpus path does not exist: {corpus_path}")
         return []
 
-    # Using UnstructuredFileLoader for broader compatibility with various text-based files
-    loader = DirectoryLoader(
+    from langchain_community.document_loaders import DirectoryLoader, TextLoader, UnstructuredFileLoader
+
+    # The corpus' own .txt files are loaded verbatim: the structured splitter
+    # relies on their line layout, which UnstructuredFileLoader would reflow.
+    text_loader = DirectoryLoader(
+        str(corpus_path),
+        glob="**/*.txt",
+        loader_cls=TextLoader,
+        loader_kwargs={"encoding": "utf-8"},
+        show_progress=True,
+        use_multithreading=True
+    )
+    # Using UnstructuredFileLoader for broader compatibility with other text-based files
+    other_loader = DirectoryLoader(
         str(corpus_path),
         glob="**/*",
+        exclude=["**/*.txt"],
         loader_cls=UnstructuredFileLoader,
         show_progress=True,
         use_multithreading=True
     )
-    documents = loader.load()
+    documents = text_loader.load() + other_loader.load()
+    # Files are loaded concurrently and arrive in completion order; sorting
+    # makes chunk order, and so every build of the same corpus, deterministic.
+    documents.sort(key=lambda document: document.metadata.get("source", ""))
     if not documents:
         logger.warning(f"No documents found in {corpus_path}. Please check the path and file types.")
     logger.info(f"Loaded {len(documents)} documents from corpus.")
     return documents
 
 def split_documents(documents, chunk_size: int, chunk_overlap: int):
-    """Splits documents into smaller, manageable chunks."""
+    """
+    Splits documents into smaller, manageable chunks, with the structured
+    splitter unless CHUNKING_STRATEGY is "recursive" (chunk_overlap only
+    applies to the latter).
+    """
+    if config.CHUNKING_STRATEGY == "structured":
+        from src.ingestion.chunking import StructuredSplitter
+        logger.info(f"Splitting {len(documents)} documents along their structure (size={chunk_size})...")
+        splits = StructuredSplitter(chunk_size).split_documents(documents)
+        logger.info(f"Created {len(splits)} document splits.")
+        return splits
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
     logger.info(f"Splitting {len(documents)} documents into chunks (size={chunk_size}, overlap={chunk_overlap})...")
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
@@ -45,6 +77,7 @@ def split_documents(documents, chunk_size: int, chunk_overlap: int):
 
 def get_azure_openai_embeddings_model():
     """Initializes and returns the Azure OpenAI Embeddings model."""
+    from langchain_openai import AzureOpenAIEmbeddings
     logger.info("Initializing Azure OpenAI Embeddings model...")
     try:
         embeddings = AzureOpenAIEmbeddings(
@@ -58,11 +91,145 @@ def get_azure_openai_embeddings_model():
         logger.error(f"Error initializing Azure OpenAI Embeddings: {e}. Check AZURE_OPENAI_ environment variables.")
         raise
 
-def setup_chroma_db(documents, embeddings, db_path: Path):
+def get_embeddings_model():
+    """Returns the embeddings model for the configured MODEL_BACKEND."""
+    if config.MODEL_BACKEND == "offline":
+        from src.offline_models import OfflineEmbeddings
+        logger.info("Using offline embeddings model.")
+        return OfflineEmbeddings(size=config.OFFLINE_EMBEDDING_SIZE, latency=config.OFFLINE_EMBEDDING_LATENCY)
+    return get_azure_openai_embeddings_model()
+
+# --- Chunk IDs ---
+def chunk_id(text: str) -> str:
+    """Content-derived chunk ID: identical chunks get the same ID, whichever file or worker they come from."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+def deduplicate_splits(splits) -> tuple:
+    """Returns (splits, ids) keeping the first occurrence of each chunk text, in order."""
+    unique, ids, seen = [], [], set()
+    for split in splits:
+        split_id = chunk_id(split.page_content)
+        if split_id not in seen:
+            seen.add(split_id)
+            unique.append(split)
+            ids.append(split_id)
+    if len(unique) < len(splits):
+        logger.info(f"Dropped {len(splits) - len(unique)} duplicate chunks.")
+    return unique, ids
+
+# --- Sharded Build ---
+# With INGEST_WORKERS > 1, the deduplicated chunks are cut into contiguous
+# shards of similar size. Each worker process embeds its shard and writes it
+# as a partial index (chunks as JSON Lines, embeddings as a float32 .npy
+# matrix); the partials are then merged into the persistent store in shard
+# order, which gives the same collection as a single-process build.
+def _partition(splits, shards: int) -> List[tuple]:
+    """Cuts splits into at most `shards` contiguous (start, end) ranges of similar total length."""
+    total = sum(len(split.page_content) for split in splits)
+    ranges, start, size = [], 0, 0
+    for index, split in enumerate(splits):
+        size += len(split.page_content)
+        if size >= total * (len(ranges) + 1) / shards and len(ranges) < shards - 1:
+            ranges.append((start, index + 1))
+            start = index + 1
+    if start < len(splits):
+        ranges.append((start, len(splits)))
+    return ranges
+
+def _worker_embeddings(embeddings):
+    """
+    What the spawned workers receive for `embeddings`: the object itself, or,
+    when it cannot be pickled (API clients hold locks), its class and field
+    values without the clients, which the worker rebuilds them from.
+    """
+    try:
+        pickle.dumps(embeddings)
+        return embeddings
+    except (TypeError, AttributeError, pickle.PicklingError):
+        fields = getattr(type(embeddings), "model_fields", None)
+        if fields is None:
+            raise
+        return type(embeddings), {name: getattr(embeddings, name) for name in fields if name not in ("client", "async_client")}
+
+def _write_partial_index(embeddings, shard_path: Path, records: List[dict]) -> int:
+    """Worker: embeds one shard's chunks and writes them as a partial index; returns the chunk count."""
+    import numpy as np
+    if isinstance(embeddings, tuple):
+        embeddings_class, fields = embeddings
+        embeddings = embeddings_class(**fields)
+    vectors = embeddings.embed_documents([record["text"] for record in records])
+    np.save(shard_path.with_suffix(".npy"), np.asarray(vectors, dtype=np.float32))
+    with open(shard_path.with_suffix(".jsonl"), 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return len(records)
+
+def _read_partial_index(shard_path: Path) -> tuple:
+    import numpy as np
+    with open(shard_path.with_suffix(".jsonl"), 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    return records, np.load(shard_path.with_suffix(".npy"))
+
+def merge_partial_indexes(vectorstore, shard_paths: List[Path]) -> int:
+    """
+    Adds the partial indexes to `vectorstore` in order, skipping chunk IDs it
+    already holds or that an earlier shard added. Returns the number added.
+    """
+    from chromadb.utils.batch_utils import create_batches
+    collection = vectorstore._collection
+    seen = set(collection.get(include=[])["ids"])
+    added = 0
+    for shard_path in shard_paths:
+        records, embeddings = _read_partial_index(shard_path)
+        keep = [index for index, record in enumerate(records) if record["id"] not in seen]
+        if not keep:
+            continue
+        seen.update(records[index]["id"] for index in keep)
+        for batch_ids, batch_embeddings, batch_metadatas, batch_documents in create_batches(
+            api=collection._client,
+            ids=[records[index]["id"] for index in keep],
+            embeddings=embeddings[keep],
+            metadatas=[records[index]["metadata"] or None for index in keep],
+            documents=[records[index]["text"] for index in keep],
+        ):
+            collection.add(ids=batch_ids, embeddings=batch_embeddings, metadatas=batch_metadatas, documents=batch_documents)
+        added += len(keep)
+        logger.info(f"Merged {shard_path.name}: {len(keep)} chunks.")
+    return added
+
+def build_sharded_chroma_db(splits, ids: List[str], embeddings, db_path: Path, workers: int):
+    """
+    Embeds `splits` with `embeddings` in `workers` processes, one partial index
+    each, then merges them into a Chroma DB at db_path.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from langchain_chroma import Chroma
+    ranges = _partition(splits, workers)
+    logger.info(f"Building the vector store from {len(splits)} chunks in {len(ranges)} shards...")
+    shard_dir = Path(tempfile.mkdtemp(prefix=".ingest-shards-", dir=db_path.parent))
+    try:
+        shard_paths = [shard_dir / f"shard-{index:03d}" for index in range(len(ranges))]
+        # Spawned, not forked: the parent may already hold a Chroma client and its threads.
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=multiprocessing.get_context("spawn")) as executor:
+            counts = list(executor.map(_write_partial_index, [_worker_embeddings(embeddings)] * len(ranges), shard_paths, [
+                [{"id": ids[i], "text": splits[i].page_content, "metadata": splits[i].metadata} for i in range(start, end)]
+                for start, end in ranges
+            ]))
+        logger.info(f"Partial indexes written: {', '.join(str(count) for count in counts)} chunks.")
+        vectorstore = Chroma(persist_directory=str(db_path), embedding_function=embeddings)
+        merge_partial_indexes(vectorstore, shard_paths)
+        return vectorstore
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+def setup_chroma_db(documents, embeddings, db_path: Path, workers: Optional[int] = None):
     """
     Sets up or updates the ChromaDB vector store.
-    If the DB exists, it tries to load it; otherwise, it creates a new one.
+    If the DB exists, it tries to load it; otherwise, it creates a new one,
+    in `workers` processes if more than one (default: INGEST_WORKERS).
     """
+    from langchain_chroma import Chroma
     logger.info(f"Checking Chroma DB at {db_path}...")
     
     # Ensure parent directory exists for the Chroma DB
@@ -90,25 +257,59 @@ def setup_chroma_db(documents, embeddings, db_path: Path):
     if not splits:
         logger.warning("No document splits generated. Cannot create vector database.")
         return None
+    splits, ids = deduplicate_splits(splits)
 
+    workers = workers or config.INGEST_WORKERS
     try:
+        if workers > 1 and len(splits) > 1:
+            vectorstore = build_sharded_chroma_db(splits, ids, embeddings, db_path, workers)
+            logger.info("Chroma DB created and persisted successfully.")
+            return vectorstore
         vectorstore = Chroma.from_documents(
             documents=splits,
             embedding=embeddings,
+            ids=ids,
             persist_directory=str(db_path)
         )
-        # Chroma's .persist() method ensures data is written to disk
-        vectorstore.persist() 
+        # langchain_chroma writes to persist_directory as it goes; no explicit persist() needed.
         logger.info("Chroma DB created and persisted successfully.")
         return vectorstore
     except Exception as e:
         logger.error(f"Error creating Chroma DB: {e}. Check your embeddings model and data.")
         raise
 
-def ingest_pipeline():
+def compress_index(vectorstore, questions=()) -> dict:
+    """
+    Builds the compact index of `vectorstore` with the INDEX_COMPRESSION_*
+    settings; it is only activated if it passes the recall check.
+    """
+    from src.ingestion.compression import compress_vector_store
+    return compress_vector_store(
+        vectorstore, config.COMPRESSED_INDEX_PATH,
+        method=config.INDEX_COMPRESSION,
+        dims=config.INDEX_COMPRESSION_DIMS,
+        quantized=config.INDEX_COMPRESSION_QUANTIZE,
+        k=config.RETRIEVAL_K,
+        min_recall=config.INDEX_COMPRESSION_MIN_RECALL,
+        questions=questions,
+    )
+
+def export_snapshot(vectorstore) -> dict:
+    """
+    Writes the single-file snapshot of `vectorstore` to INDEX_SNAPSHOT_PATH
+    and checks it against its checksum.
+    """
+    from src.ingestion.snapshot import export_snapshot as write_snapshot
+    return write_snapshot(vectorstore, config.INDEX_SNAPSHOT_PATH)
+
+def ingest_pipeline(rebuild: bool = False, workers: Optional[int] = None) -> bool:
     """
     Orchestrates the full ingestion pipeline: loads documents, splits them,
-    generates embeddings, and stores them in ChromaDB.
+    generates embeddings, and stores them in ChromaDB. With `rebuild`, an
+    existing DB is replaced instead of reused (the pipeline runner uses this
+    when the corpus changed). `workers` > 1 embeds in that many processes
+    (default: INGEST_WORKERS). The store is then exported as a single-file
+    snapshot (INDEX_SNAPSHOT_ENABLED). Returns True on success.
     """
     logger.info("Starting document ingestion pipeline for ChromaDB...")
     try:
@@ -116,16 +317,29 @@ def ingest_pipeline():
         documents = load_documents_from_corpus(config.CORPUS_PATH)
         if not documents:
             logger.error("No documents loaded. Aborting ingestion.")
-            return
+            return False
 
         # 2. Get embeddings model
-        embeddings = get_azure_openai_embeddings_model()
+        embeddings = get_embeddings_model()
 
         # 3. Setup ChromaDB
-        vectorstore = setup_chroma_db(documents, embeddings, config.CHROMA_DB_PATH)
+        # A snapshot of the previous store would otherwise outlive it if this run fails.
+        if config.INDEX_SNAPSHOT_PATH.exists():
+            logger.info(f"Removing the index snapshot of the previous vector store at {config.INDEX_SNAPSHOT_PATH}...")
+            config.INDEX_SNAPSHOT_PATH.unlink()
+        if rebuild and config.CHROMA_DB_PATH.exists():
+            logger.info(f"Removing existing Chroma DB at {config.CHROMA_DB_PATH} for a rebuild...")
+            shutil.rmtree(config.CHROMA_DB_PATH)
+        vectorstore = setup_chroma_db(documents, embeddings, config.CHROMA_DB_PATH, workers=workers)
         if vectorstore:
             logger.info("ChromaDB ingestion pipeline completed.")
-        else:
-            logger.error("ChromaDB vector store could not be set up. Aborting ingestion.")
+            if config.INDEX_COMPRESSION != "none":
+                compress_index(vectorstore)
+            if config.INDEX_SNAPSHOT_ENABLED:
+                export_snapshot(vectorstore)
+            return True
+        logger.error("ChromaDB vector store could not be set up. Aborting ingestion.")
+        return False
     except Exception as e:
         logger.critical(f"Critical error during ingestion pipeline: {e}", exc_info=True)
+        return False
@@ -0,0 +1,242 @@
+"""
+Dependency-aware runner for the scrape -> process -> ingest pipeline.
+
+Each Stage declares the files or directories it reads and writes. A stage
+depends on the stages whose outputs it reads, and stages whose dependencies
+are done run in parallel (the scrapers, the per-source processors). Before a
+stage runs, its inputs are fingerprinted by content; if the fingerprint
+matches the one recorded after its last successful run and its outputs still
+exist, it is skipped. Source stages (the scrapers) have no inputs and always
+run: they are cheap thanks to the HTTP cache, and only the branches whose
+scraped files actually changed are redone downstream.
+
+Fingerprints ignore record order in JSON Lines files (the scrapers write
+records as they complete) and volatile fields such as `collected_at`.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src import config
+from src.ingestion import loader, processor, scraper
+
+logger = logging.getLogger(__name__)
+
+# Fields that change on every scrape without the data changing.
+VOLATILE_FIELDS = {"collected_at"}
+
+
+# --- Fingerprints ---
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _canonical_record(record) -> bytes:
+    if isinstance(record, dict):
+        record = {key: value for key, value in record.items() if key not in VOLATILE_FIELDS}
+    return json.dumps(record, ensure_ascii=False, sort_keys=True).encode('utf-8')
+
+def fingerprint_file(path: Path) -> str:
+    """Content hash of a file; JSON Lines files are hashed as an unordered set of records."""
+    if path.suffix == ".jsonl":
+        with open(path, 'r', encoding='utf-8') as f:
+            digests = sorted(_hash_bytes(_canonical_record(json.loads(line))) for line in f if line.strip())
+        return _hash_bytes("\n".join(digests).encode('utf-8'))
+    if path.suffix == ".json":
+        with open(path, 'r', encoding='utf-8') as f:
+            return _hash_bytes(_canonical_record(json.load(f)))
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def fingerprint_path(path: Path) -> str:
+    """Fingerprint of a file or of every file under a directory ("missing" if absent)."""
+    if path.is_file():
+        return fingerprint_file(path)
+    if path.is_dir():
+        entries = [
+            f"{file_path.relative_to(path)}:{fingerprint_file(file_path)}"
+            for file_path in sorted(path.rglob("*")) if file_path.is_file()
+        ]
+        return _hash_bytes("\n".join(entries).encode('utf-8'))
+    return "missing"
+
+
+# --- Stages ---
+class Stage:
+    """
+    One pipeline step: calls `func(*args, **kwargs)`, reading `inputs` and
+    writing `outputs` (files or directories). `always_run` marks source stages
+    whose real input is external, such as a website. The stage fails if `func`
+    raises, returns False or leaves an output missing.
+    """
+
+    def __init__(self, name: str, func: Callable, args: Sequence = (), kwargs: Optional[dict] = None,
+                 inputs: Sequence[Path] = (), outputs: Sequence[Path] = (), always_run: bool = False):
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.always_run = always_run
+
+    def fingerprint(self) -> str:
+        """Hash of what the stage does (function and arguments) and of its current inputs."""
+        parts = [f"{self.func.__module__}.{self.func.__qualname__}", repr(self.args), repr(sorted(self.kwargs.items()))]
+        parts += [f"{path}:{fingerprint_path(path)}" for path in self.inputs]
+        return _hash_bytes("\n".join(parts).encode('utf-8'))
+
+    def run(self):
+        if self.func(*self.args, **self.kwargs) is False:
+            raise RuntimeError(f"{self.func.__qualname__} reported a failure.")
+        missing = [path for path in self.outputs if not path.exists()]
+        if missing:
+            raise RuntimeError(f"Output {missing[0]} was not produced.")
+
+
+def _produces(stage: Stage, path: Path) -> bool:
+    """True if one of the stage's outputs is `path` or lies inside it."""
+    return any(output == path or path in output.parents for output in stage.outputs)
+
+
+class PipelineRunner:
+    """Runs stages in dependency order, in parallel where possible, skipping unchanged ones."""
+
+    def __init__(self, stages: List[Stage], state_path: Path = None, max_workers: int = None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path or config.PIPELINE_STATE_PATH
+        self.max_workers = max_workers or config.PIPELINE_MAX_WORKERS
+        self.dependencies = {
+            stage.name: {other.name for other in stages if other is not stage and any(_produces(other, path) for path in stage.inputs)}
+            for stage in stages
+        }
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a dependency cycle through stage '{name}'.")
+            visiting.add(name)
+            for dependency in self.dependencies[name]:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _load_state(self) -> dict:
+        if not self.state_path.exists():
+            return {}
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_state(self, state: dict):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _execute(self, stage: Stage, state: dict, force: bool, skip_sources: bool) -> tuple:
+        """Runs or skips one stage; returns (status, fingerprint)."""
+        if stage.always_run and skip_sources:
+            return "skipped (sources disabled)", None
+        missing = [path for path in stage.inputs if not path.exists()]
+        if missing:
+            return f"skipped (missing input {missing[0]})", None
+        fingerprint = stage.fingerprint()
+        recorded = state.get(stage.name, {}).get("fingerprint")
+        if not (force or stage.always_run) and recorded == fingerprint and all(path.exists() for path in stage.outputs):
+            return "up to date", fingerprint
+        start = time.perf_counter()
+        stage.run()
+        return f"ran in {time.perf_counter() - start:.1f}s", fingerprint
+
+    def run(self, force: bool = False, skip_sources: bool = False) -> Dict[str, str]:
+        """
+        Runs the pipeline and returns each stage's outcome. A failed stage is
+        logged and its dependents are not run; the others carry on.
+        """
+        state = self._load_state()
+        outcomes: Dict[str, str] = {}
+        pending = dict(self.stages)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as executor:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    dependencies = self.dependencies[name]
+                    if any(outcomes.get(dep, "").startswith(("failed", "blocked")) for dep in dependencies):
+                        outcomes[name] = "blocked (upstream failure)"
+                        del pending[name]
+                    elif all(dep in outcomes for dep in dependencies):
+                        logger.info(f"Pipeline stage '{name}' starting...")
+                        running[executor.submit(self._execute, stage, state, force, skip_sources)] = name
+                        del pending[name]
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        status, fingerprint = future.result()
+                    except Exception as e:
+                        logger.error(f"Pipeline stage '{name}' failed: {e}", exc_info=True)
+                        outcomes[name] = f"failed: {e}"
+                        continue
+                    outcomes[name] = status
+                    if fingerprint and status.startswith("ran"):
+                        state[name] = {"fingerprint": fingerprint, "completed_at": datetime.now().isoformat()}
+                        self._save_state(state)
+                    logger.info(f"Pipeline stage '{name}': {status}")
+        return outcomes
+
+
+# --- CAN Pipeline ---
+def build_can_pipeline() -> List[Stage]:
+    """Declares the CAN data pipeline: scrapers -> per-source processing -> master corpus -> vector store."""
+    raw, processed = config.RAW_DATA_PATH, config.PROCESSED_DATA_PATH
+    le360_articles = raw / "le360_can_articles.jsonl"
+    le360_details = raw / "le360_can2025_details.json"
+    transfermarkt_teams = raw / "transfermarkt_african_teams_with_players.jsonl"
+    wikipedia_editions = raw / "wikipedia_can_editions.jsonl"
+    master_document = config.MASTER_RAG_DOCUMENT_PATH
+    corpus_document = config.CORPUS_PATH / "can_rag_corpus.txt"
+
+    return [
+        # Sources
+        Stage("scrape_le360", scraper.scrape_le360, args=(config.LE360_CAN_URL, le360_articles),
+              outputs=[le360_articles], always_run=True),
+        Stage("scrape_transfermarkt", scraper.scrape_transfermarkt, args=(raw,),
+              outputs=[transfermarkt_teams], always_run=True),
+        Stage("scrape_wikipedia", scraper.scrape_wikipedia, args=(raw,),
+              outputs=[wikipedia_editions, raw / "wikipedia_can_history.json"], always_run=True),
+        # Per-source processing
+        Stage("process_le360", processor.process_le360_articles_json_to_rag, args=(le360_articles, processed / "le360_articles.txt"),
+              inputs=[le360_articles], outputs=[processed / "le360_articles.txt"]),
+        Stage("process_le360_details", processor.process_le360_details, args=(le360_details, processed / "le360_can2025_details.txt"),
+              inputs=[le360_details], outputs=[processed / "le360_can2025_details.txt"]),
+        Stage("process_transfermarkt", processor.process_transfermarkt_teams_to_rag, args=(transfermarkt_teams, processed / "transfermarkt_squads.txt"),
+              inputs=[transfermarkt_teams], outputs=[processed / "transfermarkt_squads.txt"]),
+        Stage("process_wikipedia", processor.process_wikipedia_editions_to_rag, args=(wikipedia_editions, processed / "wikipedia_editions.txt"),
+              inputs=[wikipedia_editions], outputs=[processed / "wikipedia_editions.txt"]),
+        # Consolidation
+        Stage("create_master_document", processor.create_master_rag_document, args=(processed, master_document),
+              inputs=[processed], outputs=[master_document]),
+        Stage("merge_and_deduplicate", processor.merge_and_deduplicate_rag_corpus, args=(master_document, corpus_document),
+              inputs=[master_document], outputs=[corpus_document]),
+        # Vector store
+        Stage("ingest", loader.ingest_pipeline, kwargs={"rebuild": True}, inputs=[config.CORPUS_PATH], outputs=[config.CHROMA_DB_PATH]),
+    ]
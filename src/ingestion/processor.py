@@ -1,10 +1,20 @@
 import os
-import re
 import json
+import hashlib
 import logging
-from bs4 import BeautifulSoup
+import multiprocessing
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import SoupStrainer
 from pathlib import Path
 from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from src import config
+from src.ingestion.cleaning import RAG_DOCUMENT_CLEANER
+from src.ingestion.html_parsing import parse_html
+from src.ingestion.jsonl import iter_records
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -12,46 +22,99 @@ logger = logging.getLogger(__name__)
 # --- Utility and Cleaning Functions (from clean_and_structure_data.py) ---
 def clean_text_from_html(html_content: str) -> str:
     """Extracts and cleans text from HTML content using BeautifulSoup."""
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = parse_html(html_content)
     text = soup.get_text(separator='\n', strip=True)
     return text
 
 def clean_rag_document(text: str) -> str:
     """Cleans a RAG document by removing URLs, social media artifacts, and extra whitespace."""
-    text = re.sub(r'https?://\S+', '', text)
-    text = re.sub(r'pic\.twitter\.com/\w+', '', text)
-    text = re.sub(r'View this post on Instagram', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\n\s*\n', '\n', text)
-    text = re.sub(r' +', ' ', text)
-    return text.strip()
+    return RAG_DOCUMENT_CLEANER.clean(text)
 
 # --- Le360 Article Processing (from process_le360_articles.py) ---
+# The scrapers write JSON Lines (see jsonl.py); these processors read them one
+# record at a time and write their output as they go, in constant memory.
+def iter_latest_le360_articles(input_filepath: Path) -> Iterator[dict]:
+    """
+    Yields Le360 articles from a JSON array or from the crawler's JSON Lines
+    output, where an updated article is appended again: only the latest line
+    of each URL is kept. Two passes over the file keep memory to one entry per URL.
+    """
+    latest_position = {}
+    for position, article in enumerate(iter_records(input_filepath)):
+        latest_position[article.get('url')] = position
+    for position, article in enumerate(iter_records(input_filepath)):
+        if latest_position[article.get('url')] == position:
+            yield article
+
+def _write_rag_entries(entries: Iterable[str], output_filepath: Path) -> int:
+    """Streams formatted RAG entries to a text file and returns how many were written."""
+    count = 0
+    output_filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_filepath, 'w', encoding='utf-8') as outfile:
+        for rag_entry in entries:
+            outfile.write(rag_entry)
+            count += 1
+    return count
+
 def process_le360_articles_json_to_rag(input_filepath: Path, output_filepath: Path):
     """
-    Reads Le360 articles from a JSON file, formats them into a RAG-friendly
-    text document, and saves the output.
+    Reads Le360 articles from a JSON or JSON Lines file, formats them into a
+    RAG-friendly text document, and saves the output.
     """
     logger.info(f"Processing Le360 articles from {input_filepath} to RAG format...")
     if not input_filepath.exists():
         logger.error(f"Input file not found: {input_filepath}")
         return
 
-    with open(input_filepath, 'r', encoding='utf-8') as infile:
-        articles = json.load(infile)
-    
-    output_filepath.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_filepath, 'w', encoding='utf-8') as outfile:
-        for article in articles:
+    def entries():
+        for article in iter_latest_le360_articles(input_filepath):
             title = article.get('title', 'No Title')
             content = article.get('content', 'No Content')
             url = article.get('url', 'No URL')
 
-            rag_entry = f"Titre de l'article: {title}\n" \
-                        f"URL: {url}\n" \
-                        f"Contenu:\n{content}\n\n" \
-                        f"{'-'*80}\n\n"
-            outfile.write(rag_entry)
-    logger.info(f"Le360 RAG document created at: {output_filepath}")
+            yield f"Titre de l'article: {title}\n" \
+                  f"URL: {url}\n" \
+                  f"Contenu:\n{content}\n\n" \
+                  f"{'-'*80}\n\n"
+
+    count = _write_rag_entries(entries(), output_filepath)
+    logger.info(f"Le360 RAG document created at: {output_filepath} ({count} articles)")
+
+# --- Wikipedia & Transfermarkt Processing ---
+def process_wikipedia_editions_to_rag(input_filepath: Path, output_filepath: Path):
+    """Formats the Wikipedia CAN editions (JSON Lines from scrape_wikipedia) into a RAG text document."""
+    logger.info(f"Processing Wikipedia editions from {input_filepath} to RAG format...")
+    if not input_filepath.exists():
+        logger.error(f"Input file not found: {input_filepath}")
+        return
+
+    def entries():
+        for edition in iter_records(input_filepath):
+            yield f"Édition {edition.get('year')}: {edition.get('title', 'No Title')}\n" \
+                  f"URL: {edition.get('url', 'No URL')}\n" \
+                  f"Contenu:\n{edition.get('full_text', '')}\n\n" \
+                  f"{'-'*80}\n\n"
+
+    count = _write_rag_entries(entries(), output_filepath)
+    logger.info(f"Wikipedia RAG document created at: {output_filepath} ({count} editions)")
+
+def process_transfermarkt_teams_to_rag(input_filepath: Path, output_filepath: Path):
+    """Formats the Transfermarkt squads (JSON Lines from scrape_transfermarkt) into a RAG text document."""
+    logger.info(f"Processing Transfermarkt teams from {input_filepath} to RAG format...")
+    if not input_filepath.exists():
+        logger.error(f"Input file not found: {input_filepath}")
+        return
+
+    def entries():
+        for team in iter_records(input_filepath):
+            players = "\n".join(f"- {player['name']} ({player['position']})" for player in team.get('players', []))
+            yield f"Équipe: {team.get('name')}\n" \
+                  f"URL: {team.get('url', 'No URL')}\n" \
+                  f"Joueurs:\n{players}\n\n" \
+                  f"{'-'*80}\n\n"
+
+    count = _write_rag_entries(entries(), output_filepath)
+    logger.info(f"Transfermarkt RAG document created at: {output_filepath} ({count} teams)")
 
 # --- Le360 Details Extraction (from extract_le360_details.py) ---
 def extract_can_details_from_le360_json_string(json_string: str) -> str:
@@ -124,7 +187,7 @@ def extract_can_details_from_le360_json_string(json_string: str) -> str:
         
         elif content_type == "raw_html":
             html_content = element.get("content", "")
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = parse_html(html_content, parse_only=SoupStrainer(class_='group-card'))
             
             if not groups:
                 group_cards = soup.find_all(class_='group-card')
@@ -193,46 +256,61 @@ def process_le360_details(input_json_filepath: Path, output_filepath: Path):
         logger.warning(f"Failed to create Le360 CAN 2025 details RAG document from {input_json_filepath}")
 
 # --- Data Merging and Deduplication (from merge_and_deduplicate_data.py) ---
+# The consolidation steps stream their input and write their output as they go.
+# Deduplication keeps a fixed-size hash (CORPUS_DEDUP_DIGEST_SIZE bytes) of each
+# distinct line or document rather than the text itself, so memory no longer
+# grows with the size of the corpus text.
+_SECTION_MARKER = '--- Contenu de'
+
+def _partial_path(output_filepath: Path) -> Path:
+    """Sibling file the output is written to before replacing `output_filepath` atomically."""
+    return output_filepath.with_name(f"{output_filepath.name}.partial")
+
 def merge_and_deduplicate_rag_corpus(input_filepath: Path, output_filepath: Path):
     """
     Merges content from various RAG documents (separated by '--- Contenu de')
-    and deduplicates lines.
+    and deduplicates lines. The input is read line by line and kept lines are
+    written immediately; a section header is written with its first kept line.
     """
     logger.info(f"Merging and deduplicating RAG corpus from {input_filepath}...")
     if not input_filepath.exists():
         logger.error(f"Input file not found: {input_filepath}")
         return
 
-    with open(input_filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    sections = content.split('--- Contenu de')
-    
-    unique_lines = set() # To help with deduplication across all sections
-    merged_content = []
-
-    for section in sections:
-        if not section.strip():
-            continue
-            
-        lines = section.split('\n')
-        filename_header = lines[0]
-        section_content = "\n".join(lines[1:])
-        
-        unique_section_lines = []
-        for line in section_content.split('\n'):
-            stripped_line = line.strip()
-            if stripped_line and stripped_line not in unique_lines:
-                unique_section_lines.append(line)
-                unique_lines.add(stripped_line)
-        
-        if unique_section_lines:
-            merged_content.append(f"--- Contenu de{filename_header}\n" + "\n".join(unique_section_lines) + "\n\n")
-
+    seen_lines = set() # Hashes of the stripped lines kept so far, across all sections
+    blake2b, digest_size = hashlib.blake2b, config.CORPUS_DEDUP_DIGEST_SIZE
     output_filepath.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_filepath, 'w', encoding='utf-8') as f:
-        f.write("".join(merged_content))
-    logger.info(f"Merged and deduplicated RAG corpus created at: {output_filepath}")
+    partial_path = _partial_path(output_filepath)
+    with open(input_filepath, 'r', encoding='utf-8') as infile, open(partial_path, 'w', encoding='utf-8') as outfile:
+        # The text up to the end of the line after a marker (or the file's first
+        # line) is the section header; None means the next segment is one.
+        header, section_written = None, False
+        for block in _read_blocks(infile):
+            output = []
+            for line in (block[:-1] if block.endswith('\n') else block).split('\n'):
+                segments = line.split(_SECTION_MARKER) if _SECTION_MARKER in line else (line,)
+                for index, segment in enumerate(segments):
+                    if index > 0:
+                        if section_written:
+                            output.append("\n\n")
+                        header, section_written = None, False
+                    if header is None:
+                        header = segment
+                        continue
+                    stripped_line = segment.strip()
+                    if not stripped_line:
+                        continue
+                    digest = blake2b(stripped_line.encode('utf-8'), digest_size=digest_size).digest()
+                    if digest in seen_lines:
+                        continue
+                    seen_lines.add(digest)
+                    output.append(f"\n{segment}" if section_written else f"{_SECTION_MARKER}{header}\n{segment}")
+                    section_written = True
+            outfile.write("".join(output))
+        if section_written:
+            outfile.write("\n\n")
+    os.replace(partial_path, output_filepath)
+    logger.info(f"Merged and deduplicated RAG corpus created at: {output_filepath} ({len(seen_lines)} unique lines)")
 
 # --- Squad List Appending (from append_squad_list.py) ---
 def append_squad_list_to_file(filepath: Path, squad_list_content: str):
@@ -252,34 +330,69 @@ def append_squad_list_to_file(filepath: Path, squad_list_content: str):
 
 
 # --- Master RAG Document Creation (from create_master_rag_document.py) ---
-def create_master_rag_document(processed_data_dir: Path, output_filepath: Path):
+def _read_blocks(infile, block_size: int = 1 << 20) -> Iterator[str]:
+    """Reads a text file in blocks of about `block_size` characters made of whole lines."""
+    while True:
+        lines = infile.readlines(block_size)
+        if not lines:
+            return
+        yield "".join(lines)
+
+def _clean_file_to_spool(input_filepath: Path, spool_filepath: Path) -> Optional[bytes]:
+    """
+    Cleans one processed file block by block into `spool_filepath`. Returns
+    the hash of the cleaned content, or None if nothing is left after cleaning.
+    """
+    digest = hashlib.blake2b(digest_size=config.CORPUS_DEDUP_DIGEST_SIZE)
+    empty = True
+    with open(input_filepath, 'r', encoding='utf-8') as infile, open(spool_filepath, 'w', encoding='utf-8') as spool:
+        for piece in RAG_DOCUMENT_CLEANER.clean_stream(_read_blocks(infile)):
+            spool.write(piece)
+            digest.update(piece.encode('utf-8'))
+            empty = empty and not piece
+    return None if empty else digest.digest()
+
+def create_master_rag_document(processed_data_dir: Path, output_filepath: Path, workers: Optional[int] = None):
     """
     Consolidates and cleans various processed text files into a single master RAG document.
+
+    Files are cleaned in parallel (up to `workers` processes, CORPUS_BUILD_WORKERS
+    by default), each streamed into a spool file, then appended in file name
+    order; a file whose cleaned content duplicates an earlier one is skipped.
     """
     logger.info(f"Creating master RAG document from {processed_data_dir}...")
     if not processed_data_dir.exists():
         logger.error(f"Processed data directory not found: {processed_data_dir}")
         return
 
-    all_cleaned_content = []
-    seen_content = set() # To help with simple deduplication across files
-
-    for filename in os.listdir(processed_data_dir):
-        input_filepath = processed_data_dir / filename
-        
-        if input_filepath.suffix == ".txt":
-            with open(input_filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            cleaned_content = clean_rag_document(content) # Use the generic cleaner
-            
-            if cleaned_content and cleaned_content not in seen_content:
-                all_cleaned_content.append(f"--- Contenu de {filename} ---\n{cleaned_content}\n\n")
-                seen_content.add(cleaned_content)
+    input_files = []
+    for input_filepath in sorted(processed_data_dir.iterdir()):
+        if input_filepath.suffix == ".txt" and input_filepath.is_file():
+            input_files.append(input_filepath)
         else:
-            logger.debug(f"Skipping non-text file: {filename} in processed data directory.")
+            logger.debug(f"Skipping non-text file: {input_filepath.name} in processed data directory.")
+    workers = max(1, min(workers or config.CORPUS_BUILD_WORKERS, len(input_files)))
 
+    seen_content = set() # Hashes of the documents written, for deduplication across files
     output_filepath.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_filepath, 'w', encoding='utf-8') as outfile:
-        outfile.write("".join(all_cleaned_content))
-    logger.info(f"Master RAG document created at: {output_filepath}")
+    partial_path = _partial_path(output_filepath)
+    with tempfile.TemporaryDirectory(prefix=".master_spool_", dir=output_filepath.parent) as spool_dir:
+        spool_files = [Path(spool_dir) / f"{index}.txt" for index in range(len(input_files))]
+        # Spawned, not forked: the caller may hold threads (scraper clients, the app's pools).
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) if workers > 1 else None
+        try:
+            digests = (executor.map if executor else map)(_clean_file_to_spool, input_files, spool_files)
+            with open(partial_path, 'w', encoding='utf-8') as outfile:
+                for input_filepath, spool_filepath, digest in zip(input_files, spool_files, digests):
+                    if digest is not None and digest not in seen_content:
+                        seen_content.add(digest)
+                        outfile.write(f"--- Contenu de {input_filepath.name} ---\n")
+                        with open(spool_filepath, 'r', encoding='utf-8') as spool:
+                            shutil.copyfileobj(spool, outfile)
+                        outfile.write("\n\n")
+                    spool_filepath.unlink()
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+    os.replace(partial_path, output_filepath)
+    logger.info(f"Master RAG document created at: {output_filepath} ({len(seen_content)} of {len(input_files)} files kept)")
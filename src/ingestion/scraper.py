@@ -1,15 +1,21 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import hashlib
+import httpx
+from bs4 import SoupStrainer
 import logging
 import os
 import re
 import json
-import html
-import time
-import pandas as pd
-import wikipedia
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urljoin
+
+from src import config
+from src.ingestion.cleaning import ARTICLE_TEXT_CLEANER, EMOJI_CLEANER, SCRAPED_TEXT_CLEANER
+from src.ingestion.fetcher import AsyncFetcher, fetch_sync
+from src.ingestion.html_parsing import parse_html
+from src.ingestion.http_cache import CacheMissError
+from src.ingestion.jsonl import JSONLWriter
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -17,110 +23,178 @@ logger = logging.getLogger(__name__)
 # --- Utility Functions (moved from scrape_le360_can_articles.py) ---
 def remove_emojis(text: str) -> str:
     """Removes emojis from a string."""
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"  # Emoticons
-        "\U0001F300-\U0001F5FF"  # Symbols & Pictographs
-        "\U0001F680-\U0001F6FF"  # Transport & Map Symbols
-        "\U0001F1E0-\U0001F1FF"  # Flags (iOS)
-        "\U00002702-\U000027B0"  # Dingbats
-        "\U000024C2-\U0001F251"  # Enclosed Characters
-        "\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
-        "\U0001FA00-\U0001FA6F"  # Chess Symbols
-        "\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
-        "\U000025AA-\U000025AB"  # White and black square, small
-        "\U00002B05-\U00002B07"  # Arrows
-        "\U00002934-\U00002935"  # Curly Loop
-        "\U00002B50"             # White medium star
-        "\U0000FE0F"             # Variation Selector
-        "\U0000200D"             # Zero Width Joiner
-        "]+",
-        flags=re.UNICODE
-    )
-    return emoji_pattern.sub(r'', text)
+    return EMOJI_CLEANER.clean(text)
 
 def clean_article_text(text: str) -> str:
     """Cleans article text by unescaping HTML entities and removing social media artifacts."""
-    text = html.unescape(text)
-    text = re.sub(r'pic.twitter.com/\w+', '', text)
-    text = re.sub(r'View this post on Instagram', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'#[a-zA-Z0-9_]+', '', text)
-    text = re.sub(r'@[a-zA-Z0-9_]+', '', text)
-    text = re.sub(r'\n\s*\n', '\n', text)
-    text = re.sub(r' +', ' ', text)
-    return text.strip()
+    return ARTICLE_TEXT_CLEANER.clean(text)
 
 # --- Le360 Scraper Functions (adapted from scrape_le360_can_articles.py) ---
-def _get_le360_article_links(main_url: str) -> list:
-    """Fetches article links from the main CAN page."""
+# The Le360 crawler is incremental: it follows the listing's pagination, keeps
+# a persistent index of the article URLs it has seen (content hash, first seen,
+# last crawled, last changed) and only fetches articles that are new or due
+# for a re-check. New and changed articles are appended to a JSON Lines file,
+# and the crawl stops once listing pages contain nothing new. Pages are fetched
+# through the shared AsyncFetcher (per-host limits, HTTP cache).
+_LE360_PAGINATION_PATTERN = re.compile(r'/page/\d+/?$|[?&]page=\d+')
+_NEXT_PAGE_LABELS = {"suivant", "page suivante", "next", "›", "»"}
+
+# Only these elements are built when parsing Le360 pages (see html_parsing.py).
+_LE360_LISTING_STRAINER = SoupStrainer(['a', 'link'])
+_LE360_ARTICLE_STRAINER = SoupStrainer(['h1', 'article'])
+
+def _parse_le360_listing(page_content: bytes, page_url: str) -> tuple:
+    """
+    Extracts the unique CAN article links of a Le360 listing page, in page
+    order, and the URL of the next listing page (None on the last page).
+    """
+    soup = parse_html(page_content, parse_only=_LE360_LISTING_STRAINER)
     links = []
-    try:
-        response = requests.get(main_url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        for a_tag in soup.find_all('a', href=re.compile(r'/football/can/.*')):
-            link = a_tag['href']
-            if not link.startswith('http'):
-                link = f"https://sport.le360.ma{link}"
+    for a_tag in soup.find_all('a', href=re.compile(r'/football/can/.*')):
+        link = a_tag['href']
+        if not link.startswith('http'):
+            link = f"https://sport.le360.ma{link}"
+        if not _LE360_PAGINATION_PATTERN.search(link):
             links.append(link)
-        links = list(set(links))
-        logger.info(f"Found {len(links)} unique Le360 article links.")
-        return links
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching the main Le360 page: {e}")
-        return []
-
-def _scrape_le360_single_article(url: str) -> dict:
+
+    next_tag = soup.find(['a', 'link'], rel='next', href=True)
+    if next_tag is None:
+        next_tag = next((a for a in soup.find_all('a', href=True) if a.get_text(strip=True).lower() in _NEXT_PAGE_LABELS), None)
+    next_page_url = urljoin(page_url, next_tag['href']) if next_tag else None
+    return list(dict.fromkeys(links)), next_page_url
+
+def _parse_le360_article(url: str, page_content: bytes) -> dict:
+    """Extracts the title and content of a Le360 article page."""
+    soup = parse_html(page_content, parse_only=_LE360_ARTICLE_STRAINER)
+    if soup.find('article') is None:
+        # Older layouts put the body in a div; those pages need the full tree.
+        soup = parse_html(page_content)
+
+    title_tag = soup.find('h1')
+    title = title_tag.get_text(strip=True) if title_tag else "No Title Found"
+    title = SCRAPED_TEXT_CLEANER.clean(title)
+
+    article_text = ""
+    content_container = soup.find('article') or soup.find('div', class_='article-body') or soup.find('div', class_='main-content')
+    if content_container:
+        article_text = content_container.get_text(separator='\n', strip=True)
+    else:
+         article_text = "No content found."
+
+    article_text = SCRAPED_TEXT_CLEANER.clean(article_text)
+
+    return {
+        "url": url,
+        "title": title,
+        "content": article_text,
+        "source": "le360.ma"
+    }
+
+async def _scrape_le360_single_article(fetcher: AsyncFetcher, url: str) -> dict:
     """Scrapes the title and content of a single Le360 article."""
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        title_tag = soup.find('h1')
-        title = title_tag.get_text(strip=True) if title_tag else "No Title Found"
-        title = remove_emojis(clean_article_text(title))
-        
-        article_text = ""
-        content_container = soup.find('article') or soup.find('div', class_='article-body') or soup.find('div', class_='main-content')
-        if content_container:
-            article_text = content_container.get_text(separator='\n', strip=True)
-        else:
-             article_text = "No content found."
-
-        article_text = remove_emojis(clean_article_text(article_text))
-        
-        return {
-            "url": url,
-            "title": title,
-            "content": article_text,
-            "source": "le360.ma"
-        }
-    except requests.exceptions.RequestException as e:
+        response = await fetcher.fetch(url)
+    except (httpx.HTTPError, CacheMissError) as e:
         logger.error(f"Error scraping Le360 article at {url}: {e}")
         return None
+    logger.info(f"Scraped Le360 article: {url}")
+    return _parse_le360_article(url, response.content)
 
-def scrape_le360(main_url: str, output_filepath: Path):
-    """Orchestrates scraping Le360 CAN articles and saves them to a JSON file."""
-    logger.info(f"Starting scraper for Le360 CAN articles from {main_url}")
-    
-    article_links = _get_le360_article_links(main_url)
-    scraped_articles = []
-    
-    if article_links:
-        for link in article_links: 
-            logger.info(f"Scraping Le360 article: {link}")
-            article_data = _scrape_le360_single_article(link)
-            if article_data:
-                scraped_articles.append(article_data)
-
-        output_filepath.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_filepath, 'w', encoding='utf-8') as f:
-            json.dump(scraped_articles, f, ensure_ascii=False, indent=4)
-        
-        logger.info(f"Scraped data for {len(scraped_articles)} Le360 articles saved to {output_filepath}")
+def _article_hash(article: dict) -> str:
+    return hashlib.sha256(f"{article['title']}\n{article['content']}".encode('utf-8')).hexdigest()
+
+def load_le360_index(index_filepath: Path) -> dict:
+    """Loads the seen-URL index: {url: {"content_hash", "first_seen", "last_crawled", "last_changed"}}."""
+    if not index_filepath.exists():
+        return {}
+    with open(index_filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_le360_index(index: dict, index_filepath: Path):
+    """Writes the seen-URL index atomically."""
+    index_filepath.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_filepath.with_suffix(index_filepath.suffix + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, index_filepath)
+
+def _is_due_for_recheck(entry: dict, now: datetime) -> bool:
+    last_crawled = datetime.fromisoformat(entry["last_crawled"])
+    return (now - last_crawled).total_seconds() >= config.LE360_RECHECK_AFTER
+
+async def _collect_le360_candidates(fetcher: AsyncFetcher, main_url: str, index: dict, now: datetime) -> list:
+    """
+    Walks the listing pages and returns the article URLs to fetch: unseen ones,
+    and known ones due for a re-check. Stops after LE360_STOP_AFTER_KNOWN_PAGES
+    consecutive pages without unseen articles, or after LE360_MAX_PAGES pages.
+    """
+    candidates = []
+    visited_pages = set()
+    known_pages = 0
+    page_url = main_url
+    while page_url and page_url not in visited_pages and len(visited_pages) < config.LE360_MAX_PAGES:
+        visited_pages.add(page_url)
+        try:
+            response = await fetcher.fetch(page_url)
+        except (httpx.HTTPError, CacheMissError) as e:
+            logger.error(f"Error fetching the Le360 listing page {page_url}: {e}")
+            break
+        links, next_page_url = _parse_le360_listing(response.content, page_url)
+        unseen = [link for link in links if link not in index and link not in candidates]
+        due = [link for link in links if link in index and link not in candidates and _is_due_for_recheck(index[link], now)]
+        candidates.extend(unseen + due)
+        logger.info(f"Le360 listing {page_url}: {len(links)} links, {len(unseen)} unseen, {len(due)} due for re-check.")
+
+        known_pages = known_pages + 1 if links and not unseen else 0
+        if known_pages >= config.LE360_STOP_AFTER_KNOWN_PAGES:
+            logger.info("Reached already-known Le360 listing pages; stopping the crawl.")
+            break
+        page_url = next_page_url
+    return candidates
+
+async def _crawl_le360(main_url: str, index: dict, now: datetime, writer: JSONLWriter):
+    """Appends new and updated articles to `writer` as they arrive, updating `index` in place."""
+    timestamp = now.isoformat()
+    async with AsyncFetcher() as fetcher:
+        candidates = await _collect_le360_candidates(fetcher, main_url, index, now)
+        for next_article in asyncio.as_completed([_scrape_le360_single_article(fetcher, link) for link in candidates]):
+            article = await next_article
+            if not article:
+                continue
+            content_hash = _article_hash(article)
+            entry = index.get(article["url"])
+            if entry is None:
+                entry = index[article["url"]] = {"first_seen": timestamp}
+            elif entry["content_hash"] == content_hash:
+                entry["last_crawled"] = timestamp
+                continue
+            writer.write({**article, "crawled_at": timestamp, "content_hash": content_hash})
+            entry.update(content_hash=content_hash, last_crawled=timestamp, last_changed=timestamp)
+
+def scrape_le360(main_url: str, output_filepath: Path, index_filepath: Path = None):
+    """
+    Incrementally crawls Le360 CAN articles and appends the new and updated
+    ones to `output_filepath` (JSON Lines, one article per line, written as
+    each article is scraped; an updated article is appended again and
+    supersedes its earlier line). The seen-URL index defaults to
+    `<output_filepath>.index.json`.
+    """
+    logger.info(f"Starting incremental scraper for Le360 CAN articles from {main_url}")
+    index_filepath = index_filepath or output_filepath.with_name(output_filepath.name + ".index.json")
+    index = load_le360_index(index_filepath)
+
+    try:
+        with JSONLWriter(output_filepath, append=True) as writer:
+            asyncio.run(_crawl_le360(main_url, index, datetime.now(), writer))
+    finally:
+        # The index only records articles already written, so it is saved even
+        # after a crash; the next run fetches whatever was missed.
+        save_le360_index(index, index_filepath)
+    if writer.count:
+        logger.info(f"Appended {writer.count} new or updated Le360 articles to {output_filepath}")
     else:
-        logger.warning("No Le360 article links found. Exiting Le360 scraping.")
+        logger.info("No new or updated Le360 articles.")
+    logger.info(f"Le360 index: {len(index)} known articles ({index_filepath})")
 
 # --- SofaScore Scraper Functions (adapted from scrape_sofascore.py) ---
 def scrape_sofascore(output_dir: Path):
@@ -139,8 +213,7 @@ def scrape_sofascore(output_dir: Path):
     # Get tournament info
     try:
         url = f"{base_url}/unique-tournament/{tournament_id}/season/current/standings/total"
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        response = fetch_sync(url, headers=headers)
         data = response.json()
         filepath = output_dir / "sofascore_tournament_info.json"
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -174,6 +247,47 @@ def scrape_sofascore(output_dir: Path):
     logger.info(f"SofaScore match calendar saved: {filepath}")
 
 # --- Transfermarkt Scraper Functions (adapted from scrape_transfermarkt.py) ---
+_TRANSFERMARKT_SQUAD_STRAINER = SoupStrainer('table', class_='items')
+
+def _parse_transfermarkt_players(page_content: bytes) -> list:
+    """Extracts the players (name and position) of a Transfermarkt squad page."""
+    soup = parse_html(page_content, parse_only=_TRANSFERMARKT_SQUAD_STRAINER)
+    players = []
+    player_rows = soup.select("table.items > tbody > tr")
+    for row in player_rows:
+        name_element = row.select_one('td.hauptlink a')
+        if name_element:
+            name = name_element.get_text(strip=True)
+            position = row.select_one('td.zentriert').get_text(strip=True) if row.select_one('td.zentriert') else 'N/A'
+            players.append({"name": name, "position": position})
+    return players
+
+async def _scrape_transfermarkt_team(fetcher: AsyncFetcher, team: dict, url: str) -> dict:
+    """Collects one team's squad; retries and pacing are handled by the fetcher."""
+    try:
+        response = await fetcher.fetch(url)
+    except (httpx.HTTPError, CacheMissError) as e:
+        logger.error(f"Failed to collect for {team['name']}: {e}")
+        return None
+    players = _parse_transfermarkt_players(response.content)
+    logger.info(f"{team['name']} collected with {len(players)} players.")
+    return {
+        "name": team['name'],
+        "url": url,
+        "players": players,
+        "data_collected": "basic_info_with_players"
+    }
+
+async def _collect_transfermarkt_teams(base_url: str, teams: list, headers: dict, writer: JSONLWriter):
+    """Writes each team to `writer` as soon as its squad is collected."""
+    async with AsyncFetcher(headers=headers) as fetcher:
+        for next_team in asyncio.as_completed([
+            _scrape_transfermarkt_team(fetcher, team, base_url + team['url_suffix']) for team in teams
+        ]):
+            team_info = await next_team
+            if team_info:
+                writer.write(team_info)
+
 def scrape_transfermarkt(output_dir: Path):
     """Scrapes Transfermarkt for African teams and their players."""
     logger.info("Collecting African teams and their players from Transfermarkt...")
@@ -211,81 +325,88 @@ def scrape_transfermarkt(output_dir: Path):
         {"name": "Zimbabwe", "url_suffix": "/simbabwe/startseite/verein/3583"},
     ]
 
-    teams_data = []
-
-    for team in teams:
-        logger.info(f"Collecting {team['name']}...")
-        url = base_url + team['url_suffix']
-        players = []
-        
-        for attempt in range(3):
-            try:
-                response = requests.get(url, headers=headers, timeout=10)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                player_rows = soup.select("table.items > tbody > tr")
-                for row in player_rows:
-                    name_element = row.select_one('td.hauptlink a')
-                    if name_element:
-                        name = name_element.get_text(strip=True)
-                        position = row.select_one('td.zentriert').get_text(strip=True) if row.select_one('td.zentriert') else 'N/A'
-                        players.append({"name": name, "position": position})
-
-                team_info = {
-                    "name": team['name'],
-                    "url": url,
-                    "players": players,
-                    "data_collected": "basic_info_with_players"
-                }
-                teams_data.append(team_info)
-                logger.info(f"{team['name']} collected with {len(players)} players.")
-                time.sleep(2)
-                break
-            except Exception as e:
-                logger.error(f"Error for {team['name']} (attempt {attempt + 1}/3): {e}")
-                if attempt < 2:
-                    logger.info("Retrying in 5 seconds...")
-                    time.sleep(5)
-                else:
-                    logger.error(f"Failed to collect for {team['name']} after 3 attempts.")
-
-    filepath = output_dir / "transfermarkt_african_teams_with_players.json"
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(teams_data, f, ensure_ascii=False, indent=2)
-    logger.info(f"{len(teams_data)} teams saved: {filepath}")
+    filepath = output_dir / "transfermarkt_african_teams_with_players.jsonl"
+    with JSONLWriter(filepath) as writer:
+        asyncio.run(_collect_transfermarkt_teams(base_url, teams, headers, writer))
+    logger.info(f"{writer.count} teams saved: {filepath}")
 
 # --- Wikipedia Scraper Functions (adapted from scrape_wikipedia.py) ---
-def scrape_wikipedia(output_dir: Path):
-    """Collects CAN data from Wikipedia."""
-    logger.info("Starting Wikipedia CAN data collection...")
+# Pages are read from the MediaWiki API through the shared fetcher (the
+# `wikipedia` package only fetches one page at a time, synchronously).
+WIKIPEDIA_API_URL = "https://fr.wikipedia.org/w/api.php"
 
-    wikipedia.set_lang('fr')
-    output_dir.mkdir(parents=True, exist_ok=True)
+class WikipediaPageError(Exception):
+    """Raised when a Wikipedia page is missing or is a disambiguation page."""
+
+async def _fetch_wikipedia_page(fetcher: AsyncFetcher, title: str) -> dict:
+    """Returns the title, summary (lead section), plain-text content and URL of a page."""
+    response = await fetcher.fetch(WIKIPEDIA_API_URL, params={
+        "action": "query",
+        "format": "json",
+        "formatversion": "2",
+        "redirects": "1",
+        "titles": title,
+        "prop": "extracts|info|pageprops",
+        "explaintext": "1",
+        "inprop": "url",
+        "ppprop": "disambiguation",
+    })
+    page = response.json()["query"]["pages"][0]
+    if page.get("missing") or page.get("invalid"):
+        raise WikipediaPageError(f"Page '{title}' not found.")
+    if "disambiguation" in page.get("pageprops", {}):
+        raise WikipediaPageError(f"Page '{title}' is a disambiguation page.")
+    content = page.get("extract", "")
+    return {
+        "title": page["title"],
+        "summary": content.split("\n==", 1)[0].strip(),
+        "full_text": content,
+        "url": page["fullurl"],
+    }
 
-    # Get CAN History
-    logger.info("Collecting CAN history from Wikipedia...")
+async def _fetch_wikipedia_edition(fetcher: AsyncFetcher, year: int) -> dict:
+    page_title = f"Coupe d'Afrique des nations de football {year}"
     try:
-        page = wikipedia.page("Coupe_d'Afrique_des_nations_de_football")
-        data = {
-            "title": page.title,
-            "summary": page.summary,
-            "full_text": page.content,
-            "url": page.url,
-            "collected_at": datetime.now().isoformat()
-        }
-        filepath = output_dir / "wikipedia_can_history.json"
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        logger.info(f"Wikipedia CAN history saved: {filepath}")
-    except wikipedia.exceptions.PageError:
+        page = await _fetch_wikipedia_page(fetcher, page_title)
+    except WikipediaPageError as e:
+        logger.warning(f"Wikipedia page for year {year} unavailable: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Error collecting Wikipedia edition {year}: {e}")
+        return None
+    logger.info(f"Wikipedia Edition {year} collected.")
+    return {"year": year, **page}
+
+async def _save_wikipedia_history(fetcher: AsyncFetcher, output_dir: Path):
+    try:
+        history = await _fetch_wikipedia_page(fetcher, "Coupe_d'Afrique_des_nations_de_football")
+    except WikipediaPageError:
         logger.error("Wikipedia page for CAN history not found.")
+        return
     except Exception as e:
         logger.error(f"Error collecting Wikipedia CAN history: {e}")
+        return
+    data = {**history, "collected_at": datetime.now().isoformat()}
+    filepath = output_dir / "wikipedia_can_history.json"
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    logger.info(f"Wikipedia CAN history saved: {filepath}")
+
+async def _collect_wikipedia(years: list, output_dir: Path, editions_writer: JSONLWriter):
+    """Fetches the history page and all editions concurrently, writing each edition as it arrives."""
+    async with AsyncFetcher() as fetcher:
+        history_task = asyncio.create_task(_save_wikipedia_history(fetcher, output_dir))
+        for next_edition in asyncio.as_completed([_fetch_wikipedia_edition(fetcher, year) for year in years]):
+            edition = await next_edition
+            if edition:
+                editions_writer.write(edition)
+        await history_task
 
-    # Get CAN Editions
-    logger.info("Collecting CAN editions from Wikipedia...")
-    editions_data = []
+def scrape_wikipedia(output_dir: Path):
+    """Collects CAN data from Wikipedia."""
+    logger.info("Starting Wikipedia CAN data collection...")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
     years = [
         1957, 1959, 1962, 1963, 1965, 1968,
         1970, 1972, 1974, 1976, 1978,
@@ -295,26 +416,8 @@ def scrape_wikipedia(output_dir: Path):
         2010, 2012, 2013, 2015, 2017,
         2019, 2021, 2023, 2025 # Include 2025 as a potential future page
     ]
-    for year in years:
-        page_title = f"Coupe d'Afrique des nations de football {year}"
-        try:
-            page = wikipedia.page(page_title, auto_suggest=False)
-            editions_data.append({
-                "year": year,
-                "title": page.title,
-                "summary": page.summary,
-                "full_text": page.content,
-                "url": page.url
-            })
-            logger.info(f"Wikipedia Edition {year} collected.")
-        except wikipedia.exceptions.PageError:
-            logger.warning(f"Wikipedia page for year {year} not found.")
-        except wikipedia.exceptions.DisambiguationError as e:
-            logger.warning(f"Wikipedia disambiguation page for year {year}: {e.options}")
-        except Exception as e:
-            logger.error(f"Error collecting Wikipedia edition {year}: {e}")
-
-    filepath = output_dir / "wikipedia_can_editions.json"
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(editions_data, f, ensure_ascii=False, indent=2)
-    logger.info(f"{len(editions_data)} Wikipedia editions saved: {filepath}")
+    logger.info("Collecting CAN history and editions from Wikipedia...")
+    filepath = output_dir / "wikipedia_can_editions.jsonl"
+    with JSONLWriter(filepath) as writer:
+        asyncio.run(_collect_wikipedia(years, output_dir, writer))
+    logger.info(f"{writer.count} Wikipedia editions saved: {filepath}")
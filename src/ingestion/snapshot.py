@@ -0,0 +1,243 @@
+"""
+Single-file index snapshot, opened with mmap.
+
+Copying the Chroma directory to every app replica and opening it there is
+slow: the SQLite store and the HNSW index are loaded before the first search.
+export_snapshot writes the chunks of a Chroma collection to one file instead:
+
+    prelude      magic, format version, manifest length and BLAKE2b digest
+    manifest     JSON: counts, dimensions, backend, section offsets, payload checksum
+    payload      sections, each aligned to ALIGNMENT bytes:
+                 vectors (float32, count x dims), norms (float32),
+                 then ids, texts and metadata (JSON) as uint64 offsets + UTF-8 blobs
+
+SnapshotVectorStore maps the file read-only and reads every section in place
+(numpy arrays over the mapping, texts decoded only for the chunks returned),
+so opening it costs a few milliseconds whatever the corpus size, and replicas
+on the same host share one copy in the page cache. Searches are exact scans by
+squared L2 distance, the metric of the Chroma collection.
+
+The manifest digest is checked on every open; the payload checksum, which
+reads the whole file, only with `verify` (ingestion checks the file it wrote).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src import config
+from src.ingestion.compression import CompactIndex
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CANINDEX"
+FORMAT_VERSION = 1
+# Magic, format version, reserved, manifest length, manifest digest.
+_PRELUDE = struct.Struct("<8sIIQ16s")
+ALIGNMENT = 64
+_OFFSET_DTYPE = "<u8"
+_VECTOR_DTYPE = "<f4"
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file is not one this version can read, or is corrupt."""
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _digest(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _blob(values: List[bytes]) -> tuple:
+    """(uint64 offsets, concatenated bytes) for a list of byte strings."""
+    offsets = np.zeros(len(values) + 1, dtype=_OFFSET_DTYPE)
+    np.cumsum([len(value) for value in values], out=offsets[1:])
+    return offsets, b"".join(values)
+
+
+# --- Export ---
+def export_snapshot(vector_store, path: Path, verify: bool = True) -> dict:
+    """
+    Writes the chunks of a Chroma `vector_store` (ids, texts, metadata and
+    embeddings) to a snapshot at `path`, replacing it atomically. Returns the
+    manifest.
+    """
+    path = Path(path)
+    data = vector_store._collection.get(include=["embeddings", "documents", "metadatas"])
+    if not data["ids"]:
+        raise SnapshotError("The vector store is empty; nothing to export.")
+    # Sorted by chunk ID, so one collection always gives the same file.
+    order = sorted(range(len(data["ids"])), key=data["ids"].__getitem__)
+    vectors = np.ascontiguousarray(np.asarray(data["embeddings"], dtype=_VECTOR_DTYPE)[order])
+    ids_offsets, ids = _blob([data["ids"][i].encode("utf-8") for i in order])
+    text_offsets, texts = _blob([(data["documents"][i] or "").encode("utf-8") for i in order])
+    metadata_offsets, metadata = _blob([
+        json.dumps(data["metadatas"][i] or {}, ensure_ascii=False, sort_keys=True).encode("utf-8") for i in order
+    ])
+    # Byte views over the arrays and blobs: each section is written from where it is, never copied.
+    sections = {name: memoryview(content).cast("B") for name, content in {
+        "vectors": vectors,
+        "norms": np.einsum("ij,ij->i", vectors, vectors).astype(_VECTOR_DTYPE),
+        "ids_offsets": ids_offsets, "ids": ids,
+        "text_offsets": text_offsets, "text": texts,
+        "metadata_offsets": metadata_offsets, "metadata": metadata,
+    }.items()}
+
+    # Section offsets are relative to the payload start, which follows the manifest.
+    layout, payload_length = {}, 0
+    for name, content in sections.items():
+        payload_length = _align(payload_length)
+        layout[name] = {"offset": payload_length, "length": len(content)}
+        payload_length += len(content)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "count": len(order),
+        "dims": int(vectors.shape[1]),
+        "dtype": _VECTOR_DTYPE,
+        "metric": "l2",
+        "model_backend": config.MODEL_BACKEND,
+        "sections": layout,
+        # Filled in once the payload is written; a hex digest has a fixed length, so the manifest keeps its size.
+        "payload_checksum": "0" * 64,
+    }
+    header_length = _prelude_and_manifest_length(len(json.dumps(manifest, indent=2).encode("utf-8")))
+
+    partial_path = path.with_name(path.name + ".partial")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    checksum = hashlib.blake2b(digest_size=32)
+    with open(partial_path, 'wb') as f:
+        f.seek(header_length)
+        position = 0
+        for name, content in sections.items():
+            for chunk in (b"\0" * (layout[name]["offset"] - position), content):
+                f.write(chunk)
+                checksum.update(chunk)
+            position = layout[name]["offset"] + len(content)
+        manifest["payload_checksum"] = checksum.hexdigest()
+        manifest_bytes = json.dumps(manifest, indent=2).encode("utf-8")
+        f.seek(0)
+        f.write(_PRELUDE.pack(MAGIC, FORMAT_VERSION, 0, len(manifest_bytes), _digest(manifest_bytes)) + manifest_bytes)
+        f.write(b"\0" * (header_length - f.tell()))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial_path, path)
+    logger.info(f"Index snapshot written to {path}: {manifest['count']} chunks, {manifest['dims']} dims, "
+                f"{(header_length + payload_length) / 1e6:.1f} MB.")
+
+    if verify and not verify_snapshot(path):
+        raise SnapshotError(f"The snapshot written to {path} does not match its checksum.")
+    return manifest
+
+
+def _prelude_and_manifest_length(manifest_length: int) -> int:
+    return _align(_PRELUDE.size + manifest_length)
+
+
+# --- Reading ---
+def read_manifest(buffer) -> dict:
+    """Parses and checks the prelude and manifest at the start of `buffer` (bytes or mmap)."""
+    if len(buffer) < _PRELUDE.size:
+        raise SnapshotError("File too short to be an index snapshot.")
+    magic, version, _, manifest_length, digest = _PRELUDE.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise SnapshotError("Not an index snapshot (bad magic number).")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format version {version} (this code reads version {FORMAT_VERSION}).")
+    manifest_bytes = bytes(buffer[_PRELUDE.size:_PRELUDE.size + manifest_length])
+    if len(manifest_bytes) != manifest_length or _digest(manifest_bytes) != digest:
+        raise SnapshotError("Snapshot manifest is truncated or corrupt.")
+    manifest = json.loads(manifest_bytes)
+    manifest["payload_offset"] = _prelude_and_manifest_length(manifest_length)
+    end = max(section["offset"] + section["length"] for section in manifest["sections"].values())
+    if len(buffer) < manifest["payload_offset"] + end:
+        raise SnapshotError("Snapshot payload is truncated.")
+    return manifest
+
+
+def verify_snapshot(path: Path) -> bool:
+    """Checks the payload checksum of the snapshot at `path` (reads the whole file)."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        manifest = read_manifest(buffer)
+        start = manifest["payload_offset"]
+        end = start + max(section["offset"] + section["length"] for section in manifest["sections"].values())
+        with memoryview(buffer) as view:
+            checksum = hashlib.blake2b(view[start:end], digest_size=32).hexdigest()
+    return checksum == manifest["payload_checksum"]
+
+
+class SnapshotVectorStore:
+    """
+    Read-only vector store over a memory-mapped snapshot, with the search
+    methods the RAG chain uses. Nothing is copied out of the mapping except
+    the texts and metadata of the chunks a search returns.
+    """
+
+    def __init__(self, path: Path, embeddings, verify: bool = False):
+        self.path = Path(path)
+        if verify and not verify_snapshot(self.path):
+            raise SnapshotError(f"Snapshot {self.path} does not match its checksum.")
+        with open(self.path, 'rb') as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.manifest = read_manifest(self._buffer)
+        count, dims = self.manifest["count"], self.manifest["dims"]
+        vectors = self._array("vectors", _VECTOR_DTYPE).reshape(count, dims)
+        self.index = CompactIndex(None, vectors, None, norms=self._array("norms", _VECTOR_DTYPE))
+        self._ids = self._array("ids_offsets", _OFFSET_DTYPE)
+        self._texts = self._array("text_offsets", _OFFSET_DTYPE)
+        self._metadata = self._array("metadata_offsets", _OFFSET_DTYPE)
+        self.embeddings = embeddings
+
+    def _array(self, name: str, dtype: str) -> np.ndarray:
+        section = self.manifest["sections"][name]
+        dtype = np.dtype(dtype)
+        return np.frombuffer(self._buffer, dtype=dtype, count=section["length"] // dtype.itemsize,
+                             offset=self.manifest["payload_offset"] + section["offset"])
+
+    def _string(self, name: str, offsets: np.ndarray, i: int) -> str:
+        start = self.manifest["payload_offset"] + self.manifest["sections"][name]["offset"]
+        return self._buffer[start + int(offsets[i]):start + int(offsets[i + 1])].decode("utf-8")
+
+    def __len__(self) -> int:
+        return self.manifest["count"]
+
+    def document(self, i: int) -> Document:
+        return Document(
+            id=self._string("ids", self._ids, i),
+            page_content=self._string("text", self._texts, i),
+            metadata=json.loads(self._string("metadata", self._metadata, i)),
+        )
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Document]:
+        return [self.document(int(i)) for i in self.index.search(np.asarray(embedding, dtype=np.float32), k)[0]]
+
+    async def asimilarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Document]:
+        return await asyncio.get_running_loop().run_in_executor(None, partial(self.similarity_search_by_vector, embedding, k))
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k)
+
+
+def open_snapshot(path: Path, embeddings, verify: bool = False) -> Optional[SnapshotVectorStore]:
+    """The snapshot at `path`, or None if there is none or it cannot be read."""
+    if not Path(path).exists():
+        return None
+    try:
+        return SnapshotVectorStore(path, embeddings, verify=verify)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring index snapshot {path}: {e}")
+        return None
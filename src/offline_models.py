@@ -0,0 +1,177 @@
+"""
+Local stand-ins for the remote embedding and chat models.
+
+They need no network access or API keys and are deterministic, so the app, the
+HTTP API and the batch/benchmark tools can run entirely offline
+(MODEL_BACKEND=offline). An optional artificial latency lets them mimic the
+timing of the real endpoints.
+"""
+import asyncio
+import random
+import re
+import time
+import zlib
+from math import sqrt
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, shared by the offline models."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+# --- Embeddings ---
+class OfflineEmbeddings(Embeddings):
+    """
+    Hashed bag-of-words embeddings. Texts sharing words get similar vectors, so
+    retrieval over an offline index behaves like a simple lexical search.
+    """
+
+    def __init__(self, size: int = 512, latency: float = 0.0):
+        self.size = size
+        self.latency = latency
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for token in tokenize(text):
+            digest = zlib.crc32(token.encode("utf-8"))
+            vector[digest % self.size] += 1.0 if digest & 0x80000000 else -1.0
+        norm = sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._embed(text)
+
+
+# --- Chat Model ---
+class OfflineChatModel(BaseChatModel):
+    """
+    Deterministic chat model. When the system prompt carries a CONTEXTE section
+    it answers with the start of that context; otherwise (e.g. the rephrasing
+    prompt) it returns the latest user message unchanged.
+
+    `latency_jitter` adds a uniform random delay on top of `latency`, and
+    `failure_rate` makes that fraction of calls fail, for load testing.
+    """
+
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    failure_rate: float = 0.0
+    max_answer_chars: int = 400
+
+    @property
+    def _llm_type(self) -> str:
+        return "offline-chat"
+
+    def _delay(self) -> float:
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError("Simulated offline LLM failure.")
+        return self.latency + (random.uniform(0, self.latency_jitter) if self.latency_jitter else 0.0)
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        system = next((m.content for m in messages if isinstance(m, SystemMessage)), "")
+        question = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        if "CONTEXTE:" in system:
+            context = system.split("CONTEXTE:", 1)[1].lstrip("* \n").strip()
+            if not context:
+                return "Je ne dispose pas d'informations suffisantes pour répondre à cette question."
+            return context[: self.max_answer_chars]
+        return question
+
+    def _result(self, messages: List[BaseMessage], text: str) -> ChatResult:
+        input_tokens = sum(len(tokenize(str(m.content))) for m in messages)
+        output_tokens = len(tokenize(text))
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        return self._result(messages, self._answer(messages))
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._result(messages, self._answer(messages))
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        for piece in re.split(r"(?<=\s)", self._answer(messages)):
+            if not piece:
+                continue
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        for piece in re.split(r"(?<=\s)", self._answer(messages)):
+            if not piece:
+                continue
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+from answer_batch import answer_all, load_completed_ids, load_questions
+
+
+def write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+
+def test_load_questions_skips_invalid_lines(tmp_path):
+    path = tmp_path / "questions.jsonl"
+    write_lines(path, [
+        json.dumps({"id": "a", "question": "Qui a gagné la CAN 2019 ?"}),
+        json.dumps({"id": "b"}),
+        json.dumps({"id": "c", "question": "   "}),
+        "{not json",
+        json.dumps(["a", "list"]),
+        json.dumps({"id": "d", "question": "Et ensuite ?", "chat_history": "oops"}),
+        json.dumps({"id": "a", "question": "Doublon"}),
+        json.dumps({"question": "Sans id", "chat_history": [{"role": "user", "content": "x"}]}),
+    ])
+    questions = load_questions(path)
+    assert [item["id"] for item in questions] == ["a", "8"]
+
+
+def test_resume_keeps_the_last_successful_record_per_id(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    path.write_text(
+        json.dumps({"id": "1", "error": "timeout"}) + "\n"
+        + json.dumps({"id": "2", "answer": "old"}) + "\n"
+        + json.dumps({"id": "1", "error": "timeout"}) + "\n"
+        + json.dumps({"id": "2", "answer": "new"}) + "\n"
+        + json.dumps({"id": "3", "answer": "ok"}) + "\n"
+        + json.dumps({"id": "3", "error": "late failure"}) + "\n"
+        + '{"id": "4", "answ',  # Truncated by an interrupted run.
+        encoding="utf-8",
+    )
+    assert load_completed_ids(path) == {"2"}
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert records == [{"id": "2", "answer": "new"}]
+    assert path.read_text(encoding="utf-8").endswith("\n")
+
+
+def test_resume_without_output(tmp_path):
+    assert load_completed_ids(tmp_path / "missing.jsonl") == set()
+
+
+class BrokenChainManager:
+    def get_rag_chain(self, mode="default"):
+        raise RuntimeError("LLM initialization failed")
+
+
+def test_chain_build_failure_gives_one_error_record_per_question(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    questions = [{"id": str(i), "question": "Qui a gagné la CAN 2019 ?"} for i in range(3)]
+    latencies = asyncio.run(answer_all(BrokenChainManager(), questions, path, concurrency=2))
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert latencies == []
+    assert sorted(record["id"] for record in records) == ["0", "1", "2"]
+    assert all(record["error"] == "LLM initialization failed" for record in records)
+    # The failed questions are answered again on the next run.
+    assert load_completed_ids(path) == set()
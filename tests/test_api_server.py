@@ -0,0 +1,18 @@
+from fastapi.testclient import TestClient
+
+from src.api.server import AdmissionController, app
+
+
+class BrokenChainManager:
+    def get_rag_chain(self, mode="default"):
+        raise RuntimeError("LLM initialization failed")
+
+
+def test_chain_build_failure_does_not_leak_admission_slots():
+    app.state.chain_manager = BrokenChainManager()
+    app.state.admission = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout=0.1)
+    client = TestClient(app)
+    for path in ("/ask/stream", "/ask/stream", "/ask", "/ask/stream"):
+        response = client.post(path, json={"question": "Qui a gagné la CAN 2019 ?"})
+        assert response.status_code == 502
+    assert app.state.admission.in_flight == 0
@@ -0,0 +1,33 @@
+from src.ingestion.chunking import StructuredSplitter
+
+SEPARATOR = "-" * 80
+
+
+def long_record(title: str, lines: int) -> str:
+    body = "\n".join(f"Le joueur numéro {i} a marqué un but lors du match de poule." for i in range(lines))
+    return f"Titre de l'article: {title}\nURL: https://le360.ma/{title}\n{body}"
+
+
+def test_oversized_units_have_no_heading_only_chunk():
+    text = "\n".join([
+        "--- Contenu de le360.txt ---",
+        long_record("Maroc", 30),
+        SEPARATOR,
+        # A heading followed by a single line longer than the chunk size.
+        "Équipe: Morocco\n" + " ".join(["Gardien"] * 150),
+        SEPARATOR,
+        "--- Groupes --- Groupe A",
+        "\n".join(f"Groupe {i}: Maroc, Mali, Zambie, Comores" for i in range(40)),
+    ])
+    splitter = StructuredSplitter(chunk_size=300)
+    chunks = splitter.split_text(text)
+    headings = {"Titre de l'article: Maroc", "Équipe: Morocco", "--- Groupes ---"}
+    for chunk, _ in chunks:
+        assert len(chunk) <= 300
+        heading, _, body = chunk.partition("\n")
+        assert body.strip(), f"heading-only chunk: {chunk!r}"
+        assert heading in headings
+    assert chunks[0][1]["url"] == "https://le360.ma/Maroc"
+    # Text after a section header is kept, under the header.
+    groups = [chunk for chunk, metadata in chunks if metadata.get("section") == "Groupes"]
+    assert groups[0].startswith("--- Groupes ---\nGroupe A\n")
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from benchmarks.cleaning_benchmark import (
+    fuzz_texts,
+    legacy_clean_article_text,
+    legacy_clean_rag_document,
+    legacy_remove_emojis,
+    synthetic_texts,
+)
+from src.ingestion.cleaning import SCRAPED_TEXT_CLEANER
+from src.ingestion.processor import clean_rag_document
+from src.ingestion.scraper import clean_article_text, remove_emojis
+
+CASES = [
+    (clean_rag_document, legacy_clean_rag_document),
+    (clean_article_text, legacy_clean_article_text),
+    (remove_emojis, legacy_remove_emojis),
+    (SCRAPED_TEXT_CLEANER.clean, lambda text: legacy_remove_emojis(legacy_clean_article_text(text))),
+]
+
+FIXED = [
+    "",
+    "   ",
+    "Le Maroc 🇲🇦 bat la Zambie ⚽🏆 !",
+    "Voir https://le360.ma/sport/can pic.twitter.com/XyZ9 et la suite",
+    "#CAN2025 @FRMF Walid Regragui a déclaré &amp; confirmé &#35;Lions",
+    "View this post on Instagram\n\n\nVIEW THIS POST ON INSTAGRAM  la finale",
+    "Ligne 1\n \n  \nLigne 2\t\tfin  ",
+    "picXtwitterYcom/abc https://pic.twitter.com/q1#tag",
+    "Famille 👨‍👩‍👧 ★ Ⓜ ️ « Lions de l’Atlas »",
+]
+
+
+@pytest.mark.parametrize("text", FIXED)
+@pytest.mark.parametrize("cleaner, legacy", CASES)
+def test_cleaners_match_the_legacy_chains(cleaner, legacy, text):
+    assert cleaner(text) == legacy(text)
+
+
+@pytest.mark.parametrize("cleaner, legacy", CASES)
+def test_cleaners_match_the_legacy_chains_on_fuzzed_texts(cleaner, legacy):
+    rng = random.Random(0)
+    texts = fuzz_texts(2000, rng) + synthetic_texts(20, rng)
+    mismatches = [text for text in texts if cleaner(text) != legacy(text)]
+    assert not mismatches, f"{len(mismatches)} texts differ, e.g. {mismatches[0][:200]!r}"
@@ -0,0 +1,29 @@
+from langchain_core.documents import Document
+
+from src.app.context_compression import ContextCompressor
+
+SQUAD = Document(page_content="Équipe: Morocco\n- Yassine Bounou (Goalkeeper)\n- Munir Mohamedi (Goalkeeper)\n"
+                              "- Achraf Hakimi (Right-Back)\n- Nayef Aguerd (Centre-Back)")
+ARTICLE = Document(page_content="Titre de l'article: Le Sénégal en demi-finale\nLes Lions de la Teranga se sont qualifiés. "
+                                "Édouard Mendy est l'un des meilleurs gardiens du continent. Le match a eu lieu à Rabat.")
+UNRELATED = Document(page_content="Titre de l'article: La billetterie ouvre lundi\nLes billets seront vendus en ligne.")
+
+
+def test_a_matching_heading_keeps_its_chunk():
+    compressor = ContextCompressor(budget=1000)
+    docs, stats = compressor.compress("Qui sont les gardiens du Maroc ? (Morocco)", [SQUAD, ARTICLE, UNRELATED])
+    assert stats["compressed"]
+    assert docs[0].page_content.startswith("Équipe: Morocco\n- Yassine Bounou (Goalkeeper)")
+    assert "Édouard Mendy" in docs[1].page_content
+    assert len(docs) == 2
+
+
+def test_the_budget_still_applies_to_heading_matches():
+    compressor = ContextCompressor(budget=60, neighbors=0)
+    docs, _ = compressor.compress("Qui sont les gardiens du Maroc ? (Morocco)", [SQUAD])
+    assert docs[0].page_content == "Équipe: Morocco\n- Yassine Bounou (Goalkeeper)"
+
+
+def test_no_match_leaves_the_context_unchanged():
+    docs, stats = ContextCompressor(budget=100).compress("Quel temps fera-t-il ?", [SQUAD, UNRELATED])
+    assert docs == [SQUAD, UNRELATED] and not stats["compressed"]
@@ -0,0 +1,53 @@
+import pytest
+
+from src.app.entities import EntityIndex
+
+SQUADS = {
+    "Morocco": [("Yassine Bounou", "Goalkeeper"), ("Achraf Hakimi", "Right-Back")],
+    "Senegal": [("Édouard Mendy", "Goalkeeper")],
+}
+
+
+@pytest.fixture(scope="module")
+def index():
+    return EntityIndex(SQUADS)
+
+
+@pytest.mark.parametrize("question", [
+    "Quel est l'effectif du Maroc ?",
+    "Quelle est la composition de l'équipe du Maroc ?",
+    "Quels joueurs du Maroc sont sélectionnés ?",
+    "Donne-moi la liste des joueurs des Lions de l'Atlas",
+    "Morocco squad",
+])
+def test_roster_questions_are_answered_directly(index, question):
+    assert index.direct_answer(question).startswith("Effectif de la sélection Maroc")
+
+
+def test_player_question_is_answered_directly(index):
+    assert "poste : Goalkeeper" in index.direct_answer("À quel poste joue Yassine Bounou ?")
+
+
+@pytest.mark.parametrize("question", [
+    # The teams of a group, not a squad.
+    "Quelle est la composition du groupe du Maroc ?",
+    "Quelle est la composition de la poule du Sénégal ?",
+    # The index only knows the current squads.
+    "Quels joueurs du Maroc ont été sélectionnés en 2019 ?",
+    "Quel était l'effectif du Sénégal lors de l'édition précédente ?",
+    "Combien de buts a marqué Achraf Hakimi ?",
+    "Quel est l'effectif du Maroc et du Sénégal ?",
+    # More than the list: the chain answers, with the squad as facts.
+    "Quels joueurs du Maroc jouent en Europe ?",
+    "Quels joueurs du Maroc ont le plus d'expérience ?",
+])
+def test_questions_that_need_retrieval_get_no_direct_answer(index, question):
+    assert index.direct_answer(question) is None
+
+
+def test_group_composition_does_not_add_the_squad_to_the_context(index):
+    assert index.facts("Quelle est la composition du groupe du Maroc ?") == ""
+
+
+def test_roster_questions_that_need_the_chain_get_the_squad_as_facts(index):
+    assert index.facts("Quels joueurs du Maroc jouent en Europe ?").startswith("Effectif de la sélection Maroc")
@@ -0,0 +1,170 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.runnables import Runnable
+
+from src.app.llm_pool import CircuitBreaker, LLMEndpointPool, PoolEndpoint
+
+
+class FakeModel(Runnable):
+    """
+    Answers `text` after `delay` seconds, token by token when streamed; `fail`
+    raises instead. A stream pauses `stall` seconds after its first token.
+    """
+
+    def __init__(self, text: str = "ok", delay: float = 0.0, fail: bool = False, stall: float = 0.0):
+        self.text = text
+        self.delay = delay
+        self.fail = fail
+        self.stall = stall
+        self.calls = 0
+
+    def invoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("endpoint down")
+        return self.text
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("endpoint down")
+        return self.text
+
+    def stream(self, input, config=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("endpoint down")
+        for index, token in enumerate(self.text):
+            if index == 1:
+                time.sleep(self.stall)
+            yield token
+
+    async def astream(self, input, config=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("endpoint down")
+        for index, token in enumerate(self.text):
+            if index == 1:
+                await asyncio.sleep(self.stall)
+            yield token
+
+
+def make_pool(*models, request_timeout=1.0, hedge_delay=5.0, failure_threshold=3, stream_idle_timeout=None):
+    endpoints = [PoolEndpoint(f"e{i}", model, CircuitBreaker(failure_threshold, reset_timeout=60)) for i, model in enumerate(models)]
+    return LLMEndpointPool(endpoints, request_timeout=request_timeout, hedge_delay=hedge_delay,
+                           stream_idle_timeout=stream_idle_timeout)
+
+
+# --- Circuit breaker ---
+def test_half_open_lets_a_single_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.allow_request() and breaker.allow_request()
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+# --- invoke / ainvoke ---
+def test_invoke_deadline_counts_as_failure():
+    slow = FakeModel(delay=0.5)
+    pool = make_pool(slow, request_timeout=0.1, failure_threshold=1)
+    with pytest.raises(TimeoutError):
+        pool.invoke("q")
+    assert pool.endpoints[0].breaker.state == "open"
+    # The late answer of the abandoned call does not close the circuit again.
+    time.sleep(0.5)
+    assert pool.endpoints[0].breaker.state == "open"
+
+
+def test_ainvoke_deadline_counts_as_failure():
+    pool = make_pool(FakeModel(delay=0.5), request_timeout=0.1, failure_threshold=1)
+    with pytest.raises(TimeoutError):
+        asyncio.run(pool.ainvoke("q"))
+    assert pool.endpoints[0].breaker.state == "open"
+
+
+def test_invoke_fails_over():
+    pool = make_pool(FakeModel(fail=True), FakeModel(text="second"))
+    assert pool.invoke("q") == "second"
+
+
+# --- stream / astream ---
+def test_stream_hedges_before_the_first_token():
+    slow, fast = FakeModel(text="slow", delay=0.5), FakeModel(text="fast")
+    pool = make_pool(slow, fast, hedge_delay=0.05)
+    start = time.monotonic()
+    assert "".join(pool.stream("q")) == "fast"
+    assert time.monotonic() - start < 0.4
+
+
+def test_stream_first_token_deadline():
+    pool = make_pool(FakeModel(delay=0.5), request_timeout=0.1, failure_threshold=1)
+    with pytest.raises(TimeoutError):
+        list(pool.stream("q"))
+    assert pool.endpoints[0].breaker.state == "open"
+
+
+def test_stream_fails_over_before_the_first_token():
+    pool = make_pool(FakeModel(fail=True), FakeModel(text="abc"))
+    assert "".join(pool.stream("q")) == "abc"
+
+
+def test_astream_hedges_and_respects_the_deadline():
+    async def collect(pool):
+        return "".join([chunk async for chunk in pool.astream("q")])
+
+    pool = make_pool(FakeModel(text="slow", delay=0.5), FakeModel(text="fast"), hedge_delay=0.05)
+    assert asyncio.run(collect(pool)) == "fast"
+
+    pool = make_pool(FakeModel(delay=0.5), request_timeout=0.1, failure_threshold=1)
+    with pytest.raises(TimeoutError):
+        asyncio.run(collect(pool))
+    assert pool.endpoints[0].breaker.state == "open"
+
+
+def test_stream_stalled_mid_generation_times_out():
+    pool = make_pool(FakeModel(text="abc", stall=0.5), failure_threshold=1, stream_idle_timeout=0.1)
+    chunks = []
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        for chunk in pool.stream("q"):
+            chunks.append(chunk)
+    assert chunks == ["a"] and time.monotonic() - start < 0.4
+    assert pool.endpoints[0].breaker.state == "open"
+
+
+def test_astream_stalled_mid_generation_times_out():
+    chunks = []
+
+    async def collect(pool):
+        async for chunk in pool.astream("q"):
+            chunks.append(chunk)
+
+    pool = make_pool(FakeModel(text="abc", stall=0.5), failure_threshold=1, stream_idle_timeout=0.1)
+    with pytest.raises(TimeoutError):
+        asyncio.run(collect(pool))
+    assert chunks == ["a"]
+    assert pool.endpoints[0].breaker.state == "open"
+
+
+def test_slow_but_steady_stream_completes():
+    pool = make_pool(FakeModel(text="abc", stall=0.05), stream_idle_timeout=0.2)
+    assert "".join(pool.stream("q")) == "abc"
@@ -0,0 +1,30 @@
+import random
+
+from langchain_openai import AzureOpenAIEmbeddings
+
+from benchmarks.sharded_ingest_benchmark import compare, read_collection, write_synthetic_corpus
+from src.ingestion import loader
+from src.offline_models import OfflineEmbeddings
+
+
+def test_sharded_build_equals_single_process_build(tmp_path):
+    corpus_dir = tmp_path / "corpus"
+    corpus_dir.mkdir()
+    write_synthetic_corpus(corpus_dir, files=4, records=10, rng=random.Random(0))
+    documents = loader.load_documents_from_corpus(corpus_dir)
+    # Not the configured size: the workers must embed with this object, not one of their own.
+    embeddings = OfflineEmbeddings(size=64)
+
+    loader.setup_chroma_db(documents, embeddings, tmp_path / "single", workers=1)
+    loader.setup_chroma_db(documents, embeddings, tmp_path / "sharded", workers=2)
+    single, sharded = read_collection(tmp_path / "single"), read_collection(tmp_path / "sharded")
+    assert single and compare(single, sharded) == []
+    assert next(iter(sharded.values()))[2].shape == (64,)
+
+
+def test_api_embeddings_reach_the_workers_as_settings():
+    embeddings = AzureOpenAIEmbeddings(azure_endpoint="https://example.openai.azure.com", api_key="key",
+                                       api_version="2024-02-01", azure_deployment="embeddings")
+    embeddings_class, fields = loader._worker_embeddings(embeddings)
+    rebuilt = embeddings_class(**fields)
+    assert (rebuilt.deployment, rebuilt.azure_endpoint) == ("embeddings", "https://example.openai.azure.com")
@@ -0,0 +1,40 @@
+import pytest
+
+from src.app.routing import classify_intent
+
+CASES = [
+    # Small talk
+    ("Bonjour !", "chit_chat"),
+    ("Merci beaucoup, super !", "chit_chat"),
+    ("Au revoir", "chit_chat"),
+    ("Qui es-tu ?", "chit_chat"),
+    ("Salut, que sais-tu faire ?", "chit_chat"),
+    ("Comment ça marche ?", "chit_chat"),
+    ("Comment ça marche la VAR ?", "factoid"),
+    ("Bonjour, qui a gagné la CAN 2019 ?", "factoid"),
+    # Out of domain
+    ("Quelle est la météo à Paris demain ?", "out_of_domain"),
+    ("Donne-moi une recette de couscous", "out_of_domain"),
+    ("Quel est le cours du bitcoin ?", "out_of_domain"),
+    ("Quelle est la météo pour le match de demain ?", "factoid"),
+    ("Quel est le programme de demain ?", "factoid"),
+    ("Quelle est la chanson officielle ?", "factoid"),
+    # Summary and stats
+    ("Résume l'actualité du Maroc", "summary"),
+    ("Fais une synthèse de la phase de groupes", "summary"),
+    ("Combien de buts a marqué Salah ?", "stats"),
+    ("Quel est le score de la finale ?", "stats"),
+    ("Donne le nombre de cartons jaunes", "stats"),
+    # Factoid
+    ("Qui entraîne le Sénégal ?", "factoid"),
+    ("Où se joue la finale ?", "factoid"),
+]
+
+
+@pytest.mark.parametrize("query, intent", CASES)
+def test_classify_intent(query, intent):
+    assert classify_intent(query) == intent
+
+
+def test_follow_ups_are_never_refused():
+    assert classify_intent("Et la météo ?", has_history=True) == "factoid"
@@ -0,0 +1,76 @@
+import pytest
+
+from src.app.session_store import SessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(tmp_path / "sessions.db")
+    yield store
+    store.close()
+
+
+def fill(store, session_id, count):
+    return [store.append(session_id, "user" if i % 2 == 0 else "assistant", f"{session_id} message {i}") for i in range(count)]
+
+
+def contents(messages):
+    return [message["content"] for message in messages]
+
+
+def test_tail_returns_the_latest_messages_oldest_first(store):
+    messages = fill(store, "a", 5)
+    assert store.tail("a", 3) == messages[2:]
+    assert store.tail("a", 10) == messages
+    assert store.tail("unknown", 3) == []
+
+
+def test_paging_back_reads_every_message_once(store):
+    messages = []
+    for i in range(10):
+        messages.append(store.append("a", "user", f"a message {i}"))
+        store.append("b", "user", f"b message {i}")  # Interleaved ids of another session are never returned.
+    window = store.tail("a", 4)
+    pages = [window]
+    while store.has_before("a", window[0]["id"]):
+        window = store.page("a", 4, before_id=window[0]["id"])
+        pages.insert(0, window)
+    assert [len(page) for page in pages] == [2, 4, 4]
+    assert [message for page in pages for message in page] == messages
+
+
+def test_has_before_at_page_boundaries(store):
+    messages = fill(store, "a", 8)
+    # Exactly one page left: the next page is full and there is nothing before it.
+    page = store.page("a", 4, before_id=messages[4]["id"])
+    assert page == messages[:4]
+    assert not store.has_before("a", page[0]["id"])
+    assert store.has_before("a", messages[1]["id"])
+    assert not store.has_before("a", messages[0]["id"])
+    assert store.page("a", 4, before_id=messages[0]["id"]) == []
+
+
+def test_sessions_are_separate_and_clear_only_touches_one(store):
+    fill(store, "a", 3)
+    b = fill(store, "b", 2)
+    store.clear("a")
+    assert store.tail("a", 10) == []
+    assert store.tail("b", 10) == b
+    assert not store.has_before("a", b[-1]["id"] + 1)
+
+
+def test_conversation_survives_reopening(tmp_path):
+    path = tmp_path / "sessions.db"
+    store = SessionStore(path)
+    messages = fill(store, "a", 6)
+    store.close()
+
+    reopened = SessionStore(path)
+    try:
+        assert reopened.tail("a", 6) == messages
+        assert contents(reopened.page("a", 2, before_id=messages[2]["id"])) == contents(messages[:2])
+        added = reopened.append("a", "user", "after restart")
+        assert added["id"] > messages[-1]["id"]
+        assert reopened.tail("a", 2) == [messages[-1], added]
+    finally:
+        reopened.close()
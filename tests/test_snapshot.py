@@ -0,0 +1,111 @@
+import struct
+
+import numpy as np
+import pytest
+from langchain_chroma import Chroma
+
+from src.ingestion.snapshot import (
+    SnapshotError,
+    SnapshotVectorStore,
+    export_snapshot,
+    open_snapshot,
+    read_manifest,
+    verify_snapshot,
+)
+from src.offline_models import OfflineEmbeddings
+
+TEXTS = [
+    "Titre de l'article: Le Maroc en finale\nLes Lions de l'Atlas ont battu le Nigeria.",
+    "Équipe: Morocco\n- Yassine Bounou (Goalkeeper)",
+    "Titre de l'article: Le Sénégal éliminé\nLes Lions de la Teranga sortent en huitième de finale.",
+    "Édition 2019: Algérie\nL'Algérie remporte la CAN 2019 en Égypte.",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def embeddings():
+    return OfflineEmbeddings(size=32)
+
+
+@pytest.fixture(scope="module")
+def chroma(tmp_path_factory, embeddings):
+    store = Chroma(persist_directory=str(tmp_path_factory.mktemp("chroma")), embedding_function=embeddings)
+    store.add_texts(TEXTS, metadatas=[{"source": f"doc-{i}.txt", "rank": i} for i in range(len(TEXTS))],
+                    ids=[f"id-{i}" for i in range(len(TEXTS))])
+    return store
+
+
+@pytest.fixture(scope="module")
+def snapshot_path(tmp_path_factory, chroma):
+    path = tmp_path_factory.mktemp("snapshot") / "index.snapshot"
+    export_snapshot(chroma, path)
+    return path
+
+
+def corrupted_copy(snapshot_path, tmp_path, edit) -> bytes:
+    content = bytearray(snapshot_path.read_bytes())
+    content = edit(content) or content
+    path = tmp_path / "corrupted.snapshot"
+    path.write_bytes(content)
+    return path
+
+
+# --- Round trip ---
+def test_round_trip_keeps_ids_texts_and_metadata(snapshot_path, embeddings):
+    store = SnapshotVectorStore(snapshot_path, embeddings, verify=True)
+    assert len(store) == len(TEXTS)
+    documents = {document.id: document for document in (store.document(i) for i in range(len(store)))}
+    assert sorted(documents) == [f"id-{i}" for i in range(len(TEXTS))]
+    for i, text in enumerate(TEXTS):
+        assert documents[f"id-{i}"].page_content == text
+        assert documents[f"id-{i}"].metadata == {"source": f"doc-{i}.txt", "rank": i}
+
+
+def test_search_order_matches_an_exact_l2_search(snapshot_path, chroma, embeddings):
+    store = SnapshotVectorStore(snapshot_path, embeddings)
+    data = chroma._collection.get(include=["embeddings"])
+    vectors = np.asarray(data["embeddings"], dtype=np.float32)
+    for query in ("Qui a gagné la CAN 2019 ?", "gardien du Maroc", "Lions de la Teranga"):
+        query_vector = np.asarray(embeddings.embed_query(query), dtype=np.float32)
+        distances = ((vectors - query_vector) ** 2).sum(axis=1)
+        expected = [data["ids"][i] for i in np.argsort(distances, kind="stable")[:3]]
+        assert [document.id for document in store.similarity_search(query, k=3)] == expected
+
+
+def test_export_is_deterministic(snapshot_path, chroma, tmp_path):
+    other = tmp_path / "other.snapshot"
+    export_snapshot(chroma, other)
+    first, second = read_manifest(snapshot_path.read_bytes()), read_manifest(other.read_bytes())
+    assert first["payload_checksum"] == second["payload_checksum"]
+    assert first["sections"] == second["sections"]
+
+
+# --- Integrity checks ---
+@pytest.mark.parametrize("edit, message", [
+    (lambda content: content.__setitem__(slice(0, 8), b"NOTINDEX"), "bad magic"),
+    (lambda content: struct.pack_into("<I", content, 8, 99), "format version 99"),
+    (lambda content: content.__setitem__(50, content[50] ^ 0xFF), "manifest is truncated or corrupt"),
+    (lambda content: content[:60], "manifest is truncated or corrupt"),
+    (lambda content: content[:-10], "payload is truncated"),
+    (lambda content: content[:10], "too short"),
+])
+def test_unreadable_files_are_refused(snapshot_path, tmp_path, embeddings, edit, message):
+    path = corrupted_copy(snapshot_path, tmp_path, edit)
+    with pytest.raises(SnapshotError, match=message):
+        read_manifest(path.read_bytes())
+    assert open_snapshot(path, embeddings) is None
+
+
+def test_corrupted_payload_fails_the_checksum(snapshot_path, tmp_path, embeddings):
+    payload_offset = read_manifest(snapshot_path.read_bytes())["payload_offset"]
+    path = corrupted_copy(snapshot_path, tmp_path, lambda content: content.__setitem__(payload_offset + 5, content[payload_offset + 5] ^ 0xFF))
+    assert verify_snapshot(snapshot_path)
+    assert not verify_snapshot(path)
+    with pytest.raises(SnapshotError, match="checksum"):
+        SnapshotVectorStore(path, embeddings, verify=True)
+    assert open_snapshot(path, embeddings, verify=True) is None
+
+
+def test_missing_snapshot_opens_as_none(tmp_path, embeddings):
+    assert open_snapshot(tmp_path / "missing.snapshot", embeddings) is None